@@ -19,6 +19,9 @@ import app.models.market  # noqa
 import app.models.forecast  # noqa
 import app.models.activity  # noqa
 import app.models.notification  # noqa
+import app.models.user_stats  # noqa
+import app.models.category_stats  # noqa
+import app.models.leaderboard  # noqa
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,40 @@
+"""Add profit/volume ranks and forecast counts to leaderboard_entries
+
+Revision ID: a7b8c9d0e1f2
+Revises: z6a7b8c9d0e1
+Create Date: 2026-02-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7b8c9d0e1f2'
+down_revision = 'z6a7b8c9d0e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Entries are rebuilt by the next leaderboard refresh
+    op.execute("DELETE FROM leaderboard_entries")
+    
+    op.add_column('leaderboard_entries', sa.Column('profit_rank', sa.Integer(), nullable=False))
+    op.add_column('leaderboard_entries', sa.Column('volume_rank', sa.Integer(), nullable=False))
+    op.add_column('leaderboard_entries', sa.Column('forecasts', sa.Integer(), nullable=False))
+    op.add_column('leaderboard_entries', sa.Column('won_forecasts', sa.Integer(), nullable=False))
+    op.add_column('leaderboard_entries', sa.Column('lost_forecasts', sa.Integer(), nullable=False))
+    
+    op.create_index('idx_leaderboard_entries_scope_profit_rank', 'leaderboard_entries', ['period', 'category', 'profit_rank'], unique=False)
+    op.create_index('idx_leaderboard_entries_scope_volume_rank', 'leaderboard_entries', ['period', 'category', 'volume_rank'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_leaderboard_entries_scope_volume_rank', table_name='leaderboard_entries')
+    op.drop_index('idx_leaderboard_entries_scope_profit_rank', table_name='leaderboard_entries')
+    op.drop_column('leaderboard_entries', 'lost_forecasts')
+    op.drop_column('leaderboard_entries', 'won_forecasts')
+    op.drop_column('leaderboard_entries', 'forecasts')
+    op.drop_column('leaderboard_entries', 'volume_rank')
+    op.drop_column('leaderboard_entries', 'profit_rank')
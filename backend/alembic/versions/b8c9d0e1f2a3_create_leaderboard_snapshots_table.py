@@ -0,0 +1,36 @@
+"""Create leaderboard_snapshots table
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-02-20 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Daily copy of each user's rank per (period, category), for rank changes and history
+    op.create_table('leaderboard_snapshots',
+    sa.Column('snapshot_date', sa.Date(), nullable=False),
+    sa.Column('period', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('rank_score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('snapshot_date', 'period', 'category', 'user_id')
+    )
+    op.create_index('idx_leaderboard_snapshots_user_date', 'leaderboard_snapshots', ['user_id', 'snapshot_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_leaderboard_snapshots_user_date', table_name='leaderboard_snapshots')
+    op.drop_table('leaderboard_snapshots')
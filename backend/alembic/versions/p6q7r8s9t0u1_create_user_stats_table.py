@@ -0,0 +1,70 @@
+"""Create user_stats table
+
+Revision ID: p6q7r8s9t0u1
+Revises: o5p6q7r8s9t0
+Create Date: 2026-02-02 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'p6q7r8s9t0u1'
+down_revision = 'o5p6q7r8s9t0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create user_stats table (one row per user with forecasts)
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('total_forecasts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('pending_forecasts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('won_forecasts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('lost_forecasts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('total_points', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('pending_points', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('won_points', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('lost_points', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('profit_loss', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('biggest_win', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    
+    # Backfill from existing forecasts (same aggregates as user_stats_service)
+    op.execute("""
+        INSERT INTO user_stats (
+            user_id, total_forecasts, pending_forecasts, won_forecasts, lost_forecasts,
+            total_points, pending_points, won_points, lost_points, profit_loss, biggest_win
+        )
+        SELECT
+            user_id,
+            COUNT(id),
+            COUNT(id) FILTER (WHERE status = 'pending'),
+            COUNT(id) FILTER (WHERE status = 'won'),
+            COUNT(id) FILTER (WHERE status = 'lost'),
+            COALESCE(SUM(points), 0),
+            COALESCE(SUM(points) FILTER (WHERE status = 'pending'), 0),
+            COALESCE(SUM(points) FILTER (WHERE status = 'won'), 0),
+            COALESCE(SUM(points) FILTER (WHERE status = 'lost'), 0),
+            COALESCE(SUM(CASE
+                WHEN status = 'won' AND reward_amount IS NOT NULL THEN reward_amount - points
+                WHEN status = 'won' THEN points / 2
+                WHEN status = 'lost' THEN -points
+                ELSE 0
+            END), 0),
+            MAX(CASE
+                WHEN reward_amount IS NOT NULL THEN reward_amount - points
+                ELSE points / 2
+            END) FILTER (WHERE status = 'won')
+        FROM forecasts
+        GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('user_stats')
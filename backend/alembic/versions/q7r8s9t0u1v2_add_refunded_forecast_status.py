@@ -0,0 +1,31 @@
+"""Add refunded forecast status
+
+Revision ID: q7r8s9t0u1v2
+Revises: p6q7r8s9t0u1
+Create Date: 2026-02-04 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'q7r8s9t0u1v2'
+down_revision = 'p6q7r8s9t0u1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Forecasts on cancelled markets end in 'refunded'
+    op.drop_constraint('check_status', 'forecasts', type_='check')
+    op.execute(
+        "ALTER TABLE forecasts ADD CONSTRAINT check_status CHECK (status IN ('pending', 'won', 'lost', 'refunded'))"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('check_status', 'forecasts', type_='check')
+    op.execute(
+        "ALTER TABLE forecasts ADD CONSTRAINT check_status CHECK (status IN ('pending', 'won', 'lost'))"
+    )
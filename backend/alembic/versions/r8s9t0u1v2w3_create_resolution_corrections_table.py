@@ -0,0 +1,55 @@
+"""Create resolution_corrections table
+
+Revision ID: r8s9t0u1v2w3
+Revises: q7r8s9t0u1v2
+Create Date: 2026-02-06 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'r8s9t0u1v2w3'
+down_revision = 'q7r8s9t0u1v2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create resolution_corrections table (audit trail for re-resolved markets)
+    op.create_table('resolution_corrections',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('resolution_id', sa.String(), nullable=False),
+    sa.Column('market_id', sa.String(), nullable=False),
+    sa.Column('previous_outcome_id', sa.String(), nullable=False),
+    sa.Column('corrected_outcome_id', sa.String(), nullable=False),
+    sa.Column('corrected_by', sa.String(), nullable=False),
+    sa.Column('evidence_urls', sa.JSON(), nullable=False),
+    sa.Column('reason', sa.Text(), nullable=False),
+    sa.Column('chips_reversed', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('chips_awarded', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('forecasts_rescored', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('users_affected', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['resolution_id'], ['resolutions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['market_id'], ['markets.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['previous_outcome_id'], ['outcomes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['corrected_outcome_id'], ['outcomes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['corrected_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_resolution_corrections_id'), 'resolution_corrections', ['id'], unique=False)
+    op.create_index(op.f('ix_resolution_corrections_resolution_id'), 'resolution_corrections', ['resolution_id'], unique=False)
+    op.create_index(op.f('ix_resolution_corrections_market_id'), 'resolution_corrections', ['market_id'], unique=False)
+    op.create_index(op.f('ix_resolution_corrections_corrected_by'), 'resolution_corrections', ['corrected_by'], unique=False)
+    op.create_index(op.f('ix_resolution_corrections_created_at'), 'resolution_corrections', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_resolution_corrections_created_at'), table_name='resolution_corrections')
+    op.drop_index(op.f('ix_resolution_corrections_corrected_by'), table_name='resolution_corrections')
+    op.drop_index(op.f('ix_resolution_corrections_market_id'), table_name='resolution_corrections')
+    op.drop_index(op.f('ix_resolution_corrections_resolution_id'), table_name='resolution_corrections')
+    op.drop_index(op.f('ix_resolution_corrections_id'), table_name='resolution_corrections')
+    op.drop_table('resolution_corrections')
@@ -0,0 +1,54 @@
+"""Add last_active_date to users
+
+Revision ID: s9t0u1v2w3x4
+Revises: r8s9t0u1v2w3
+Create Date: 2026-02-09 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 's9t0u1v2w3x4'
+down_revision = 'r8s9t0u1v2w3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # UTC day of the user's most recent forecast; activity_streak is the streak ending on it
+    op.add_column('users', sa.Column('last_active_date', sa.Date(), nullable=True))
+    
+    # Backfill with gaps-and-islands: consecutive days share the same (day - row_number)
+    op.execute("""
+        WITH days AS (
+            SELECT DISTINCT user_id, (created_at AT TIME ZONE 'UTC')::date AS day
+            FROM forecasts
+        ),
+        islands AS (
+            SELECT
+                user_id,
+                day,
+                day - (ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY day))::int AS island
+            FROM days
+        ),
+        latest AS (
+            SELECT DISTINCT ON (user_id)
+                user_id,
+                MAX(day) AS last_day,
+                COUNT(*) AS streak
+            FROM islands
+            GROUP BY user_id, island
+            ORDER BY user_id, MAX(day) DESC
+        )
+        UPDATE users
+        SET last_active_date = latest.last_day,
+            activity_streak = LEAST(latest.streak, 365)
+        FROM latest
+        WHERE users.id = latest.user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'last_active_date')
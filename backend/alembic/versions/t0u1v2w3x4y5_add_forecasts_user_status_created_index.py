@@ -0,0 +1,30 @@
+"""Add forecasts (user_id, status, created_at) index
+
+Revision ID: t0u1v2w3x4y5
+Revises: s9t0u1v2w3x4
+Create Date: 2026-02-10 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 't0u1v2w3x4y5'
+down_revision = 's9t0u1v2w3x4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Winning streaks: latest loss per user and the wins newer than it
+    op.create_index(
+        'idx_forecasts_user_status_created',
+        'forecasts',
+        ['user_id', 'status', 'created_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_forecasts_user_status_created', table_name='forecasts')
@@ -0,0 +1,28 @@
+"""Add granularity to reputation_history
+
+Revision ID: u1v2w3x4y5z6
+Revises: t0u1v2w3x4y5
+Create Date: 2026-02-11 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'u1v2w3x4y5z6'
+down_revision = 't0u1v2w3x4y5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows are raw points; compaction rolls them into daily/weekly points
+    op.add_column(
+        'reputation_history',
+        sa.Column('granularity', sa.String(), nullable=False, server_default='raw')
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('reputation_history', 'granularity')
@@ -0,0 +1,42 @@
+"""Add implied probability and Brier/log scores to forecasts
+
+Revision ID: v2w3x4y5z6a7
+Revises: u1v2w3x4y5z6
+Create Date: 2026-02-12 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'v2w3x4y5z6a7'
+down_revision = 'u1v2w3x4y5z6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('forecasts', sa.Column('implied_probability', sa.Float(), nullable=True))
+    op.add_column('forecasts', sa.Column('brier_score', sa.Float(), nullable=True))
+    op.add_column('forecasts', sa.Column('log_score', sa.Float(), nullable=True))
+    op.add_column(
+        'user_stats',
+        sa.Column('brier_score_sum', sa.Float(), nullable=False, server_default='0')
+    )
+    
+    # Consensus at placement can't be reconstructed for existing forecasts:
+    # score them as p = 1 so accuracy stays equal to the previous win rate
+    op.execute("""
+        UPDATE forecasts
+        SET brier_score = CASE WHEN status = 'won' THEN 0.0 ELSE 1.0 END
+        WHERE status IN ('won', 'lost')
+    """)
+    op.execute("UPDATE user_stats SET brier_score_sum = lost_forecasts")
+
+
+def downgrade() -> None:
+    op.drop_column('user_stats', 'brier_score_sum')
+    op.drop_column('forecasts', 'log_score')
+    op.drop_column('forecasts', 'brier_score')
+    op.drop_column('forecasts', 'implied_probability')
@@ -0,0 +1,47 @@
+"""Create user_category_stats and category_thresholds tables
+
+Revision ID: w3x4y5z6a7b8
+Revises: v2w3x4y5z6a7
+Create Date: 2026-02-13 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'w3x4y5z6a7b8'
+down_revision = 'v2w3x4y5z6a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Per-user accuracy and percentile rank per market category (filled by the nightly batch job)
+    op.create_table('user_category_stats',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('resolved_forecasts', sa.Integer(), nullable=False),
+    sa.Column('won_forecasts', sa.Integer(), nullable=False),
+    sa.Column('accuracy', sa.Float(), nullable=False),
+    sa.Column('percentile', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'category')
+    )
+    op.create_index('idx_user_category_stats_category_percentile', 'user_category_stats', ['category', 'percentile'], unique=False)
+    
+    # Accuracy percentiles per category
+    op.create_table('category_thresholds',
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('p90_accuracy', sa.Float(), nullable=False),
+    sa.Column('users_ranked', sa.Integer(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('category')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('category_thresholds')
+    op.drop_index('idx_user_category_stats_category_percentile', table_name='user_category_stats')
+    op.drop_table('user_category_stats')
@@ -0,0 +1,62 @@
+"""Add badge_codes to users
+
+Revision ID: x4y5z6a7b8c9
+Revises: w3x4y5z6a7b8
+Create Date: 2026-02-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'x4y5z6a7b8c9'
+down_revision = 'w3x4y5z6a7b8'
+branch_labels = None
+depends_on = None
+
+
+# Snapshot of badge_service.BADGE_CODES at the time of this migration
+BADGE_CODES = {
+    "newbie": 1,
+    "accurate": 2,
+    "climber": 3,
+    "specialist": 4,
+    "veteran": 5,
+    "perfect_week": 6,
+    "specialist_election": 101,
+    "specialist_politics": 102,
+    "specialist_sports": 103,
+    "specialist_entertainment": 104,
+    "specialist_economy": 105,
+    "specialist_weather": 106,
+}
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('badge_codes', postgresql.ARRAY(sa.SmallInteger()), nullable=False, server_default='{}')
+    )
+    
+    # Backfill codes from the JSON badge lists (unknown badge IDs are skipped)
+    codes = ", ".join(f"('{badge_id}', {code})" for badge_id, code in BADGE_CODES.items())
+    op.execute(f"""
+        UPDATE users
+        SET badge_codes = ARRAY(
+            SELECT DISTINCT codes.code::smallint
+            FROM json_array_elements_text(users.badges) AS held(badge_id)
+            JOIN (VALUES {codes}) AS codes(badge_id, code) ON codes.badge_id = held.badge_id
+            ORDER BY 1
+        )
+        WHERE users.badges IS NOT NULL
+          AND json_typeof(users.badges) = 'array'
+    """)
+    
+    op.create_index('idx_users_badge_codes', 'users', ['badge_codes'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_users_badge_codes', table_name='users')
+    op.drop_column('users', 'badge_codes')
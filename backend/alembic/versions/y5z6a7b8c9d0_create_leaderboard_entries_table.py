@@ -0,0 +1,42 @@
+"""Create leaderboard_entries table
+
+Revision ID: y5z6a7b8c9d0
+Revises: x4y5z6a7b8c9
+Create Date: 2026-02-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'y5z6a7b8c9d0'
+down_revision = 'x4y5z6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Precomputed ranks per (period, category), refreshed by the leaderboard job
+    op.create_table('leaderboard_entries',
+    sa.Column('period', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('rank_score', sa.Float(), nullable=False),
+    sa.Column('reputation', sa.Float(), nullable=False),
+    sa.Column('winning_streak', sa.Integer(), nullable=False),
+    sa.Column('activity_streak', sa.Integer(), nullable=False),
+    sa.Column('total_forecasts', sa.Integer(), nullable=False),
+    sa.Column('profit_loss', sa.Integer(), nullable=False),
+    sa.Column('volume', sa.Integer(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('period', 'category', 'user_id')
+    )
+    op.create_index('idx_leaderboard_entries_scope_rank', 'leaderboard_entries', ['period', 'category', 'rank'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_leaderboard_entries_scope_rank', table_name='leaderboard_entries')
+    op.drop_table('leaderboard_entries')
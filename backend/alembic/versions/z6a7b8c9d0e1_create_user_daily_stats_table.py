@@ -0,0 +1,67 @@
+"""Create user_daily_stats table
+
+Revision ID: z6a7b8c9d0e1
+Revises: y5z6a7b8c9d0
+Create Date: 2026-02-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'z6a7b8c9d0e1'
+down_revision = 'y5z6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Per-user buckets per placement day (UTC) and market category, for rolling-window leaderboards
+    op.create_table('user_daily_stats',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('forecasts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('won_forecasts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('lost_forecasts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('volume', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('won_points', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('lost_points', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('profit_loss', sa.Integer(), nullable=False, server_default='0'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'category', 'day')
+    )
+    op.create_index('idx_user_daily_stats_day_category', 'user_daily_stats', ['day', 'category'], unique=False)
+    
+    # Backfill from existing forecasts (same aggregates as user_stats_service)
+    op.execute("""
+        INSERT INTO user_daily_stats (
+            user_id, category, day, forecasts, won_forecasts, lost_forecasts,
+            volume, won_points, lost_points, profit_loss
+        )
+        SELECT
+            f.user_id,
+            m.category,
+            CAST(f.created_at AT TIME ZONE 'UTC' AS DATE),
+            COUNT(f.id),
+            COUNT(f.id) FILTER (WHERE f.status = 'won'),
+            COUNT(f.id) FILTER (WHERE f.status = 'lost'),
+            COALESCE(SUM(f.points), 0),
+            COALESCE(SUM(f.points) FILTER (WHERE f.status = 'won'), 0),
+            COALESCE(SUM(f.points) FILTER (WHERE f.status = 'lost'), 0),
+            COALESCE(SUM(CASE
+                WHEN f.status = 'won' AND f.reward_amount IS NOT NULL THEN f.reward_amount - f.points
+                WHEN f.status = 'won' THEN f.points / 2
+                WHEN f.status = 'lost' THEN -f.points
+                ELSE 0
+            END), 0)
+        FROM forecasts f
+        JOIN markets m ON m.id = f.market_id
+        GROUP BY f.user_id, m.category, CAST(f.created_at AT TIME ZONE 'UTC' AS DATE)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_user_daily_stats_day_category', table_name='user_daily_stats')
+    op.drop_table('user_daily_stats')
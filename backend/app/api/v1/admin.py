@@ -23,6 +23,7 @@ from app.schemas.admin import (
     PurchaseMonitoringListResponse,
     PurchaseMonitoringResponse,
     SuspendMarketRequest,
+    CancelMarketRequest,
     BanUserRequest,
     FreezeChipsRequest,
     FlagItemRequest,
@@ -247,6 +248,70 @@ async def unsuspend_market(
     return {"success": True, "message": f"Market {market_id} unsuspended successfully"}
 
 
+# Cancelled markets with more pending forecasts than this are refunded by a background job
+ASYNC_REFUND_THRESHOLD = 10000
+
+
+@router.post("/markets/{market_id}/cancel", response_model=dict)
+async def cancel_market(
+    market_id: str,
+    request: CancelMarketRequest,
+    db: Session = Depends(get_db),
+    moderator: User = Depends(require_market_moderator),
+):
+    """
+    Cancel a market and refund every pending forecast (market moderator or admin only)
+    
+    Calling this again on an already cancelled market resumes any unfinished refunds.
+    Large markets are refunded in chunks by a background job.
+    """
+    from app.services.refund_service import (
+        cancel_market as mark_market_cancelled,
+        count_pending_forecasts,
+        refund_cancelled_market,
+    )
+    
+    market = db.query(Market).filter(Market.id == market_id).first()
+    if not market:
+        raise HTTPException(status_code=404, detail="Market not found")
+    
+    if market.status == "resolved":
+        raise HTTPException(status_code=400, detail="Cannot cancel a resolved market")
+    
+    if market.status != "cancelled":
+        mark_market_cancelled(db, market, moderator.id, request.reason)
+        db.commit()
+    
+    pending = count_pending_forecasts(db, market_id)
+    if pending > ASYNC_REFUND_THRESHOLD:
+        try:
+            from app.tasks.market_tasks import refund_cancelled_market_async
+            refund_cancelled_market_async.delay(market_id)
+            return {
+                "success": True,
+                "data": {"queued": True, "pending_forecasts": pending},
+                "message": f"Market {market_id} cancelled. Refunding {pending} forecasts in the background.",
+            }
+        except Exception:
+            # Celery not available - fall back to refunding synchronously
+            pass
+    
+    try:
+        totals = refund_cancelled_market(db, market_id)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Market cancelled but refunds did not finish (retry to resume): {str(e)}",
+        )
+    
+    return {
+        "success": True,
+        "data": {"queued": False, **totals},
+        "message": f"Market {market_id} cancelled. Refunded {totals['chips']} chips across {totals['forecasts']} forecasts.",
+    }
+
+
 @router.post("/users/{user_id}/ban", response_model=dict)
 async def ban_user(
     user_id: str,
@@ -144,6 +144,10 @@ async def place_forecast(
         # Debit chips from user
         current_user.chips -= forecast_data.points
         
+        # Snapshot the market consensus for the chosen outcome (before our points count)
+        from app.services.reputation_service import calculate_implied_probability
+        implied_probability = calculate_implied_probability(db, market_id, outcome.id)
+        
         # Create forecast
         forecast = Forecast(
             id=forecast_id,
@@ -151,6 +155,7 @@ async def place_forecast(
             market_id=market_id,
             outcome_id=forecast_data.outcome_id,
             points=forecast_data.points,
+            implied_probability=implied_probability,
             status="pending",
             is_flagged=False,
         )
@@ -159,15 +164,31 @@ async def place_forecast(
         # Update outcome total_points
         outcome.total_points += forecast_data.points
         
+        # Advance the maintained activity streak (no query)
+        from app.services.streak_service import record_activity
+        record_activity(current_user)
+        
         # Flush to ensure forecast is in database before badge check
         db.flush()
         
+        # Update user's forecast stats (bucketed by the forecast's own created_at)
+        from app.services.user_stats_service import record_forecast_placed
+        record_forecast_placed(db, current_user.id, forecast_data.points, market.category, forecast.created_at)
+        
+        # Forecast count and activity streak feed the leaderboard rank score
+        from app.services.leaderboard_service import update_leaderboard_ranks, update_rank_scores
+        update_rank_scores(db, [current_user.id])
+        
         # Check and award badges (for badges like Newbie, Veteran that depend on forecast count)
         # Must happen after flush so the new forecast is counted
-        from app.services.badge_service import check_and_award_badges
-        check_and_award_badges(db, current_user.id)
+        from app.services.badge_service import check_and_award_badges, BADGE_EVENT_FORECAST_PLACED
+        check_and_award_badges(db, current_user.id, event=BADGE_EVENT_FORECAST_PLACED)
         
         db.commit()
+        
+        # Live ranks follow the new score until the next leaderboard refresh
+        update_leaderboard_ranks(db, [current_user.id])
+        
         db.refresh(forecast)
         db.refresh(current_user)
         db.refresh(outcome)
@@ -306,6 +327,16 @@ async def update_forecast(
         
         # Update forecast
         if forecast_data.outcome_id:
+            # Switching outcome: re-snapshot consensus without this user's old position
+            if new_outcome_id != old_outcome_id:
+                from app.services.reputation_service import calculate_implied_probability
+                forecast.implied_probability = calculate_implied_probability(
+                    db,
+                    forecast.market_id,
+                    new_outcome_id,
+                    exclude_outcome_id=old_outcome_id,
+                    exclude_points=old_points,
+                )
             forecast.outcome_id = forecast_data.outcome_id
         if forecast_data.points is not None:
             forecast.points = forecast_data.points
@@ -325,6 +356,10 @@ async def update_forecast(
             if old_outcome:
                 old_outcome.total_points += new_points
         
+        # Update user's forecast stats
+        from app.services.user_stats_service import record_forecast_points_changed
+        record_forecast_points_changed(db, current_user.id, points_change, market.category, forecast.created_at)
+        
         db.commit()
         db.refresh(forecast)
         db.refresh(current_user)
@@ -451,6 +451,7 @@ async def update_market(
     if market_data.image_url is not None:
         market.image_url = market_data.image_url
     
+    category_changed = market_data.category is not None and market_data.category != market.category
     if market_data.category is not None:
         market.category = market_data.category
     
@@ -468,9 +469,20 @@ async def update_market(
         if hasattr(market, 'end_date'):
             market.end_date = market_data.end_date
     
+    if category_changed:
+        # Daily stats buckets are per category: move this market's forecasts to the new one
+        from app.services.user_stats_service import reconcile_market_daily_stats
+        db.flush()
+        reconcile_market_daily_stats(db, market.id)
+    
     db.commit()
     db.refresh(market)
     
+    if category_changed:
+        # Category leaderboards include the market's forecasts under the new category
+        from app.services.leaderboard_service import request_leaderboard_refresh
+        request_leaderboard_refresh()
+    
     # Return updated market
     # Safely get end_date (in case migration hasn't been run yet)
     end_date = getattr(market, 'end_date', None)
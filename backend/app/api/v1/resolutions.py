@@ -6,19 +6,22 @@ from datetime import datetime
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func, select, update
 
 from app.database import get_db
-from app.models.resolution import Resolution
+from app.models.resolution import Resolution, ResolutionCorrection
 from app.models.market import Market, Outcome
 from app.models.forecast import Forecast
 from app.models.user import User
 from app.schemas.resolution import (
     ResolutionCreate,
+    BatchResolutionCreate,
     ResolutionResponse,
     ResolutionDetailResponse,
+    ResolutionCorrectionCreate,
+    ResolutionCorrectionResponse,
 )
-from app.dependencies import get_current_user_optional, require_market_moderator
+from app.dependencies import get_current_user_optional, require_admin, require_market_moderator
 
 router = APIRouter()
 
@@ -129,6 +132,19 @@ def score_forecasts(db: Session, market_id: str, winning_outcome_id: str) -> dic
             "reward_amount": reward_int,
         })
     
+    # Move the scored forecasts from pending to won/lost in user_stats
+    from app.services.user_stats_service import apply_market_resolution
+    from app.services.streak_service import apply_market_winning_streaks
+    from app.services.reputation_service import score_market_forecasts
+    db.flush()
+    
+    # Brier/log scores first so user_stats picks them up
+    score_market_forecasts(db, market_id)
+    apply_market_resolution(db, market_id)
+    
+    # Extend or reset winning streaks incrementally
+    apply_market_winning_streaks(db, market_id)
+    
     db.commit()
     
     return {
@@ -143,23 +159,12 @@ def score_forecasts(db: Session, market_id: str, winning_outcome_id: str) -> dic
     }
 
 
-@router.post("/markets/{market_id}/resolve", response_model=dict, status_code=status.HTTP_201_CREATED)
-async def resolve_market(
-    market_id: str,
-    resolution_data: ResolutionCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_market_moderator),
-):
+def validate_resolution(db: Session, market_id: str, resolution_data: ResolutionCreate) -> tuple[Market, Outcome]:
     """
-    Resolve a market (admin only)
+    Validate that a market can be resolved to the given outcome
     
-    This endpoint:
-    1. Validates the market exists and is open
-    2. Validates the outcome exists and belongs to the market
-    3. Validates evidence URLs (min 1, min 2 for elections)
-    4. Creates resolution record (immutable)
-    5. Updates market status to 'resolved'
-    6. Scores all forecasts (won/lost)
+    Returns:
+        Tuple of (market, winning outcome)
     """
     # Get market
     market = db.query(Market).filter(Market.id == market_id).first()
@@ -206,128 +211,425 @@ async def resolve_market(
             detail="Resolution already exists for this market",
         )
     
+    return market, outcome
+
+
+def apply_resolution(
+    db: Session,
+    market: Market,
+    outcome: Outcome,
+    resolution_data: ResolutionCreate,
+    resolved_by: User,
+) -> tuple[Resolution, dict]:
+    """
+    Create the resolution record, resolve the market, score its forecasts and
+    queue win/loss notifications
+    
+    Per-user reputation/badge/streak recomputation is left to the caller so a
+    batch of resolutions can run it once per distinct user.
+    
+    Returns:
+        Tuple of (resolution, scoring results)
+    """
+    market_id = market.id
+    
     # Create resolution record
     resolution_id = str(uuid_module.uuid4())
     resolution = Resolution(
         id=resolution_id,
         market_id=market_id,
         outcome_id=resolution_data.outcome_id,
-        resolved_by=current_user.id,
+        resolved_by=resolved_by.id,
         evidence_urls=resolution_data.evidence_urls,  # Stored as JSON array
         resolution_note=resolution_data.resolution_note,
     )
+    db.add(resolution)
+    
+    # Update market status
+    market.status = "resolved"
+    market.resolution_outcome = resolution_data.outcome_id
+    market.resolution_time = datetime.utcnow()
+    
+    db.flush()  # Ensure resolution is saved before scoring
+    
+    # Score all forecasts
+    scoring_results = score_forecasts(db, market_id, resolution_data.outcome_id)
+    
+    # Create activity for market resolution
+    from app.services.activity_service import create_activity
+    create_activity(
+        db,
+        activity_type="market_resolved",
+        market_id=market_id,
+        metadata={
+            "winning_outcome": outcome.name,
+            "resolved_by": resolved_by.id,
+            "house_edge_chips": scoring_results.get("house_edge_chips", 0),
+        }  # Will be stored as meta_data
+    )
+    
+    # Create individual win/loss notifications for each user
+    # Use async processing for large batches (>10k users) to avoid blocking the API
+    if scoring_results.get("user_results"):
+        from app.services.notification_service import create_forecast_result_notifications
+        num_users = len(scoring_results["user_results"])
+        use_async = num_users > 10000  # Use async for batches > 10k users
+        
+        create_forecast_result_notifications(
+            db,
+            scoring_results["user_results"],
+            market_id,
+            market.title,
+            outcome.name,
+            batch_size=5000,  # Process 5000 notifications per batch
+            use_async=use_async
+        )
+    
+    return resolution, scoring_results
+
+
+@router.post("/markets/{market_id}/resolve", response_model=dict, status_code=status.HTTP_201_CREATED)
+async def resolve_market(
+    market_id: str,
+    resolution_data: ResolutionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_market_moderator),
+):
+    """
+    Resolve a market (admin only)
+    
+    This endpoint:
+    1. Validates the market exists and is open
+    2. Validates the outcome exists and belongs to the market
+    3. Validates evidence URLs (min 1, min 2 for elections)
+    4. Creates resolution record (immutable)
+    5. Updates market status to 'resolved'
+    6. Scores all forecasts (won/lost)
+    """
+    market, outcome = validate_resolution(db, market_id, resolution_data)
     
     # Atomic transaction: Create resolution + Update market + Score forecasts
     try:
-        db.add(resolution)
+        resolution, scoring_results = apply_resolution(db, market, outcome, resolution_data, current_user)
+        
+        # Recalculate reputation, badges and activity streaks for all users who had forecasts on this market
+        # (score_forecasts already advanced their winning streaks)
+        from app.services.recompute_service import recompute_user_derived_fields
+        user_ids = {result["user_id"] for result in scoring_results["user_results"]}
+        recompute_user_derived_fields(db, user_ids, winning_streaks=False)
+        
+        db.commit()
+        
+        # Re-rank the leaderboards and drop cached biggest wins after resolution
+        from app.services.leaderboard_service import request_leaderboard_refresh, invalidate_biggest_wins_cache
+        request_leaderboard_refresh()
+        invalidate_biggest_wins_cache()
+        db.refresh(resolution)
+        db.refresh(market)
+        
+        return {
+            "success": True,
+            "data": {
+                "resolution": ResolutionResponse.model_validate(resolution),
+                "market": {
+                    "id": market.id,
+                    "status": market.status,
+                    "resolution_outcome": market.resolution_outcome,
+                    "resolution_time": market.resolution_time,
+                },
+                "scoring": scoring_results,
+            },
+            "message": f"Market resolved successfully. {scoring_results['won']} forecasts won, {scoring_results['lost']} forecasts lost. {scoring_results['total_rewards']} chips distributed to winners. {scoring_results['house_edge_chips']} chips retained as house edge.",
+        }
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to resolve market: {str(e)}",
+        )
+
+
+@router.post("/markets/resolve-batch", response_model=dict, status_code=status.HTTP_201_CREATED)
+async def resolve_markets_batch(
+    batch_data: BatchResolutionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_market_moderator),
+):
+    """
+    Resolve several markets in one request (admin only)
+    
+    Each market is validated, resolved and scored exactly like the single
+    resolve endpoint. Reputation, badges and streaks are then recomputed once
+    per distinct user across the whole batch instead of once per market,
+    optionally spread across `workers` processes.
+    
+    All markets are validated before any is resolved. A market that fails while
+    scoring is rolled back and reported in `failed`; the others still resolve.
+    """
+    market_ids = [item.market_id for item in batch_data.resolutions]
+    if len(set(market_ids)) != len(market_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each market can only appear once in a batch",
+        )
+    
+    # Validate every triple up front so a bad entry fails the batch before anything is scored
+    validated = [
+        (item, *validate_resolution(db, item.market_id, item))
+        for item in batch_data.resolutions
+    ]
+    
+    resolved = []
+    failed = []
+    affected_user_ids = set()
+    
+    for item, market, outcome in validated:
+        try:
+            resolution, scoring_results = apply_resolution(db, market, outcome, item, current_user)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            failed.append({"market_id": item.market_id, "error": str(e)})
+            continue
+        
+        affected_user_ids.update(result["user_id"] for result in scoring_results["user_results"])
+        resolved.append({
+            "market_id": item.market_id,
+            "resolution_id": resolution.id,
+            "outcome_id": item.outcome_id,
+            "won": scoring_results["won"],
+            "lost": scoring_results["lost"],
+            "total_rewards": scoring_results["total_rewards"],
+            "house_edge_chips": scoring_results["house_edge_chips"],
+        })
+    
+    # Downstream recomputation once per distinct user across the batch
+    from app.services.recompute_service import (
+        recompute_user_derived_fields,
+        recompute_users_in_pool,
+    )
+    try:
+        if batch_data.workers > 1:
+            users_recomputed = recompute_users_in_pool(
+                affected_user_ids, workers=batch_data.workers, winning_streaks=False
+            )
+        else:
+            users_recomputed = recompute_user_derived_fields(db, affected_user_ids, winning_streaks=False)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Markets resolved but user recomputation failed: {str(e)}",
+        )
+    
+    # Re-rank the leaderboards and drop cached biggest wins once for the whole batch
+    from app.services.leaderboard_service import request_leaderboard_refresh, invalidate_biggest_wins_cache
+    request_leaderboard_refresh()
+    invalidate_biggest_wins_cache()
+    
+    return {
+        "success": not failed,
+        "data": {
+            "resolved": resolved,
+            "failed": failed,
+            "users_recomputed": users_recomputed,
+        },
+        "message": f"Resolved {len(resolved)} of {len(validated)} markets. Recomputed {users_recomputed} users.",
+    }
+
+
+def reverse_forecast_scoring(db: Session, market_id: str) -> dict:
+    """
+    Undo score_forecasts for a market in bulk:
+    - Debit each previous winner's stored reward_amount from their chip balance
+    - Reset every won/lost forecast to 'pending' with no reward or scores
+    
+    One statement: a data-modifying CTE resets the forecasts and returns their
+    previous rewards, which are summed per user and subtracted from users.chips.
+    Balances can go negative if a winner already spent the reward.
+    
+    Returns:
+        Dict with the affected user IDs, chips reversed and forecasts reset
+    """
+    previous = (
+        select(Forecast.id, Forecast.user_id, Forecast.reward_amount)
+        .where(
+            Forecast.market_id == market_id,
+            Forecast.status.in_(['won', 'lost']),
+        )
+        .subquery("previous")
+    )
+    reversed_forecasts = (
+        update(Forecast)
+        .where(Forecast.id == previous.c.id)
+        .values(status="pending", reward_amount=None, brier_score=None, log_score=None)
+        .returning(previous.c.user_id, previous.c.reward_amount)
+        .cte("reversed_forecasts")
+    )
+    per_user = (
+        select(
+            reversed_forecasts.c.user_id,
+            func.coalesce(func.sum(reversed_forecasts.c.reward_amount), 0).label("chips"),
+            func.count().label("forecasts"),
+        )
+        .group_by(reversed_forecasts.c.user_id)
+        .cte("per_user")
+    )
+    rows = db.execute(
+        update(User)
+        .where(User.id == per_user.c.user_id)
+        .values(chips=User.chips - per_user.c.chips)
+        .returning(User.id, per_user.c.chips, per_user.c.forecasts)
+        .execution_options(synchronize_session=False)
+    ).all()
+    
+    # Loaded ORM objects (users, forecasts) are now stale
+    db.expire_all()
+    
+    return {
+        "user_ids": [user_id for user_id, _, _ in rows],
+        "chips_reversed": int(sum(chips for _, chips, _ in rows)),
+        "forecasts_reset": sum(forecasts for _, _, forecasts in rows),
+    }
+
+
+@router.post("/markets/{market_id}/resolution/correct", response_model=dict)
+async def correct_market_resolution(
+    market_id: str,
+    correction_data: ResolutionCorrectionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    """
+    Correct a mistaken resolution (admin only)
+    
+    This endpoint:
+    1. Reverses the original scoring in bulk (debits stored reward_amount, resets forecasts to pending)
+    2. Points the resolution and market at the corrected outcome
+    3. Re-scores all forecasts against the corrected outcome
+    4. Notifies affected users and recomputes their reputation, badges and streaks once each
+    5. Records an audit entry in resolution_corrections
+    """
+    market = db.query(Market).filter(Market.id == market_id).first()
+    if not market:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Market not found",
+        )
+    
+    resolution = db.query(Resolution).filter(Resolution.market_id == market_id).first()
+    if market.status != "resolved" or not resolution:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only resolved markets can be corrected",
+        )
+    
+    if correction_data.outcome_id == resolution.outcome_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Market is already resolved to this outcome",
+        )
+    
+    outcome = db.query(Outcome).filter(
+        Outcome.id == correction_data.outcome_id,
+        Outcome.market_id == market_id,
+    ).first()
+    if not outcome:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Outcome not found or does not belong to this market",
+        )
+    
+    validate_evidence_urls(correction_data.evidence_urls, market.category)
+    
+    previous_outcome_id = resolution.outcome_id
+    
+    # Atomic transaction: Reverse scoring + Re-point resolution + Re-score (committed by score_forecasts)
+    try:
+        reversal = reverse_forecast_scoring(db, market_id)
+        
+        # user_stats and winning streaks still count the reversed forecasts as won/lost;
+        # rebuild those users so the incremental updates in score_forecasts start from pending
+        from app.services.user_stats_service import reconcile_user_stats
+        from app.services.streak_service import refresh_winning_streaks
+        reconcile_user_stats(db, reversal["user_ids"])
+        refresh_winning_streaks(db, reversal["user_ids"])
         
-        # Update market status
-        market.status = "resolved"
-        market.resolution_outcome = resolution_data.outcome_id
-        market.resolution_time = datetime.utcnow()
+        # Reload after the bulk reversal expired the session
+        market = db.query(Market).filter(Market.id == market_id).first()
+        resolution = db.query(Resolution).filter(Resolution.market_id == market_id).first()
         
-        db.flush()  # Ensure resolution is saved before scoring
+        resolution.outcome_id = correction_data.outcome_id
+        market.resolution_outcome = correction_data.outcome_id
         
-        # Score all forecasts
-        scoring_results = score_forecasts(db, market_id, resolution_data.outcome_id)
+        scoring_results = score_forecasts(db, market_id, correction_data.outcome_id)
         
-        # Get winning outcome name for activity
-        winning_outcome_obj = db.query(Outcome).filter(Outcome.id == resolution_data.outcome_id).first()
+        correction = ResolutionCorrection(
+            id=str(uuid_module.uuid4()),
+            resolution_id=resolution.id,
+            market_id=market_id,
+            previous_outcome_id=previous_outcome_id,
+            corrected_outcome_id=correction_data.outcome_id,
+            corrected_by=current_user.id,
+            evidence_urls=correction_data.evidence_urls,
+            reason=correction_data.reason,
+            chips_reversed=reversal["chips_reversed"],
+            chips_awarded=scoring_results["total_rewards"],
+            forecasts_rescored=scoring_results["total"],
+            users_affected=len(reversal["user_ids"]),
+        )
+        db.add(correction)
         
-        # Create activity for market resolution
         from app.services.activity_service import create_activity
         create_activity(
             db,
-            activity_type="market_resolved",
+            activity_type="market_resolution_corrected",
             market_id=market_id,
             metadata={
-                "winning_outcome": winning_outcome_obj.name if winning_outcome_obj else "Unknown",
-                "resolved_by": current_user.id,
-                "house_edge_chips": scoring_results.get("house_edge_chips", 0),
-            }  # Will be stored as meta_data
+                "previous_outcome_id": previous_outcome_id,
+                "winning_outcome": outcome.name,
+                "corrected_by": current_user.id,
+            }
         )
         
-        # Create individual win/loss notifications for each user
-        # Use async processing for large batches (>10k users) to avoid blocking the API
         if scoring_results.get("user_results"):
             from app.services.notification_service import create_forecast_result_notifications
-            num_users = len(scoring_results["user_results"])
-            use_async = num_users > 10000  # Use async for batches > 10k users
-            
             create_forecast_result_notifications(
                 db,
                 scoring_results["user_results"],
                 market_id,
                 market.title,
-                winning_outcome_obj.name if winning_outcome_obj else "Unknown",
-                batch_size=5000,  # Process 5000 notifications per batch
-                use_async=use_async
+                outcome.name,
+                batch_size=5000,
+                use_async=len(scoring_results["user_results"]) > 10000,
+                corrected=True,
             )
         
-        # Recalculate reputation for all users who had forecasts on this market
-        from app.services.reputation_service import calculate_reputation
-        from app.models.reputation_history import ReputationHistory
-        from app.models.user import User
-        
-        # Get unique user IDs who had forecasts
-        user_ids = db.query(Forecast.user_id).filter(
-            Forecast.market_id == market_id
-        ).distinct().all()
-        
-        for (user_id,) in user_ids:
-            user = db.query(User).filter(User.id == user_id).first()
-            if user:
-                # Calculate new reputation
-                new_reputation = calculate_reputation(db, user_id)
-                
-                # Update user reputation
-                user.reputation = new_reputation
-                
-                # Record in history
-                history_entry = ReputationHistory(
-                    id=str(uuid_module.uuid4()),
-                    user_id=user_id,
-                    reputation=new_reputation,
-                    accuracy_score=None,  # Could calculate and store if needed
-                    total_forecast_points=None,  # Could calculate and store if needed
-                )
-                db.add(history_entry)
-                
-                # Check and award badges
-                from app.services.badge_service import check_and_award_badges
-                check_and_award_badges(db, user_id)
-                
-                # Update streaks
-                from app.services.streak_service import update_user_streaks
-                update_user_streaks(db, user_id)
-        
         db.commit()
         
-        # Invalidate leaderboard cache after resolution
-        from app.services.leaderboard_service import invalidate_leaderboard_cache
-        invalidate_leaderboard_cache()
-        db.refresh(resolution)
-        db.refresh(market)
+        # Recalculate reputation, badges and streaks once per affected user
+        from app.services.recompute_service import recompute_user_derived_fields
+        user_ids = set(reversal["user_ids"]) | {r["user_id"] for r in scoring_results["user_results"]}
+        recompute_user_derived_fields(db, user_ids)
+        
+        from app.services.leaderboard_service import request_leaderboard_refresh, invalidate_biggest_wins_cache
+        request_leaderboard_refresh()
+        invalidate_biggest_wins_cache()
+        db.refresh(correction)
         
         return {
             "success": True,
             "data": {
-                "resolution": ResolutionResponse.model_validate(resolution),
-                "market": {
-                    "id": market.id,
-                    "status": market.status,
-                    "resolution_outcome": market.resolution_outcome,
-                    "resolution_time": market.resolution_time,
-                },
-                "scoring": scoring_results,
+                "correction": ResolutionCorrectionResponse.model_validate(correction),
+                "scoring": {key: value for key, value in scoring_results.items() if key != "user_results"},
             },
-            "message": f"Market resolved successfully. {scoring_results['won']} forecasts won, {scoring_results['lost']} forecasts lost. {scoring_results['total_rewards']} chips distributed to winners. {scoring_results['house_edge_chips']} chips retained as house edge.",
+            "message": f"Resolution corrected. {reversal['chips_reversed']} chips reversed, {scoring_results['total_rewards']} chips distributed to {scoring_results['won']} corrected winners.",
         }
     except Exception as e:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to resolve market: {str(e)}",
+            detail=f"Failed to correct resolution: {str(e)}",
         )
 
 
@@ -3,12 +3,13 @@ User endpoints
 """
 import uuid as uuid_module
 import os
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
 from fastapi.responses import JSONResponse
 from starlette.requests import Request
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate, UserProfile
 from app.dependencies import get_current_user
@@ -242,7 +243,9 @@ async def upload_profile_avatar(
 async def get_reputation_history(
     user_id: str,
     db: Session = Depends(get_db),
-    limit: int = 100
+    limit: int = 100,
+    interval: Optional[str] = Query(None, regex="^(day|week|month)$", description="Aggregate to one point per day, week or month"),
+    max_points: Optional[int] = Query(None, ge=2, le=1000, description="Downsample to at most this many points"),
 ):
     """Get reputation history endpoint"""
     user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
@@ -254,12 +257,9 @@ async def get_reputation_history(
             "errors": [{"message": "User not found"}],
         }
     
-    from app.models.reputation_history import ReputationHistory
-    from sqlalchemy import desc
+    from app.services.reputation_history_service import get_reputation_series
     
-    history = db.query(ReputationHistory).filter(
-        ReputationHistory.user_id == user_id
-    ).order_by(desc(ReputationHistory.created_at)).limit(limit).all()
+    history = get_reputation_series(db, user_id, interval=interval, max_points=max_points, limit=limit)
     
     history_data = [
         {
@@ -278,3 +278,44 @@ async def get_reputation_history(
         },
         "errors": None,
     }
+
+
+@router.get("/{user_id}/rank-history", response_model=dict)
+async def get_user_rank_history(
+    user_id: str,
+    db: Session = Depends(get_read_db),
+    period: str = Query("global", regex="^(global|weekly|monthly)$", description="Leaderboard period"),
+    category: Optional[str] = Query(None, description="Market category (all categories if not specified)"),
+    days: int = Query(90, ge=1, le=365, description="Days of history"),
+):
+    """Get a user's daily leaderboard rank history"""
+    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    
+    if not user:
+        return {
+            "success": False,
+            "data": None,
+            "errors": [{"message": "User not found"}],
+        }
+    
+    from app.services.leaderboard_service import get_rank_history
+    
+    category = None if category == "all" else category
+    history = get_rank_history(db, user_id, period=period, category=category, days=days)
+    
+    history_data = [
+        {
+            "date": h.snapshot_date.isoformat(),
+            "rank": h.rank,
+            "rank_score": h.rank_score,
+        }
+        for h in history
+    ]
+    
+    return {
+        "success": True,
+        "data": {
+            "history": history_data,
+        },
+        "errors": None,
+    }
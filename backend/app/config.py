@@ -14,6 +14,7 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "postgresql://andersonbondoc@localhost/dev_acbmarket"
+    DATABASE_REPLICA_URL: str = ""  # Optional read replica for read-only endpoints (primary if empty)
     
     # Redis
     REDIS_HOST: str = "localhost"
@@ -18,6 +18,24 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read-only engine: the replica when configured, otherwise the primary's pool
+if settings.DATABASE_REPLICA_URL:
+    read_engine = create_engine(
+        settings.DATABASE_REPLICA_URL,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20,
+    )
+else:
+    read_engine = engine
+
+# Session factory for read-only requests (transactions are READ ONLY)
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine.execution_options(postgresql_readonly=True),
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -30,3 +48,12 @@ def get_db():
     finally:
         db.close()
 
+
+def get_read_db():
+    """Dependency for getting a read-only database session (may be served by a replica)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
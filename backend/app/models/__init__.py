@@ -3,10 +3,13 @@ from app.models.user import User
 from app.models.market import Market, Outcome
 from app.models.purchase import Purchase
 from app.models.forecast import Forecast
-from app.models.resolution import Resolution
+from app.models.resolution import Resolution, ResolutionCorrection
 from app.models.reputation_history import ReputationHistory
 from app.models.activity import Activity
 from app.models.notification import Notification
 from app.models.comment import Comment
+from app.models.user_stats import UserStats, UserDailyStats
+from app.models.category_stats import UserCategoryStats, CategoryThreshold
+from app.models.leaderboard import LeaderboardEntry, LeaderboardSnapshot
 
-__all__ = ["User", "Market", "Outcome", "Purchase", "Forecast", "Resolution", "ReputationHistory", "Activity", "Notification", "Comment"]
+__all__ = ["User", "Market", "Outcome", "Purchase", "Forecast", "Resolution", "ResolutionCorrection", "ReputationHistory", "Activity", "Notification", "Comment", "UserStats", "UserDailyStats", "UserCategoryStats", "CategoryThreshold", "LeaderboardEntry", "LeaderboardSnapshot"]
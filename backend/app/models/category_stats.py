@@ -0,0 +1,44 @@
+"""
+Category stats models
+"""
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class UserCategoryStats(Base):
+    """User category stats model - per-user accuracy and rank within a market category (batch computed)"""
+    __tablename__ = "user_category_stats"
+    
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    category = Column(String, primary_key=True)
+    
+    resolved_forecasts = Column(Integer, nullable=False)
+    won_forecasts = Column(Integer, nullable=False)
+    accuracy = Column(Float, nullable=False)  # 1 - mean Brier score (0-1)
+    percentile = Column(Float, nullable=False)  # percent_rank within the category: 0 (lowest) - 1 (highest)
+    
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    # Relationships
+    user = relationship("User", backref="category_stats")
+    
+    # Index for per-category rank queries
+    __table_args__ = (
+        Index('idx_user_category_stats_category_percentile', 'category', 'percentile'),
+    )
+
+
+class CategoryThreshold(Base):
+    """Category threshold model - accuracy percentiles per market category (batch computed)"""
+    __tablename__ = "category_thresholds"
+    
+    category = Column(String, primary_key=True)
+    p90_accuracy = Column(Float, nullable=False)  # Accuracy needed to be in the top 10%
+    users_ranked = Column(Integer, nullable=False)  # Users with enough resolved forecasts to be ranked
+    
+    # Timestamps
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
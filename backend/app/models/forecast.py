@@ -1,7 +1,7 @@
 """
 Forecast model
 """
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Boolean, UniqueConstraint, CheckConstraint, Index
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Boolean, UniqueConstraint, CheckConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -22,7 +22,12 @@ class Forecast(Base):
     points = Column(Integer, nullable=False)  # Number of chips allocated to this forecast
     reward_amount = Column(Integer, nullable=True)  # Actual reward amount when forecast wins (null if pending or lost)
     
-    # Status: pending (market not resolved), won (correct), lost (incorrect)
+    # Scoring
+    implied_probability = Column(Float, nullable=True)  # Market consensus for the chosen outcome when placed (null for legacy forecasts)
+    brier_score = Column(Float, nullable=True)  # (implied_probability - outcome)^2, set at resolution
+    log_score = Column(Float, nullable=True)  # -ln(probability assigned to what happened), set at resolution
+    
+    # Status: pending (market not resolved), won (correct), lost (incorrect), refunded (market cancelled)
     status = Column(String, default="pending", nullable=False, index=True)
     
     # Flagging
@@ -41,10 +46,11 @@ class Forecast(Base):
     __table_args__ = (
         UniqueConstraint('user_id', 'market_id', name='uq_forecast_user_market'),  # One forecast per user per market
         CheckConstraint('points > 0', name='check_points_positive'),
-        CheckConstraint("status IN ('pending', 'won', 'lost')", name='check_status'),
+        CheckConstraint("status IN ('pending', 'won', 'lost', 'refunded')", name='check_status'),
         # Optimized composite indexes for common queries
         Index('idx_forecasts_market_user_points', 'market_id', 'user_id', 'points'),  # For top holders query
         Index('idx_forecasts_market_created', 'market_id', 'created_at', postgresql_ops={'created_at': 'DESC'}),  # For market activity
         Index('idx_forecasts_user_market', 'user_id', 'market_id'),  # For user's forecast on market
+        Index('idx_forecasts_user_status_created', 'user_id', 'status', 'created_at'),  # For winning streaks
     )
 
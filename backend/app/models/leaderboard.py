@@ -0,0 +1,64 @@
+"""
+Leaderboard model
+"""
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class LeaderboardEntry(Base):
+    """Leaderboard entry model - a user's precomputed rank per period and category (batch refreshed)"""
+    __tablename__ = "leaderboard_entries"
+    
+    period = Column(String, primary_key=True)  # global, weekly, monthly
+    category = Column(String, primary_key=True)  # Market category or "all"
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    
+    rank = Column(Integer, nullable=False)  # By rank_score
+    profit_rank = Column(Integer, nullable=False)  # By profit_loss
+    volume_rank = Column(Integer, nullable=False)  # By volume
+    rank_score = Column(Float, nullable=False)
+    reputation = Column(Float, nullable=False)
+    winning_streak = Column(Integer, nullable=False)
+    activity_streak = Column(Integer, nullable=False)
+    total_forecasts = Column(Integer, nullable=False)
+    
+    # Over the forecasts in the period/category
+    forecasts = Column(Integer, nullable=False)
+    won_forecasts = Column(Integer, nullable=False)
+    lost_forecasts = Column(Integer, nullable=False)
+    profit_loss = Column(Integer, nullable=False)
+    volume = Column(Integer, nullable=False)
+    
+    # Timestamps
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    # Relationships
+    user = relationship("User")
+    
+    # Indexes for reading a ranked slice in each sort order
+    __table_args__ = (
+        Index('idx_leaderboard_entries_scope_rank', 'period', 'category', 'rank'),
+        Index('idx_leaderboard_entries_scope_profit_rank', 'period', 'category', 'profit_rank'),
+        Index('idx_leaderboard_entries_scope_volume_rank', 'period', 'category', 'volume_rank'),
+    )
+
+
+class LeaderboardSnapshot(Base):
+    """Leaderboard snapshot model - a user's rank per period and category on a given day (daily job)"""
+    __tablename__ = "leaderboard_snapshots"
+    
+    snapshot_date = Column(Date, primary_key=True)
+    period = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    
+    rank = Column(Integer, nullable=False)
+    rank_score = Column(Float, nullable=False)
+    
+    # Index for per-user rank history
+    __table_args__ = (
+        Index('idx_leaderboard_snapshots_user_date', 'user_id', 'snapshot_date'),
+    )
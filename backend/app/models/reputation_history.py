@@ -19,6 +19,9 @@ class ReputationHistory(Base):
     accuracy_score = Column(Float, nullable=True)  # Accuracy score used in calculation
     total_forecast_points = Column(Float, nullable=True)  # Total points at this point
     
+    # Compaction: raw (per recompute), daily or weekly (last value of the bucket, created_at = bucket start)
+    granularity = Column(String, default="raw", nullable=False)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     
@@ -1,7 +1,7 @@
 """
 Resolution model
 """
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, JSON, UniqueConstraint
+from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -10,7 +10,7 @@ from app.database import Base
 
 
 class Resolution(Base):
-    """Resolution model - Immutable record of market resolution"""
+    """Resolution model - Record of market resolution (changed only through an audited correction)"""
     __tablename__ = "resolutions"
 
     id = Column(String, primary_key=True, index=True)
@@ -24,10 +24,40 @@ class Resolution(Base):
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
-    # Note: No updated_at - resolutions are immutable
+    # Note: No updated_at - corrections are recorded in resolution_corrections
     
     # Relationships
     market = relationship("Market", backref="resolution")
     outcome = relationship("Outcome", backref="resolutions")
     resolver = relationship("User", foreign_keys=[resolved_by])
 
+
+
+class ResolutionCorrection(Base):
+    """Resolution correction model - Audit record of a reversed and re-scored resolution"""
+    __tablename__ = "resolution_corrections"
+
+    id = Column(String, primary_key=True, index=True)
+    resolution_id = Column(String, ForeignKey("resolutions.id", ondelete="CASCADE"), nullable=False, index=True)
+    market_id = Column(String, ForeignKey("markets.id", ondelete="CASCADE"), nullable=False, index=True)
+    previous_outcome_id = Column(String, ForeignKey("outcomes.id", ondelete="CASCADE"), nullable=False)
+    corrected_outcome_id = Column(String, ForeignKey("outcomes.id", ondelete="CASCADE"), nullable=False)
+    corrected_by = Column(String, ForeignKey("users.id"), nullable=False, index=True)  # Admin who corrected
+    
+    # Correction details
+    evidence_urls = Column(JSON, nullable=False)  # Evidence for the corrected outcome
+    reason = Column(Text, nullable=False)  # Why the original resolution was wrong
+    
+    # Reversal summary
+    chips_reversed = Column(Integer, nullable=False, default=0)  # Rewards taken back from previous winners
+    chips_awarded = Column(Integer, nullable=False, default=0)  # Rewards credited to corrected winners
+    forecasts_rescored = Column(Integer, nullable=False, default=0)
+    users_affected = Column(Integer, nullable=False, default=0)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    
+    # Relationships
+    resolution = relationship("Resolution", backref="corrections")
+    market = relationship("Market")
+    corrector = relationship("User", foreign_keys=[corrected_by])
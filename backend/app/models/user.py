@@ -1,7 +1,8 @@
 """
 User model
 """
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, JSON
+from sqlalchemy import Column, String, Integer, SmallInteger, Float, Boolean, Date, DateTime, Text, JSON, Index
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -27,11 +28,13 @@ class User(Base):
     # Reputation system
     reputation = Column(Float, default=0.0, nullable=False)  # 0-100 scale
     rank_score = Column(Float, default=0.0, nullable=False)  # For leaderboard
-    badges = Column(JSON, nullable=True, default=list)  # List of badge IDs (JSON array)
+    badges = Column(JSON, nullable=True, default=list)  # List of badge IDs (JSON array, API output order)
+    badge_codes = Column(ARRAY(SmallInteger), nullable=False, default=list, server_default="{}")  # Same badges as codes (see BADGE_CODES), GIN indexed
     
     # Streaks
     winning_streak = Column(Integer, default=0, nullable=False)  # Consecutive correct forecasts
-    activity_streak = Column(Integer, default=0, nullable=False)  # Consecutive days with activity
+    activity_streak = Column(Integer, default=0, nullable=False)  # Consecutive days with activity, ending on last_active_date
+    last_active_date = Column(Date, nullable=True)  # UTC day of the most recent forecast
     
     # Account status
     is_active = Column(Boolean, default=True, nullable=False)
@@ -49,4 +52,8 @@ class User(Base):
     # Password reset
     reset_token = Column(String, nullable=True)
     reset_token_expires = Column(DateTime(timezone=True), nullable=True)
-
+    
+    # Indexes
+    __table_args__ = (
+        Index('idx_users_badge_codes', 'badge_codes', postgresql_using='gin'),  # For badge holder queries
+    )
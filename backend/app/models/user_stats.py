@@ -0,0 +1,67 @@
+"""
+User stats model
+"""
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship, backref
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class UserStats(Base):
+    """User stats model - per-user forecast aggregates maintained incrementally"""
+    __tablename__ = "user_stats"
+    
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    
+    # Counts
+    total_forecasts = Column(Integer, default=0, nullable=False)
+    pending_forecasts = Column(Integer, default=0, nullable=False)
+    won_forecasts = Column(Integer, default=0, nullable=False)
+    lost_forecasts = Column(Integer, default=0, nullable=False)
+    
+    # Points (chips allocated)
+    total_points = Column(Integer, default=0, nullable=False)
+    pending_points = Column(Integer, default=0, nullable=False)  # Positions value
+    won_points = Column(Integer, default=0, nullable=False)
+    lost_points = Column(Integer, default=0, nullable=False)
+    
+    # Profit
+    profit_loss = Column(Integer, default=0, nullable=False)
+    biggest_win = Column(Integer, nullable=True)  # Null until the user wins a forecast
+    
+    # Accuracy (sum of per-forecast Brier scores over resolved forecasts)
+    brier_score_sum = Column(Float, default=0.0, nullable=False)
+    
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    # Relationships
+    user = relationship("User", backref=backref("stats", uselist=False))
+
+
+class UserDailyStats(Base):
+    """User daily stats model - per-user forecast aggregates per placement day and market category"""
+    __tablename__ = "user_daily_stats"
+    
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    category = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC day the forecasts were placed
+    
+    # Counts
+    forecasts = Column(Integer, default=0, nullable=False)
+    won_forecasts = Column(Integer, default=0, nullable=False)
+    lost_forecasts = Column(Integer, default=0, nullable=False)
+    
+    # Points (chips allocated)
+    volume = Column(Integer, default=0, nullable=False)
+    won_points = Column(Integer, default=0, nullable=False)
+    lost_points = Column(Integer, default=0, nullable=False)
+    
+    # Profit (once the forecasts resolve)
+    profit_loss = Column(Integer, default=0, nullable=False)
+    
+    # Index for rolling-window scans
+    __table_args__ = (
+        Index('idx_user_daily_stats_day_category', 'day', 'category'),
+    )
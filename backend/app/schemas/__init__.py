@@ -43,8 +43,12 @@ from app.schemas.forecast import (
 from app.schemas.resolution import (
     ResolutionBase,
     ResolutionCreate,
+    BatchResolutionItem,
+    BatchResolutionCreate,
     ResolutionResponse,
     ResolutionDetailResponse,
+    ResolutionCorrectionCreate,
+    ResolutionCorrectionResponse,
 )
 from app.schemas.activity import (
     ActivityBase,
@@ -94,8 +98,12 @@ __all__ = [
     "ForecastListResponse",
     "ResolutionBase",
     "ResolutionCreate",
+    "BatchResolutionItem",
+    "BatchResolutionCreate",
     "ResolutionResponse",
     "ResolutionDetailResponse",
+    "ResolutionCorrectionCreate",
+    "ResolutionCorrectionResponse",
     "ActivityBase",
     "ActivityCreate",
     "ActivityResponse",
@@ -109,6 +109,11 @@ class SuspendMarketRequest(BaseModel):
     reason: Optional[str] = None
 
 
+class CancelMarketRequest(BaseModel):
+    """Cancel market request (all pending forecasts are refunded)"""
+    reason: Optional[str] = None
+
+
 class BanUserRequest(BaseModel):
     """Ban user request"""
     reason: Optional[str] = None
@@ -31,7 +31,9 @@ class ForecastResponse(BaseModel):
     outcome_id: str
     points: int
     reward_amount: Optional[int] = None  # Actual reward amount when forecast wins (null if pending or lost)
-    status: str  # pending, won, lost
+    implied_probability: Optional[float] = None  # Market consensus for the chosen outcome when placed
+    brier_score: Optional[float] = None  # Set at resolution
+    status: str  # pending, won, lost, refunded
     is_flagged: bool
     created_at: datetime
     updated_at: datetime
@@ -18,6 +18,17 @@ class ResolutionCreate(ResolutionBase):
     pass
 
 
+class BatchResolutionItem(ResolutionBase):
+    """One market resolution within a batch"""
+    market_id: str = Field(..., description="ID of the market to resolve")
+
+
+class BatchResolutionCreate(BaseModel):
+    """Batch resolution schema (resolve several related markets at once)"""
+    resolutions: List[BatchResolutionItem] = Field(..., min_items=1, max_items=100, description="Markets to resolve")
+    workers: int = Field(1, ge=1, le=16, description="Worker processes for reputation/badge/streak recomputation")
+
+
 class ResolutionResponse(ResolutionBase):
     """Resolution response schema"""
     id: str
@@ -35,3 +46,30 @@ class ResolutionDetailResponse(ResolutionResponse):
     resolver_name: Optional[str] = None
     market_title: Optional[str] = None
 
+
+
+class ResolutionCorrectionCreate(BaseModel):
+    """Resolution correction schema (admin only)"""
+    outcome_id: str = Field(..., description="ID of the correct winning outcome")
+    evidence_urls: List[str] = Field(..., min_items=1, description="Evidence for the corrected outcome (min 2 for elections)")
+    reason: str = Field(..., min_length=10, max_length=5000, description="Why the original resolution was wrong")
+
+
+class ResolutionCorrectionResponse(BaseModel):
+    """Resolution correction audit record"""
+    id: str
+    resolution_id: str
+    market_id: str
+    previous_outcome_id: str
+    corrected_outcome_id: str
+    corrected_by: str
+    evidence_urls: List[str]
+    reason: str
+    chips_reversed: int
+    chips_awarded: int
+    forecasts_rescored: int
+    users_affected: int
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
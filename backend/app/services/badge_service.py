@@ -1,14 +1,13 @@
 """
 Badge system service
 """
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, desc
+from sqlalchemy import and_, case, func, desc, select
 
 from app.models.user import User
 from app.models.forecast import Forecast
-from app.models.market import Market
 from app.models.resolution import Resolution
 from app.services.reputation_service import calculate_reputation, get_user_forecast_stats
 
@@ -54,171 +53,266 @@ BADGE_DEFINITIONS = {
 }
 
 
-def check_newbie_badge(db: Session, user_id: str) -> bool:
-    """Check if user qualifies for Newbie badge (3+ forecasts)"""
-    forecast_count = db.query(Forecast).filter(Forecast.user_id == user_id).count()
-    return forecast_count >= 3
+# Badge registry: stable small-integer code per badge ID, stored in users.badge_codes.
+# Append only - never reuse or renumber a code.
+BADGE_CODES = {
+    "newbie": 1,
+    "accurate": 2,
+    "climber": 3,
+    "specialist": 4,
+    "veteran": 5,
+    "perfect_week": 6,
+    "specialist_election": 101,
+    "specialist_politics": 102,
+    "specialist_sports": 103,
+    "specialist_entertainment": 104,
+    "specialist_economy": 105,
+    "specialist_weather": 106,
+}
+BADGE_IDS_BY_CODE = {code: badge_id for badge_id, code in BADGE_CODES.items()}
 
+# Events that can change badge eligibility
+BADGE_EVENT_FORECAST_PLACED = "forecast_placed"  # Forecast counts
+BADGE_EVENT_MARKET_RESOLVED = "market_resolved"  # Accuracy, weekly results
+BADGE_EVENT_CATEGORY_RANKS_UPDATED = "category_ranks_updated"  # Nightly category percentiles
 
-def check_accurate_badge(db: Session, user_id: str) -> bool:
-    """Check if user qualifies for Accurate badge (accuracy > 75%)"""
-    from app.services.reputation_service import calculate_brier_score
+# Categories with a Specialist badge
+SPECIALIST_CATEGORIES = ['election', 'politics', 'sports', 'entertainment', 'economy', 'weather']
+
+def _specialist_rule(category: str) -> Dict:
+    """Specialist rule for a category: ranked in its top 10% by the nightly batch job"""
+    top = f"{category}_top"
+    return {
+        "events": [BADGE_EVENT_CATEGORY_RANKS_UPDATED],
+        "aggregates": [top],
+        "check": lambda a: bool(a[top]),
+    }
+
+
+# Badge rules: the events that can trigger each rule, the aggregates it needs
+# and a check evaluated in memory on them
+BADGE_RULES = {
+    "newbie": {
+        "events": [BADGE_EVENT_FORECAST_PLACED],
+        "aggregates": ["total_forecasts"],
+        "check": lambda a: a["total_forecasts"] >= 3,
+    },
+    "accurate": {
+        # Mean Brier score < 0.25 (accuracy > 75%), at least 5 resolved forecasts
+        "events": [BADGE_EVENT_MARKET_RESOLVED],
+        "aggregates": ["resolved_forecasts", "brier_score_sum"],
+        "check": lambda a: (
+            a["resolved_forecasts"] >= 5
+            and 1.0 - (a["brier_score_sum"] / a["resolved_forecasts"]) > 0.75
+        ),
+    },
+    "veteran": {
+        "events": [BADGE_EVENT_FORECAST_PLACED],
+        "aggregates": ["total_forecasts"],
+        "check": lambda a: a["total_forecasts"] >= 100,
+    },
+    "perfect_week": {
+        # Won all forecasts placed in the last 7 days (min 5 resolved)
+        "events": [BADGE_EVENT_MARKET_RESOLVED],
+        "aggregates": ["week_resolved", "week_won"],
+        "check": lambda a: a["week_resolved"] >= 5 and a["week_won"] == a["week_resolved"],
+    },
+    **{f"specialist_{category}": _specialist_rule(category) for category in SPECIALIST_CATEGORIES},
+}
+
+
+def badge_aggregate_columns(names: Iterable[str]) -> list:
+    """
+    Labelled aggregate columns over Forecast grouped by user
     
-    forecasts = db.query(Forecast).filter(
-        Forecast.user_id == user_id,
-        Forecast.status.in_(['won', 'lost'])
-    ).all()
+    Category aggregates are lookups into the batch-computed category ranks.
+    """
+    from app.services.category_stats_service import top_category_expr
     
-    if len(forecasts) < 5:  # Need at least 5 resolved forecasts
-        return False
+    resolved = Forecast.status.in_(['won', 'lost'])
+    won = Forecast.status == 'won'
+    recent = Forecast.created_at >= datetime.utcnow() - timedelta(days=7)
+    # Forecasts resolved before Brier scores were stored count as p = 1
+    brier_score = func.coalesce(Forecast.brier_score, case((won, 0.0), else_=1.0))
     
-    # Get markets
-    market_ids = [f.market_id for f in forecasts]
-    markets = {
-        market.id: market
-        for market in db.query(Market).filter(Market.id.in_(market_ids)).all()
+    aggregates = {
+        "total_forecasts": func.count(Forecast.id),
+        "resolved_forecasts": func.count(Forecast.id).filter(resolved),
+        "brier_score_sum": func.coalesce(func.sum(brier_score).filter(resolved), 0.0),
+        "week_resolved": func.count(Forecast.id).filter(and_(resolved, recent)),
+        "week_won": func.count(Forecast.id).filter(and_(won, recent)),
     }
+    for category in SPECIALIST_CATEGORIES:
+        aggregates[f"{category}_top"] = top_category_expr(Forecast.user_id, category)
+    
+    return [aggregates[name].label(name) for name in names]
+
+
+def fetch_badge_aggregates(db: Session, user_ids: List[str], names: Iterable[str]) -> Dict[str, Dict]:
+    """
+    Fetch the named aggregates for many users in one grouped query
+    
+    Returns:
+        Dict of user_id -> {aggregate name: value} (zeros for users without forecasts)
+    """
+    names = sorted(set(names))
+    result = {user_id: {name: 0 for name in names} for user_id in user_ids}
+    if not names or not user_ids:
+        return result
     
-    # Load outcomes
-    from app.models.market import Outcome
-    for market in markets.values():
-        market.outcomes = db.query(Outcome).filter(Outcome.market_id == market.id).all()
+    query = (
+        select(Forecast.user_id, *badge_aggregate_columns(names))
+        .where(Forecast.user_id.in_(user_ids))
+        .group_by(Forecast.user_id)
+    )
+    for row in db.execute(query).mappings():
+        result[row["user_id"]] = {name: row[name] or 0 for name in names}
     
-    # calculate_brier_score returns accuracy (0-1, higher is better)
-    accuracy = calculate_brier_score(forecasts, markets)
-    # Accurate badge: accuracy > 75%
-    return accuracy > 0.75
+    return result
+
+
+def evaluate_badge_rules(aggregates: Dict, badge_ids: Iterable[str]) -> List[str]:
+    """Return the badge IDs whose rules pass on a user's aggregates (no queries)"""
+    return [badge_id for badge_id in badge_ids if BADGE_RULES[badge_id]["check"](aggregates)]
+
+
+def check_badge(db: Session, user_id: str, badge_id: str) -> bool:
+    """Check a single badge rule for a user"""
+    rule = BADGE_RULES[badge_id]
+    aggregates = fetch_badge_aggregates(db, [user_id], rule["aggregates"])[user_id]
+    return rule["check"](aggregates)
+
+
+def check_newbie_badge(db: Session, user_id: str) -> bool:
+    """Check if user qualifies for Newbie badge (3+ forecasts)"""
+    return check_badge(db, user_id, "newbie")
+
+
+def check_accurate_badge(db: Session, user_id: str) -> bool:
+    """Check if user qualifies for Accurate badge (accuracy > 75%)"""
+    return check_badge(db, user_id, "accurate")
 
 
 def check_veteran_badge(db: Session, user_id: str) -> bool:
     """Check if user qualifies for Veteran badge (100+ forecasts)"""
-    forecast_count = db.query(Forecast).filter(Forecast.user_id == user_id).count()
-    return forecast_count >= 100
+    return check_badge(db, user_id, "veteran")
 
 
 def check_perfect_week_badge(db: Session, user_id: str) -> bool:
     """Check if user qualifies for Perfect Week badge (won all forecasts in a week, min 5)"""
-    # Get forecasts from the last 7 days
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    
-    recent_forecasts = db.query(Forecast).filter(
-        Forecast.user_id == user_id,
-        Forecast.created_at >= week_ago,
-        Forecast.status.in_(['won', 'lost'])
-    ).all()
-    
-    if len(recent_forecasts) < 5:
-        return False
-    
-    # Check if all are won
-    return all(f.status == 'won' for f in recent_forecasts)
+    return check_badge(db, user_id, "perfect_week")
 
 
 def check_specialist_badge(db: Session, user_id: str, category: str) -> bool:
     """
     Check if user qualifies for Specialist badge in a category (top 10%)
-    This is a simplified version - in production, would compare against all users
+    Ranks come from the nightly category stats job (see category_stats_service)
     """
-    # Get user's accuracy in this category
-    category_markets = db.query(Market).filter(Market.category == category).all()
-    market_ids = [m.id for m in category_markets]
-    
-    user_forecasts = db.query(Forecast).filter(
-        Forecast.user_id == user_id,
-        Forecast.market_id.in_(market_ids),
-        Forecast.status.in_(['won', 'lost'])
-    ).all()
-    
-    if len(user_forecasts) < 5:
-        return False
-    
-    won_count = sum(1 for f in user_forecasts if f.status == 'won')
-    accuracy = won_count / len(user_forecasts)
-    
-    # Simplified: if accuracy > 70%, consider them top 10%
-    # In production, would compare against all users' accuracies in this category
-    return accuracy > 0.70
+    return check_badge(db, user_id, f"specialist_{category}")
 
 
-def check_and_award_badges(db: Session, user_id: str) -> List[str]:
-    """
-    Check all badge criteria and award eligible badges
-    
-    Returns:
-        List of newly awarded badge IDs
-    """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+def parse_badges(badges) -> List[str]:
+    """Normalize a stored badges value (JSON list, JSON string or None) to a list"""
+    if badges is None:
         return []
-    
-    # Get current badges (stored as JSON in user model)
-    current_badges = getattr(user, 'badges', [])
-    if current_badges is None:
-        current_badges = []
-    if not isinstance(current_badges, list):
+    if not isinstance(badges, list):
         # If stored as string or other format, try to parse
         import json
         try:
-            if isinstance(current_badges, str):
-                current_badges = json.loads(current_badges) if current_badges else []
-            else:
-                current_badges = []
+            if isinstance(badges, str):
+                return json.loads(badges) if badges else []
+            return []
         except:
-            current_badges = []
+            return []
+    return badges
+
+
+def get_badge_name(badge_id: str) -> str:
+    """Display name for a badge ID"""
+    if badge_id.startswith("specialist_"):
+        category = badge_id.replace("specialist_", "")
+        return f"{category.title()} Specialist"
+    if badge_id in BADGE_DEFINITIONS:
+        return BADGE_DEFINITIONS[badge_id]["name"]
+    return badge_id.replace("_", " ").title()
+
+
+def badge_codes_for(badge_ids: Iterable[str]) -> List[int]:
+    """Sorted registry codes for badge IDs (unknown IDs are skipped)"""
+    return sorted({BADGE_CODES[badge_id] for badge_id in badge_ids if badge_id in BADGE_CODES})
+
+
+def has_badge(user: User, badge_id: str) -> bool:
+    """Check whether a user holds a badge from its code (no JSON parsing)"""
+    return BADGE_CODES.get(badge_id) in (user.badge_codes or ())
+
+
+def get_badge_holders_query(db: Session, badge_id: str):
+    """Query for users holding a badge (badge_codes @> ARRAY[code], uses the GIN index)"""
+    return db.query(User).filter(User.badge_codes.contains([BADGE_CODES[badge_id]]))
+
+
+def get_candidate_badges(user: User, event: Optional[str] = None) -> List[str]:
+    """
+    Badge IDs worth evaluating for a user: not yet held and triggered by the event
     
-    newly_awarded = []
+    Args:
+        user: User (badge codes already loaded)
+        event: Triggering event (None evaluates every rule, e.g. nightly job)
+    """
+    held = set(user.badge_codes or ())
+    return [
+        badge_id for badge_id, rule in BADGE_RULES.items()
+        if BADGE_CODES[badge_id] not in held and (event is None or event in rule["events"])
+    ]
+
+
+def award_badges_to_users(db: Session, users: List[User], event: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Evaluate badge rules for loaded users and award the ones they qualify for
     
-    # Check each badge type
-    badge_checks = {
-        "newbie": check_newbie_badge,
-        "accurate": check_accurate_badge,
-        "veteran": check_veteran_badge,
-        "perfect_week": check_perfect_week_badge,
-    }
+    Only rules triggered by the event and not already satisfied are evaluated,
+    and only their aggregates are fetched, in one grouped query for all users.
+    No query at all when nothing is left to evaluate. Commits once if anything
+    was awarded, and creates a notification and activity per new badge.
     
-    for badge_id, check_func in badge_checks.items():
-        if badge_id not in current_badges:
-            if check_func(db, user_id):
-                current_badges.append(badge_id)
-                newly_awarded.append(badge_id)
+    Returns:
+        Dict of user_id -> newly awarded badge IDs (only users with new badges)
+    """
+    from app.services.notification_service import create_notification
+    from app.services.activity_service import create_activity
+    
+    candidates = {user.id: get_candidate_badges(user, event) for user in users}
+    names = {
+        name
+        for badge_ids in candidates.values()
+        for badge_id in badge_ids
+        for name in BADGE_RULES[badge_id]["aggregates"]
+    }
+    if not names:
+        return {}
     
-    # Check specialist badges for each category
-    categories = ['election', 'politics', 'sports', 'entertainment', 'economy', 'weather']
-    for category in categories:
-        badge_id = f"specialist_{category}"
-        if badge_id not in current_badges:
-            if check_specialist_badge(db, user_id, category):
-                current_badges.append(badge_id)
-                newly_awarded.append(badge_id)
+    pending_users = [user for user in users if candidates[user.id]]
+    aggregates = fetch_badge_aggregates(db, [user.id for user in pending_users], names)
     
-    # Update user badges
-    if newly_awarded:
-        # Store as JSON (SQLAlchemy handles JSON column automatically)
-        user.badges = current_badges if current_badges else []
-        db.commit()
-        
-        # Create notification for each newly awarded badge
-        from app.services.notification_service import create_notification
-        from app.services.activity_service import create_activity
+    awarded = {}
+    for user in pending_users:
+        newly_awarded = evaluate_badge_rules(aggregates[user.id], candidates[user.id])
+        if not newly_awarded:
+            continue
         
-        badge_names = {
-            "newbie": "Newbie",
-            "accurate": "Accurate Forecaster",
-            "veteran": "Veteran",
-            "perfect_week": "Perfect Week",
-        }
+        # Assign new lists so the columns are flagged as changed
+        user.badges = parse_badges(user.badges) + newly_awarded
+        user.badge_codes = badge_codes_for(user.badges)
+        awarded[user.id] = newly_awarded
         
         for badge_id in newly_awarded:
-            # Get badge name
-            badge_name = badge_names.get(badge_id, badge_id.replace("_", " ").title())
-            if badge_id.startswith("specialist_"):
-                category = badge_id.replace("specialist_", "")
-                badge_name = f"{category.title()} Specialist"
+            badge_name = get_badge_name(badge_id)
             
             # Create notification
             create_notification(
                 db,
-                user_id=user_id,
+                user_id=user.id,
                 notification_type="badge_earned",
                 message=f"Congratulations! You earned the '{badge_name}' badge!",
                 metadata={"badge_id": badge_id, "badge_name": badge_name}  # Will be stored as meta_data
@@ -228,11 +322,49 @@ def check_and_award_badges(db: Session, user_id: str) -> List[str]:
             create_activity(
                 db,
                 activity_type="badge_earned",
-                user_id=user_id,
+                user_id=user.id,
                 metadata={"badge_id": badge_id, "badge_name": badge_name}  # Will be stored as meta_data
             )
     
-    return newly_awarded
+    if awarded:
+        db.commit()
+    
+    return awarded
+
+
+def award_badges(db: Session, user_ids: Iterable[str], event: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Evaluate badge rules for many users (one query for users, at most one for aggregates)
+    
+    Returns:
+        Dict of user_id -> newly awarded badge IDs (only users with new badges)
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    
+    users = db.query(User).filter(User.id.in_(user_ids)).all()
+    return award_badges_to_users(db, users, event)
+
+
+def check_and_award_badges(db: Session, user_id: str, event: Optional[str] = None) -> List[str]:
+    """
+    Check badge criteria and award eligible badges
+    
+    Args:
+        db: Database session
+        user_id: User ID
+        event: Triggering event (BADGE_EVENT_*); None checks every badge
+    
+    Returns:
+        List of newly awarded badge IDs
+    """
+    # Identity map lookup: no query when the user is already loaded in this session
+    user = db.get(User, user_id)
+    if not user:
+        return []
+    
+    return award_badges_to_users(db, [user], event).get(user_id, [])
 
 
 def get_user_badges(user: User) -> List[Dict]:
@@ -242,19 +374,7 @@ def get_user_badges(user: User) -> List[Dict]:
     Returns:
         List of badge dictionaries with metadata
     """
-    badges = getattr(user, 'badges', [])
-    if badges is None:
-        badges = []
-    if not isinstance(badges, list):
-        # If stored as string or other format, try to parse
-        import json
-        try:
-            if isinstance(badges, str):
-                badges = json.loads(badges) if badges else []
-            else:
-                badges = []
-        except:
-            badges = []
+    badges = parse_badges(getattr(user, 'badges', []))
     
     result = []
     for badge_id in badges:
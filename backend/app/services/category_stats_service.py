@@ -0,0 +1,134 @@
+"""
+Category stats service
+
+Nightly batch ranking of users by accuracy within each market category, used
+for Specialist badges (top 10% of a category).
+"""
+from typing import Dict
+from sqlalchemy.orm import Session
+from sqlalchemy import Float, case, cast, delete, func, insert, select
+
+from app.models.forecast import Forecast
+from app.models.market import Market
+from app.models.category_stats import UserCategoryStats, CategoryThreshold
+
+
+# Minimum resolved forecasts in a category to be ranked in it
+MIN_CATEGORY_RESOLVED = 5
+
+# Top 10%: accuracy at or above the category's 90th percentile
+SPECIALIST_PERCENTILE = 0.9
+
+
+def compute_category_stats(db: Session) -> Dict[str, int]:
+    """
+    Rebuild user_category_stats and category_thresholds from resolved forecasts
+    
+    1. One grouped query over forecasts x markets gives every user's resolved
+       and won counts and accuracy (1 - mean Brier score) per category;
+       percent_rank ranks them by accuracy.
+    2. The real 90th percentile accuracy per category (percentile_cont) is
+       stored in category_thresholds.
+    
+    Both tables are replaced in a single transaction, so readers see either
+    the previous or the new ranking. Commits.
+    
+    Returns:
+        Number of categories and user/category rows ranked
+    """
+    resolved = Forecast.status.in_(['won', 'lost'])
+    won = Forecast.status == 'won'
+    # Forecasts resolved before Brier scores were stored count as p = 1
+    brier_score = func.coalesce(Forecast.brier_score, case((won, 0.0), else_=1.0))
+    
+    per_user = (
+        select(
+            Forecast.user_id,
+            Market.category,
+            func.count(Forecast.id).label("resolved_forecasts"),
+            func.count(Forecast.id).filter(won).label("won_forecasts"),
+            func.sum(brier_score).label("brier_score_sum"),
+        )
+        .join(Market, Market.id == Forecast.market_id)
+        .where(resolved)
+        .group_by(Forecast.user_id, Market.category)
+        .having(func.count(Forecast.id) >= MIN_CATEGORY_RESOLVED)
+        .subquery("per_user")
+    )
+    accuracy = 1.0 - (cast(per_user.c.brier_score_sum, Float) / per_user.c.resolved_forecasts)
+    ranked = select(
+        per_user.c.user_id,
+        per_user.c.category,
+        per_user.c.resolved_forecasts,
+        per_user.c.won_forecasts,
+        accuracy,
+        func.percent_rank().over(partition_by=per_user.c.category, order_by=accuracy),
+    )
+    
+    db.execute(delete(UserCategoryStats))
+    ranked_rows = db.execute(
+        insert(UserCategoryStats).from_select(
+            ["user_id", "category", "resolved_forecasts", "won_forecasts", "accuracy", "percentile"],
+            ranked,
+        )
+    ).rowcount
+    
+    db.execute(delete(CategoryThreshold))
+    categories = db.execute(
+        insert(CategoryThreshold).from_select(
+            ["category", "p90_accuracy", "users_ranked"],
+            select(
+                UserCategoryStats.category,
+                func.percentile_cont(SPECIALIST_PERCENTILE).within_group(UserCategoryStats.accuracy),
+                func.count(),
+            ).group_by(UserCategoryStats.category),
+        )
+    ).rowcount
+    
+    db.commit()
+    
+    return {"categories": categories, "users_ranked": ranked_rows}
+
+
+def top_category_expr(user_id, category: str):
+    """
+    SQL EXISTS: the user's accuracy in a category is at or above its 90th percentile
+    
+    Two primary key lookups (user_category_stats, category_thresholds).
+    """
+    return (
+        select(UserCategoryStats.user_id)
+        .join(CategoryThreshold, CategoryThreshold.category == UserCategoryStats.category)
+        .where(
+            UserCategoryStats.user_id == user_id,
+            UserCategoryStats.category == category,
+            UserCategoryStats.accuracy >= CategoryThreshold.p90_accuracy,
+        )
+        .exists()
+    )
+
+
+def award_specialist_badges(db: Session, chunk_size: int = 1000) -> int:
+    """
+    Award Specialist badges to users who reached the top 10% of a category
+    
+    Only users ranked at or above a threshold are evaluated, in chunks.
+    
+    Returns:
+        Number of badges awarded
+    """
+    from app.services.badge_service import award_badges, BADGE_EVENT_CATEGORY_RANKS_UPDATED
+    
+    user_ids = db.execute(
+        select(UserCategoryStats.user_id)
+        .join(CategoryThreshold, CategoryThreshold.category == UserCategoryStats.category)
+        .where(UserCategoryStats.accuracy >= CategoryThreshold.p90_accuracy)
+        .distinct()
+    ).scalars().all()
+    
+    awarded = 0
+    for i in range(0, len(user_ids), chunk_size):
+        results = award_badges(db, user_ids[i:i + chunk_size], event=BADGE_EVENT_CATEGORY_RANKS_UPDATED)
+        awarded += sum(len(badge_ids) for badge_ids in results.values())
+    
+    return awarded
@@ -1,18 +1,34 @@
 """
 Leaderboard calculation service
+
+Rankings per (period, category) are precomputed into leaderboard_entries by
+set-based SQL (refresh_leaderboards) and mirrored into Redis sorted sets of
+rank scores, so pages and any user's rank are O(log n) lookups. Reads fall
+back to the table when Redis is unavailable.
 """
 import math
-from typing import List, Dict, Optional, Tuple
-from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, desc
+from sqlalchemy import Numeric, and_, cast, delete, func, insert, literal, select, update
 
 from app.models.user import User
+from app.models.user_stats import UserStats, UserDailyStats
 from app.models.forecast import Forecast
 from app.models.market import Market
-from app.services.streak_service import calculate_winning_streak, calculate_activity_streak
-from app.services.reputation_service import get_user_forecast_stats
-from app.utils.cache import get_cache, set_cache, delete_cache_pattern
+from app.models.leaderboard import LeaderboardEntry, LeaderboardSnapshot
+from app.services.badge_service import parse_badges
+from app.services.streak_service import activity_streak_expr
+from app.utils.cache import (
+    acquire_lock,
+    release_lock,
+    get_or_set_cache,
+    expire_cache_pattern,
+    replace_sorted_set,
+    update_sorted_sets,
+    get_sorted_set_rank,
+    get_sorted_set_range,
+)
 
 
 def calculate_rank_score(
@@ -55,220 +71,701 @@ def calculate_rank_score(
     return round(rank_score, 2)
 
 
-def calculate_leaderboard(
-    db: Session,
-    period: str = "global",
-    category: Optional[str] = None,
-    limit: int = 100
-) -> List[Dict]:
+def rank_score_expr(reputation, winning_streak, activity_streak, total_forecasts):
+    """
+    SQL expression for calculate_rank_score, for recomputing rank_score in bulk
+    """
+    reputation_component = (reputation / 100.0) * 50.0
+    streak_bonus = func.least(25.0, (winning_streak / 10.0) * 25.0)
+    activity_streak_bonus = func.least(15.0, (activity_streak / 30.0) * 15.0)
+    forecast_bonus = func.least(10.0, func.ln(1 + total_forecasts) / math.log(100) * 10.0)
+    activity_component = activity_streak_bonus + forecast_bonus
+    
+    rank_score = (reputation_component + streak_bonus + activity_component) * 10.0
+    return func.round(cast(rank_score, Numeric), 2)
+
+
+def update_rank_scores(db: Session, user_ids: Iterable[str]) -> None:
+    """
+    Recompute users.rank_score from the maintained fields in one UPDATE
+    
+    Called from the write paths that change its inputs (forecast placement,
+    resolution); reads never write rank_score. Callers must flush pending
+    changes to the users first. Does not commit.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    
+    total_forecasts = func.coalesce(
+        select(UserStats.total_forecasts).where(UserStats.user_id == User.id).scalar_subquery(),
+        0,
+    )
+    db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(
+            rank_score=rank_score_expr(User.reputation, User.winning_streak, activity_streak_expr(), total_forecasts)
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+# Days of forecasts covered by each leaderboard period, ending today (None for all time)
+LEADERBOARD_PERIODS = {"global": None, "weekly": 7, "monthly": 30}
+
+# Seconds a leaderboard page may be served stale while it is rebuilt
+LEADERBOARD_STALE_TTL = 600
+
+# pg_advisory_xact_lock key held by a leaderboard rebuild until it commits
+LEADERBOARD_REFRESH_LOCK_ID = 7340041
+
+# Requested refreshes start after this many seconds, so a burst of resolutions shares one
+LEADERBOARD_REFRESH_DELAY = 10
+
+# Lock marking a requested refresh as queued (expires in case the task is lost)
+LEADERBOARD_REFRESH_QUEUED_LOCK = "leaderboard_refresh_queued"
+LEADERBOARD_REFRESH_QUEUED_TTL = 300
+
+# leaderboard_entries columns filled by leaderboard_entries_query, in order
+ENTRY_FIELDS = [
+    "period",
+    "category",
+    "user_id",
+    "rank",
+    "profit_rank",
+    "volume_rank",
+    "rank_score",
+    "reputation",
+    "winning_streak",
+    "activity_streak",
+    "total_forecasts",
+    "forecasts",
+    "won_forecasts",
+    "lost_forecasts",
+    "profit_loss",
+    "volume",
+]
+
+# Rank changes compare against the leaderboard this many days ago
+RANK_CHANGE_DAYS = 7
+
+# Days of daily leaderboard snapshots kept
+SNAPSHOT_RETENTION_DAYS = 365
+
+# Leaderboard sort modes and the rank column each reads
+LEADERBOARD_SORTS = {
+    "rank_score": LeaderboardEntry.rank,
+    "profit": LeaderboardEntry.profit_rank,
+    "volume": LeaderboardEntry.volume_rank,
+}
+
+
+def window_stats_subquery(
+    start_day: Optional[date] = None,
+    end_day: Optional[date] = None,
+    category: Optional[str] = None
+):
     """
-    Calculate leaderboard for a given period and category
+    Per-user sums of the user_daily_stats buckets in [start_day, end_day]
+    
+    Any window costs at most one bucket per user per day (and category), so
+    weekly, monthly and custom ranges are the same query.
+    
+    Args:
+        start_day: First placement day included (None for no lower bound)
+        end_day: Last placement day included (None for no upper bound)
+        category: Market category filter (None for all)
+    """
+    query = (
+        select(
+            UserDailyStats.user_id,
+            func.sum(UserDailyStats.forecasts).label("forecasts"),
+            func.sum(UserDailyStats.won_forecasts).label("won_forecasts"),
+            func.sum(UserDailyStats.lost_forecasts).label("lost_forecasts"),
+            func.sum(UserDailyStats.volume).label("volume"),
+            func.sum(UserDailyStats.profit_loss).label("profit_loss"),
+        )
+        .group_by(UserDailyStats.user_id)
+    )
+    if start_day:
+        query = query.where(UserDailyStats.day >= start_day)
+    if end_day:
+        query = query.where(UserDailyStats.day <= end_day)
+    if category:
+        query = query.where(UserDailyStats.category == category)
+    return query.subquery("per_user")
+
+
+def leaderboard_entries_query(period: str, category: Optional[str] = None, now: Optional[datetime] = None):
+    """
+    Set-based query for one ranked leaderboard, in ENTRY_FIELDS order
+    
+    Users qualify with at least one forecast placed in the period and
+    category. Counts, profit/loss (reward_amount - points) and volume are over
+    those forecasts (summed from daily buckets); reputation, streaks and total
+    forecasts come from the maintained users/user_stats fields. Each user is
+    ranked by rank score, profit and volume.
     
     Args:
-        db: Database session
         period: "global", "weekly", or "monthly"
         category: Market category filter (None for all)
-        limit: Maximum number of users to return
+        now: Reference time for the period window
+    """
+    now = now or datetime.now(timezone.utc)
+    days = LEADERBOARD_PERIODS[period]
+    start_day = now.date() - timedelta(days=days - 1) if days else None
+    per_user = window_stats_subquery(start_day, None, category)
     
-    Returns:
-        List of user dictionaries with rank, display_name, reputation, rank_score, badges
-    """
-    # Get date filter based on period (make timezone-aware)
-    date_filter = None
-    if period == "weekly":
-        date_filter = datetime.now(timezone.utc) - timedelta(days=7)
-    elif period == "monthly":
-        date_filter = datetime.now(timezone.utc) - timedelta(days=30)
-    
-    # Get all active users
-    query = db.query(User).filter(User.is_active == True)
-    
-    # If period filter, only include users with forecasts in that period
-    if date_filter:
-        # Get user IDs with forecasts in the period
-        user_ids_with_activity = db.query(Forecast.user_id).filter(
-            Forecast.created_at >= date_filter
-        ).distinct().all()
-        
-        if user_ids_with_activity:
-            user_ids = [uid[0] for uid in user_ids_with_activity]
-            query = query.filter(User.id.in_(user_ids))
-        else:
-            # No activity in period, return empty
-            return []
-    
-    # If category filter, only include users with forecasts in that category
-    if category and category != "all":
-        # Get user IDs with forecasts in this category
-        category_markets = db.query(Market).filter(Market.category == category).all()
-        if category_markets:
-            market_ids = [m.id for m in category_markets]
-            user_ids_with_category = db.query(Forecast.user_id).filter(
-                Forecast.market_id.in_(market_ids)
-            ).distinct().all()
-            
-            if user_ids_with_category:
-                user_ids = [uid[0] for uid in user_ids_with_category]
-                query = query.filter(User.id.in_(user_ids))
-            else:
-                return []
-        else:
-            return []
-    
-    # Get all users and calculate their rank scores
-    users = query.all()
-    leaderboard = []
-    
-    for user in users:
-        # Calculate streaks
-        winning_streak = calculate_winning_streak(db, user.id)
-        activity_streak = calculate_activity_streak(db, user.id)
-        
-        # Get forecast stats
-        stats = get_user_forecast_stats(db, user.id)
-        
-        # Calculate profit/loss and volume
-        # Get all forecasts for this user
-        user_forecasts = db.query(Forecast).filter(Forecast.user_id == user.id).all()
-        
-        # Apply period filter if needed
-        if date_filter:
-            user_forecasts = [f for f in user_forecasts if f.created_at >= date_filter]
-        
-        # Apply category filter if needed
-        if category and category != "all":
-            category_market_ids = [m.id for m in db.query(Market).filter(Market.category == category).all()]
-            user_forecasts = [f for f in user_forecasts if f.market_id in category_market_ids]
-        
-        # Calculate volume (total points allocated)
-        volume = sum(f.points for f in user_forecasts)
-        
-        # Calculate profit/loss
-        # For won forecasts: calculate estimated profit (simplified - actual profit depends on market odds at resolution)
-        # For lost forecasts: loss is the points allocated
-        won_forecasts = [f for f in user_forecasts if f.status == 'won']
-        lost_forecasts = [f for f in user_forecasts if f.status == 'lost']
-        
-        # Calculate profit from won forecasts (simplified: assume average 1.5x return)
-        # In production, this should be calculated from actual market resolution data
-        won_points = sum(f.points for f in won_forecasts) if won_forecasts else 0
-        lost_points = sum(f.points for f in lost_forecasts) if lost_forecasts else 0
-        
-        # Simplified profit calculation: won forecasts get 1.5x return on average
-        # This is a placeholder - actual profit should be calculated from resolution data
-        # Profit = (won_points * 1.5) - lost_points
-        # This means winners get their bet back (won_points) + 0.5x bonus, losers lose their bet
-        profit_loss = int((won_points * 1.5) - lost_points) if won_points > 0 else -lost_points
-        
-        # Calculate rank score
-        rank_score = calculate_rank_score(
-            user.reputation,
-            winning_streak,
+    total_forecasts = func.coalesce(UserStats.total_forecasts, 0)
+    activity_streak = activity_streak_expr(now.date())
+    rank_score = rank_score_expr(User.reputation, User.winning_streak, activity_streak, total_forecasts)
+    
+    return (
+        select(
+            literal(period),
+            literal(category or "all"),
+            User.id,
+            # Ties in reverse id order, as ZREVRANK orders equal scores
+            func.row_number().over(order_by=(rank_score.desc(), User.id.desc())),
+            func.row_number().over(order_by=(per_user.c.profit_loss.desc(), User.id.desc())),
+            func.row_number().over(order_by=(per_user.c.volume.desc(), User.id.desc())),
+            rank_score,
+            User.reputation,
+            User.winning_streak,
             activity_streak,
-            stats["total_forecasts"]
+            total_forecasts,
+            per_user.c.forecasts,
+            per_user.c.won_forecasts,
+            per_user.c.lost_forecasts,
+            per_user.c.profit_loss,
+            per_user.c.volume,
         )
-        
-        # Update user's rank_score
-        user.rank_score = rank_score
-        
-        # Get badges
-        badges = user.badges if user.badges else []
-        if not isinstance(badges, list):
-            badges = []
-        
-        leaderboard.append({
-            "user_id": user.id,
-            "display_name": user.display_name,
-            "avatar_url": user.avatar_url,
-            "reputation": round(user.reputation, 2),
-            "rank_score": rank_score,
-            "winning_streak": winning_streak,
-            "activity_streak": activity_streak,
-            "total_forecasts": stats["total_forecasts"],
-            "badges": badges,
-            "profit_loss": profit_loss,
-            "volume": volume,
-        })
-    
-    # Sort by rank_score (descending)
-    leaderboard.sort(key=lambda x: x["rank_score"], reverse=True)
-    
-    # Add ranks
-    for i, entry in enumerate(leaderboard, start=1):
-        entry["rank"] = i
-    
-    # Commit rank_score updates
+        .join(per_user, per_user.c.user_id == User.id)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .where(User.is_active == True)
+    )
+
+
+def leaderboard_scopes(db: Session) -> List[Tuple[str, Optional[str]]]:
+    """Every (period, category) leaderboard: each period for all markets and per category"""
+    categories = db.execute(
+        select(Market.category).where(Market.category.isnot(None)).distinct()
+    ).scalars().all()
+    return [(period, category) for period in LEADERBOARD_PERIODS for category in [None, *categories]]
+
+
+def leaderboard_ranks_key(period: str, category: Optional[str] = None) -> str:
+    """Redis sorted set of user rank scores for one leaderboard"""
+    return f"leaderboard_ranks:{period}:{category or 'all'}"
+
+
+def refresh_leaderboards(db: Session) -> Dict[str, int]:
+    """
+    Rebuild leaderboard_entries and the rank sorted sets for every period and category
+    
+    One INSERT ... SELECT per leaderboard, all replaced in a single
+    transaction so readers see either the previous or the new ranking.
+    Concurrent rebuilds (requested and scheduled) are serialized by an
+    advisory lock held until the commit, so each one's DELETE sees the rows
+    the previous one inserted. Commits, then rebuilds the sorted sets and
+    invalidates the cached pages.
+    
+    Returns:
+        Number of leaderboards and entries written
+    """
+    db.execute(select(func.pg_advisory_xact_lock(LEADERBOARD_REFRESH_LOCK_ID)))
+    
+    now = datetime.now(timezone.utc)
+    scopes = leaderboard_scopes(db)
+    
+    db.execute(delete(LeaderboardEntry))
+    
+    entries = 0
+    for period, category in scopes:
+        entries += db.execute(
+            insert(LeaderboardEntry).from_select(
+                ENTRY_FIELDS, leaderboard_entries_query(period, category, now)
+            )
+        ).rowcount
+    
     db.commit()
+    sync_leaderboard_ranks(db, scopes)
+    invalidate_leaderboard_cache()
     
-    # Return top N
-    return leaderboard[:limit]
+    return {"leaderboards": len(scopes), "entries": entries}
 
 
-def get_cached_leaderboard(
+def sync_leaderboard_ranks(db: Session, scopes: List[Tuple[str, Optional[str]]]) -> None:
+    """
+    Replace each leaderboard's sorted set with the rank scores in leaderboard_entries
+    
+    Empty leaderboards drop their set.
+    """
+    for period, category in scopes:
+        rows = (
+            db.query(LeaderboardEntry.user_id, LeaderboardEntry.rank_score)
+            .filter(
+                LeaderboardEntry.period == period,
+                LeaderboardEntry.category == (category or "all"),
+            )
+            .yield_per(10000)
+        )
+        replace_sorted_set(leaderboard_ranks_key(period, category), rows)
+
+
+def update_leaderboard_ranks(db: Session, user_ids: Iterable[str]) -> None:
+    """
+    Push users' current rank_score into every leaderboard they are ranked in
+    
+    Called after rank_score is recomputed; users not yet in a leaderboard
+    join it on the next refresh.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    
+    scores = dict(db.execute(
+        select(User.id, User.rank_score).where(User.id.in_(user_ids), User.is_active == True)
+    ).all())
+    update_sorted_sets(
+        [leaderboard_ranks_key(period, category) for period, category in leaderboard_scopes(db)],
+        scores,
+    )
+
+
+def snapshot_leaderboards(db: Session, snapshot_date: Optional[date] = None) -> Dict[str, int]:
+    """
+    Copy today's ranks from leaderboard_entries into leaderboard_snapshots
+    
+    One INSERT ... SELECT of (user, period, category, rank, rank_score);
+    re-running on the same day replaces that day's snapshot. Snapshots older
+    than SNAPSHOT_RETENTION_DAYS are dropped. Commits.
+    
+    Returns:
+        Number of snapshot rows written and expired
+    """
+    snapshot_date = snapshot_date or datetime.utcnow().date()
+    
+    db.execute(delete(LeaderboardSnapshot).where(LeaderboardSnapshot.snapshot_date == snapshot_date))
+    written = db.execute(
+        insert(LeaderboardSnapshot).from_select(
+            ["snapshot_date", "period", "category", "user_id", "rank", "rank_score"],
+            select(
+                literal(snapshot_date),
+                LeaderboardEntry.period,
+                LeaderboardEntry.category,
+                LeaderboardEntry.user_id,
+                LeaderboardEntry.rank,
+                LeaderboardEntry.rank_score,
+            ),
+        )
+    ).rowcount
+    expired = db.execute(
+        delete(LeaderboardSnapshot).where(
+            LeaderboardSnapshot.snapshot_date < snapshot_date - timedelta(days=SNAPSHOT_RETENTION_DAYS)
+        )
+    ).rowcount
+    
+    db.commit()
+    
+    return {"written": written, "expired": expired}
+
+
+def get_rank_history(
     db: Session,
+    user_id: str,
     period: str = "global",
     category: Optional[str] = None,
+    days: int = 90
+) -> List[LeaderboardSnapshot]:
+    """
+    A user's daily rank in one leaderboard over the last `days` days, oldest first
+    
+    Uses the (user_id, snapshot_date) index.
+    """
+    since = datetime.utcnow().date() - timedelta(days=days)
+    return (
+        db.query(LeaderboardSnapshot)
+        .filter(
+            LeaderboardSnapshot.user_id == user_id,
+            LeaderboardSnapshot.snapshot_date >= since,
+            LeaderboardSnapshot.period == period,
+            LeaderboardSnapshot.category == (category or "all"),
+        )
+        .order_by(LeaderboardSnapshot.snapshot_date)
+        .all()
+    )
+
+
+def request_leaderboard_refresh() -> None:
+    """
+    Queue a leaderboard refresh after rank-affecting changes (e.g. a resolution)
+    
+    Requests are coalesced: while a refresh is queued and has not started,
+    further requests are no-ops, and the task starts LEADERBOARD_REFRESH_DELAY
+    seconds later so a batch of resolutions triggers a single rebuild.
+    Never rebuilds in the caller's request: if the task cannot be queued (or
+    Redis is unavailable) the scheduled refresh catches up within minutes.
+    Callers must commit their own changes first.
+    """
+    token = acquire_lock(LEADERBOARD_REFRESH_QUEUED_LOCK, LEADERBOARD_REFRESH_QUEUED_TTL)
+    if token is None:
+        return
+    
+    try:
+        from app.tasks.stats_tasks import refresh_leaderboards_task
+        refresh_leaderboards_task.apply_async(kwargs={"queued_token": token}, countdown=LEADERBOARD_REFRESH_DELAY)
+    except Exception as e:
+        release_lock(LEADERBOARD_REFRESH_QUEUED_LOCK, token)
+        # Log error (in production, use proper logging)
+        print(f"Error queueing leaderboard refresh: {e}")
+
+
+def leaderboard_rows_query(db: Session, period: str, category: Optional[str] = None):
+    """
+    Query of (LeaderboardEntry, User, previous rank) for one leaderboard
+    
+    The previous rank is a join against the latest snapshot at least
+    RANK_CHANGE_DAYS old (NULL if the user was not ranked then).
+    """
+    compare_date = (
+        select(func.max(LeaderboardSnapshot.snapshot_date))
+        .where(LeaderboardSnapshot.snapshot_date <= datetime.utcnow().date() - timedelta(days=RANK_CHANGE_DAYS))
+        .correlate(None)
+        .scalar_subquery()
+    )
+    return (
+        db.query(LeaderboardEntry, User, LeaderboardSnapshot.rank)
+        .join(User, User.id == LeaderboardEntry.user_id)
+        .outerjoin(
+            LeaderboardSnapshot,
+            and_(
+                LeaderboardSnapshot.snapshot_date == compare_date,
+                LeaderboardSnapshot.period == LeaderboardEntry.period,
+                LeaderboardSnapshot.category == LeaderboardEntry.category,
+                LeaderboardSnapshot.user_id == LeaderboardEntry.user_id,
+            ),
+        )
+        .filter(
+            LeaderboardEntry.period == period,
+            LeaderboardEntry.category == (category or "all"),
+        )
+    )
+
+
+def leaderboard_entry_to_dict(
+    entry: LeaderboardEntry,
+    user: User,
+    previous_rank: Optional[int] = None,
+    sort: str = "rank_score"
+) -> Dict:
+    """
+    Leaderboard row in the API shape, ranked by the given sort mode
+    
+    Rank changes (positive: moved up) are tracked for the rank_score order only.
+    """
+    if sort != "rank_score":
+        previous_rank = None
+    
+    rank = getattr(entry, LEADERBOARD_SORTS[sort].key)
+    return {
+        "rank": rank,
+        "previous_rank": previous_rank,
+        "rank_change": previous_rank - rank if previous_rank is not None else None,
+        "user_id": entry.user_id,
+        "display_name": user.display_name,
+        "avatar_url": user.avatar_url,
+        "reputation": round(entry.reputation, 2),
+        "rank_score": entry.rank_score,
+        "winning_streak": entry.winning_streak,
+        "activity_streak": entry.activity_streak,
+        "total_forecasts": entry.total_forecasts,
+        "forecasts": entry.forecasts,
+        "won_forecasts": entry.won_forecasts,
+        "lost_forecasts": entry.lost_forecasts,
+        "badges": parse_badges(user.badges),
+        "profit_loss": entry.profit_loss,
+        "volume": entry.volume,
+    }
+
+
+def set_live_rank(item: Dict, rank: int, rank_score: float) -> None:
+    """Apply a rank and score read from the sorted set to a leaderboard row"""
+    item["rank"] = rank
+    item["rank_score"] = rank_score
+    if item["previous_rank"] is not None:
+        item["rank_change"] = item["previous_rank"] - rank
+
+
+def get_leaderboard_page(
+    db: Session,
+    period: str = "global",
+    category: Optional[str] = None,
+    offset: int = 0,
     limit: int = 100,
-    cache_ttl: int = 300  # 5 minutes
+    sort: str = "rank_score"
+) -> Dict:
+    """
+    Read a ranked slice of a leaderboard
+    
+    By rank score, ranks and scores come from the sorted set (ZREVRANGE) and
+    the entries' other fields are fetched by primary key. Profit and volume
+    orderings, and slices where the set and table disagree, are read from
+    the precomputed rank columns.
+    
+    Returns:
+        Dictionary with the slice's leaderboard entries and the total ranked users
+    """
+    ranked = None
+    if sort == "rank_score":
+        ranked = get_sorted_set_range(leaderboard_ranks_key(period, category), offset, offset + limit - 1)
+    
+    if ranked is not None:
+        members, total = ranked
+        rows = (
+            leaderboard_rows_query(db, period, category)
+            .filter(LeaderboardEntry.user_id.in_([user_id for user_id, _ in members]))
+            .all()
+        )
+        entries = {row[0].user_id: row for row in rows}
+        
+        # A member without an entry means the set and table disagree (a refresh
+        # between its commit and the set sync, or a deleted user): use the table
+        if len(entries) == len(members):
+            leaderboard = []
+            for rank, (user_id, rank_score) in enumerate(members, start=offset + 1):
+                item = leaderboard_entry_to_dict(*entries[user_id])
+                set_live_rank(item, rank, rank_score)
+                leaderboard.append(item)
+            return {"leaderboard": leaderboard, "total": total}
+    
+    return {
+        "leaderboard": get_leaderboard_page_from_table(db, period, category, offset, limit, sort),
+        "total": count_leaderboard_entries(db, period, category),
+    }
+
+
+def get_leaderboard_page_from_table(
+    db: Session,
+    period: str = "global",
+    category: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 100,
+    sort: str = "rank_score"
 ) -> List[Dict]:
     """
-    Get leaderboard from cache or calculate and cache it
+    Read a ranked slice of leaderboard_entries
+    
+    Ranks are contiguous, so the slice is an index range scan on
+    (period, category, <sort rank>) rather than an OFFSET.
+    
+    Returns:
+        List of user dictionaries with rank information
+    """
+    rank = LEADERBOARD_SORTS[sort]
+    rows = (
+        leaderboard_rows_query(db, period, category)
+        .filter(rank > offset, rank <= offset + limit)
+        .order_by(rank)
+        .all()
+    )
+    return [leaderboard_entry_to_dict(*row, sort=sort) for row in rows]
+
+
+def count_leaderboard_entries(db: Session, period: str = "global", category: Optional[str] = None) -> int:
+    """Number of ranked users in a precomputed leaderboard"""
+    return db.query(func.count()).select_from(LeaderboardEntry).filter(
+        LeaderboardEntry.period == period,
+        LeaderboardEntry.category == (category or "all"),
+    ).scalar()
+
+
+def get_cached_leaderboard(
+    db: Session,
+    period: str = "global",
+    category: Optional[str] = None,
+    page: int = 1,
+    limit: int = 50,
+    sort: str = "rank_score",
+    cache_ttl: int = 300  # 5 minutes
+) -> Dict:
+    """
+    Get a leaderboard page from cache or read and cache it
+    
+    Single-flight with stale-while-revalidate: after a refresh or
+    invalidation the previous page keeps being served while one worker
+    rebuilds it in the background, so concurrent requests never pile up
+    on the database.
     
     Args:
         db: Database session
         period: "global", "weekly", or "monthly"
         category: Market category filter (None for all)
-        limit: Maximum number of users to return
+        page: Page number (1-based)
+        limit: Results per page
+        sort: "rank_score", "profit", or "volume"
         cache_ttl: Cache TTL in seconds
     
     Returns:
-        List of user dictionaries with rank information
+        Dictionary with the page's leaderboard entries and the total ranked users
     """
     # Generate cache key
     category_key = category if category and category != "all" else "all"
-    cache_key = f"leaderboard:{period}:{category_key}:{limit}"
+    cache_key = f"leaderboard:{period}:{category_key}:{sort}:{page}:{limit}"
     
-    # Try to get from cache
-    cached = get_cache(cache_key)
-    if cached:
-        return cached
+    category = None if category_key == "all" else category_key
+    offset = (page - 1) * limit
     
-    # Calculate leaderboard
-    leaderboard = calculate_leaderboard(db, period, category, limit)
+    def rebuild() -> Dict:
+        # Background thread: own session
+        from app.database import ReadSessionLocal
+        session = ReadSessionLocal()
+        try:
+            return get_leaderboard_page(session, period, category, offset, limit, sort)
+        finally:
+            session.close()
     
-    # Cache it
-    set_cache(cache_key, leaderboard, cache_ttl)
-    
-    return leaderboard
+    return get_or_set_cache(
+        cache_key,
+        lambda: get_leaderboard_page(db, period, category, offset, limit, sort),
+        ttl=cache_ttl,
+        stale_ttl=LEADERBOARD_STALE_TTL,
+        rebuild=rebuild,
+    )
 
 
 def get_user_rank(
     db: Session,
     user_id: str,
     period: str = "global",
-    category: Optional[str] = None
+    category: Optional[str] = None,
+    sort: str = "rank_score"
 ) -> Optional[Dict]:
     """
-    Get user's rank in the leaderboard
+    Get user's exact rank in the leaderboard
+    
+    A primary key lookup for the entry; by rank score, rank and score come
+    from ZREVRANK/ZSCORE on the leaderboard's sorted set.
+    
+    Returns:
+        Dictionary with rank information or None if user is not ranked
+    """
+    row = (
+        leaderboard_rows_query(db, period, category)
+        .filter(LeaderboardEntry.user_id == user_id)
+        .first()
+    )
+    if not row:
+        return None
+    
+    entry = leaderboard_entry_to_dict(*row, sort=sort)
+    if sort != "rank_score":
+        return entry
+    
+    ranked = get_sorted_set_rank(leaderboard_ranks_key(period, category), user_id)
+    if ranked is not None:
+        set_live_rank(entry, ranked[0] + 1, ranked[1])
+    return entry
+
+
+def get_biggest_wins(db: Session, since: datetime, limit: int = 8) -> List[Dict]:
+    """
+    Biggest wins on markets resolved since a given time
+    
+    One grouped query over won forecasts x resolved markets: a user's
+    forecasts on the same market are summed into one win, ranked by profit
+    (reward_amount - points, estimated for old forecasts without a reward).
     
     Returns:
-        Dictionary with rank information or None if user not found
+        List of win dictionaries with user info, market title, amounts and rank
     """
-    # Get full leaderboard
-    leaderboard = get_cached_leaderboard(db, period, category, limit=1000)
+    from app.services.user_stats_service import forecast_profit_expr
     
-    # Find user
-    for entry in leaderboard:
-        if entry["user_id"] == user_id:
-            return entry
+    profit = func.sum(forecast_profit_expr()).label("profit")
+    wins = (
+        select(
+            Forecast.user_id,
+            Forecast.market_id,
+            func.sum(Forecast.points).label("initial_amount"),
+            profit,
+        )
+        .join(Market, Market.id == Forecast.market_id)
+        .where(
+            Forecast.status == 'won',
+            Market.status == 'resolved',
+            Market.resolution_time >= since,
+        )
+        .group_by(Forecast.user_id, Forecast.market_id)
+        .order_by(profit.desc())
+        .limit(limit)
+        .subquery("wins")
+    )
+    rows = db.execute(
+        select(wins, User.display_name, User.avatar_url, Market.title, Market.resolution_time)
+        .join(User, User.id == wins.c.user_id)
+        .join(Market, Market.id == wins.c.market_id)
+        .order_by(wins.c.profit.desc())
+    ).all()
     
-    return None
+    return [
+        {
+            "user_id": row.user_id,
+            "display_name": row.display_name,
+            "avatar_url": row.avatar_url,
+            "market_id": row.market_id,
+            "market_title": row.title,
+            "initial_amount": int(row.initial_amount),
+            "final_amount": int(row.initial_amount + row.profit),
+            "profit": int(row.profit),
+            "resolved_at": row.resolution_time.isoformat() if row.resolution_time else None,
+            "rank": rank,
+        }
+        for rank, row in enumerate(rows, start=1)
+    ]
+
+
+def get_cached_biggest_wins(db: Session, limit: int = 8, cache_ttl: int = 3600) -> List[Dict]:
+    """
+    Biggest wins of the current month, cached until the next resolution
+    
+    Returns:
+        List of win dictionaries (see get_biggest_wins)
+    """
+    now = datetime.utcnow()
+    month_start = datetime(now.year, now.month, 1)
+    cache_key = f"biggest_wins:{month_start:%Y-%m}:{limit}"
+    
+    def rebuild() -> List[Dict]:
+        # Background thread: own session
+        from app.database import ReadSessionLocal
+        session = ReadSessionLocal()
+        try:
+            return get_biggest_wins(session, month_start, limit)
+        finally:
+            session.close()
+    
+    return get_or_set_cache(
+        cache_key,
+        lambda: get_biggest_wins(db, month_start, limit),
+        ttl=cache_ttl,
+        stale_ttl=LEADERBOARD_STALE_TTL,
+        rebuild=rebuild,
+    )
+
+
+def invalidate_biggest_wins_cache() -> None:
+    """Mark cached biggest wins stale (called when markets are resolved or corrected)"""
+    expire_cache_pattern("biggest_wins:*", LEADERBOARD_STALE_TTL)
 
 
 def invalidate_leaderboard_cache(period: Optional[str] = None, category: Optional[str] = None):
     """
     Invalidate leaderboard cache
     
+    Cached pages are marked stale rather than deleted, so they are still
+    served while each is rebuilt once.
+    
     Args:
         period: Specific period to invalidate (None for all)
         category: Specific category to invalidate (None for all)
@@ -282,5 +779,5 @@ def invalidate_leaderboard_cache(period: Optional[str] = None, category: Optiona
     else:
         pattern = "leaderboard:*"
     
-    delete_cache_pattern(pattern)
+    expire_cache_pattern(pattern, LEADERBOARD_STALE_TTL)
 
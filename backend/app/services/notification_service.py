@@ -2,14 +2,25 @@
 Notification service
 """
 import uuid
-from typing import List, Dict, Optional
+from itertools import islice
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func, desc
 
 from app.models.notification import Notification
 from app.models.user import User
-from app.utils.cache import get_cache, set_cache, delete_cache
+from app.utils.bulk_copy import copy_rows, supports_copy
+from app.utils.cache import get_cache, set_cache, delete_cache_many
+
+
+def invalidate_notification_caches(user_ids: Iterable[str]) -> None:
+    """Drop the cached unread count and recent notifications for each user (pipelined)"""
+    delete_cache_many(
+        key
+        for user_id in user_ids
+        for key in (f"notifications:unread_count:{user_id}", f"notifications:recent:{user_id}")
+    )
 
 
 def create_notification(
@@ -36,8 +47,7 @@ def create_notification(
     db.add(notification)
     
     # Invalidate cache
-    delete_cache(f"notifications:unread_count:{user_id}")
-    delete_cache(f"notifications:recent:{user_id}")
+    invalidate_notification_caches([user_id])
     
     return notification
 
@@ -85,13 +95,92 @@ def create_notifications_batch(
     ])
     
     # Invalidate cache for all affected users
-    for user_id in user_ids:
-        delete_cache(f"notifications:unread_count:{user_id}")
-        delete_cache(f"notifications:recent:{user_id}")
+    invalidate_notification_caches(user_ids)
     
     return notifications
 
 
+# Column order of the rows built by forecast_result_notification_rows
+NOTIFICATION_COPY_COLUMNS = ["id", "user_id", "type", "message", "read", "meta_data", "created_at"]
+
+
+def forecast_result_notification_rows(
+    user_results: Iterable[Dict],
+    market_id: str,
+    market_title: str,
+    winning_outcome_name: str,
+    created_at: datetime,
+    corrected: bool = False
+) -> Iterator[Tuple]:
+    """
+    Yield one win/loss notification row per user result (NOTIFICATION_COPY_COLUMNS order)
+    
+    Plain tuples, so they can be streamed with COPY or zipped into insert mappings.
+    """
+    message_prefix = "Resolution corrected. " if corrected else ""
+    
+    for result in user_results:
+        forecast_points = result["forecast_points"]
+        
+        if result["won"]:
+            chips_gained = result["chips_gained"]
+            reward_amount = result.get("reward_amount", forecast_points + chips_gained)
+            notification_type = "forecast_won"
+            message = f"{message_prefix}🎉 You won! Market '{market_title}' resolved in your favor. You gained ₱{chips_gained:,} chips (total reward: ₱{reward_amount:,})."
+            metadata = {
+                "market_id": market_id,
+                "market_title": market_title,
+                "winning_outcome": winning_outcome_name,
+                "forecast_points": forecast_points,
+                "chips_gained": chips_gained,
+                "reward_amount": reward_amount,
+                "corrected": corrected,
+            }
+        else:
+            chips_lost = result["chips_lost"]
+            notification_type = "forecast_lost"
+            message = f"{message_prefix}Market '{market_title}' resolved. Your forecast didn't win. You lost ₱{chips_lost:,} chips."
+            metadata = {
+                "market_id": market_id,
+                "market_title": market_title,
+                "winning_outcome": winning_outcome_name,
+                "forecast_points": forecast_points,
+                "chips_lost": chips_lost,
+                "corrected": corrected,
+            }
+        
+        yield (str(uuid.uuid4()), result["user_id"], notification_type, message, False, metadata, created_at)
+
+
+def insert_notification_rows(
+    db: Session,
+    rows: Iterable[Tuple],
+    batch_size: int = 5000,
+    use_copy: bool = True
+) -> None:
+    """
+    Insert notification rows (NOTIFICATION_COPY_COLUMNS order) without ORM objects
+    
+    Streams a single COPY on PostgreSQL/psycopg2, otherwise falls back to
+    batched bulk inserts. Does not commit.
+    """
+    if use_copy and supports_copy(db):
+        # One streamed COPY: rows are encoded as the driver reads them
+        copy_rows(db, Notification.__tablename__, NOTIFICATION_COPY_COLUMNS, rows)
+        return
+    
+    # Process in batches to avoid memory issues and long transactions
+    rows = iter(rows)
+    while True:
+        notifications_batch = [
+            dict(zip(NOTIFICATION_COPY_COLUMNS, row)) for row in islice(rows, batch_size)
+        ]
+        if not notifications_batch:
+            break
+        db.bulk_insert_mappings(Notification, notifications_batch)
+        db.flush()  # Flush after each batch to avoid huge transaction
+
+
 def create_forecast_result_notifications(
     db: Session,
     user_results: List[Dict],
@@ -99,13 +188,16 @@ def create_forecast_result_notifications(
     market_title: str,
     winning_outcome_name: str,
     batch_size: int = 5000,
-    use_async: bool = False
+    use_async: bool = False,
+    corrected: bool = False,
+    use_copy: bool = True
 ) -> List[Notification]:
     """
     Create individual win/loss notifications for each user after market resolution
     
     Optimized for large-scale operations (100k+ users):
-    - Batched bulk inserts to avoid memory issues and long transactions
+    - Rows streamed into PostgreSQL with COPY FROM STDIN (no ORM objects)
+    - Batched bulk inserts when COPY is unavailable (other databases/drivers)
     - Background processing option for very large batches
     - Efficient cache invalidation
     
@@ -115,8 +207,10 @@ def create_forecast_result_notifications(
         market_id: ID of the resolved market
         market_title: Title of the resolved market
         winning_outcome_name: Name of the winning outcome
-        batch_size: Number of notifications to insert per batch (default: 5000)
+        batch_size: Number of notifications to insert per batch on the bulk insert path (default: 5000)
         use_async: If True and batch is large, use Celery for background processing
+        corrected: True when the market was re-scored after a resolution correction
+        use_copy: Use COPY when the session is on PostgreSQL/psycopg2 (default: True)
     
     Returns:
         List of created Notification objects (empty if async)
@@ -132,7 +226,8 @@ def create_forecast_result_notifications(
                 user_results,
                 market_id,
                 market_title,
-                winning_outcome_name
+                winning_outcome_name,
+                corrected
             )
             return []  # Return immediately, processing happens in background
         except (ImportError, AttributeError):
@@ -140,82 +235,65 @@ def create_forecast_result_notifications(
             # This is fine - the batched approach will still work efficiently
             pass
     
-    current_time = datetime.now(timezone.utc)
-    all_user_ids = set()
+    rows = forecast_result_notification_rows(
+        user_results,
+        market_id,
+        market_title,
+        winning_outcome_name,
+        datetime.now(timezone.utc),
+        corrected
+    )
     
-    # Process in batches to avoid memory issues and long transactions
-    for batch_start in range(0, num_users, batch_size):
-        batch_end = min(batch_start + batch_size, num_users)
-        batch_results = user_results[batch_start:batch_end]
-        
-        notifications_batch = []
-        
-        for result in batch_results:
-            user_id = result["user_id"]
-            won = result["won"]
-            forecast_points = result["forecast_points"]
-            all_user_ids.add(user_id)
-            
-            if won:
-                chips_gained = result["chips_gained"]
-                reward_amount = result.get("reward_amount", forecast_points + chips_gained)
-                notification_type = "forecast_won"
-                message = f"🎉 You won! Market '{market_title}' resolved in your favor. You gained ₱{chips_gained:,} chips (total reward: ₱{reward_amount:,})."
-                metadata = {
-                    "market_id": market_id,
-                    "market_title": market_title,
-                    "winning_outcome": winning_outcome_name,
-                    "forecast_points": forecast_points,
-                    "chips_gained": chips_gained,
-                    "reward_amount": reward_amount,
-                }
-            else:
-                chips_lost = result["chips_lost"]
-                notification_type = "forecast_lost"
-                message = f"Market '{market_title}' resolved. Your forecast didn't win. You lost ₱{chips_lost:,} chips."
-                metadata = {
-                    "market_id": market_id,
-                    "market_title": market_title,
-                    "winning_outcome": winning_outcome_name,
-                    "forecast_points": forecast_points,
-                    "chips_lost": chips_lost,
-                }
-            
-            notifications_batch.append({
-                "id": str(uuid.uuid4()),
-                "user_id": user_id,
-                "type": notification_type,
-                "message": message,
-                "read": False,
-                "meta_data": metadata,
-                "created_at": current_time
-            })
-        
-        # Bulk insert this batch
-        if notifications_batch:
-            db.bulk_insert_mappings(Notification, notifications_batch)
-            db.flush()  # Flush after each batch to avoid huge transaction
-    
-    # Batch cache invalidation (more efficient than individual calls)
-    # Invalidate cache for all affected users at once using a pattern
-    # Note: This requires Redis pattern deletion or we can do it in batches
-    if all_user_ids:
-        # Invalidate cache in batches to avoid blocking
-        user_ids_list = list(all_user_ids)
-        cache_batch_size = 1000
-        
-        for cache_batch_start in range(0, len(user_ids_list), cache_batch_size):
-            cache_batch_end = min(cache_batch_start + cache_batch_size, len(user_ids_list))
-            cache_batch = user_ids_list[cache_batch_start:cache_batch_end]
-            
-            # Invalidate cache for this batch
-            for user_id in cache_batch:
-                delete_cache(f"notifications:unread_count:{user_id}")
-                delete_cache(f"notifications:recent:{user_id}")
+    insert_notification_rows(db, rows, batch_size=batch_size, use_copy=use_copy)
+    
+    # Invalidate cache for all affected users in a few pipelined round trips
+    invalidate_notification_caches({result["user_id"] for result in user_results})
     
     return []
 
 
+def create_refund_notifications(
+    db: Session,
+    refunds: List[Dict],
+    market_id: str,
+    market_title: str,
+    reason: Optional[str] = None
+) -> None:
+    """
+    Create refund notifications for users whose forecasts on a cancelled market were refunded
+    
+    Args:
+        db: Database session
+        refunds: List of dicts with user_id, points (chips refunded) and forecasts
+        market_id: ID of the cancelled market
+        market_title: Title of the cancelled market
+        reason: Optional cancellation reason shown to users
+    """
+    if not refunds:
+        return
+    
+    current_time = datetime.now(timezone.utc)
+    db.bulk_insert_mappings(Notification, [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": refund["user_id"],
+            "type": "forecast_refunded",
+            "message": f"Market '{market_title}' was cancelled. Your ₱{refund['points']:,} chips have been refunded.",
+            "read": False,
+            "meta_data": {
+                "market_id": market_id,
+                "market_title": market_title,
+                "chips_refunded": refund["points"],
+                "reason": reason,
+            },
+            "created_at": current_time,
+        }
+        for refund in refunds
+    ])
+    
+    invalidate_notification_caches({refund["user_id"] for refund in refunds})
+
+
 def get_unread_count(db: Session, user_id: str, use_cache: bool = True) -> int:
     """
     Get unread notification count for a user (cached)
@@ -299,8 +377,7 @@ def mark_as_read(db: Session, notification_id: str, user_id: str) -> bool:
     notification.read = True
     
     # Invalidate cache
-    delete_cache(f"notifications:unread_count:{user_id}")
-    delete_cache(f"notifications:recent:{user_id}")
+    invalidate_notification_caches([user_id])
     
     return True
 
@@ -318,8 +395,7 @@ def mark_all_as_read(db: Session, user_id: str) -> int:
     ).update({"read": True}, synchronize_session=False)
     
     # Invalidate cache
-    delete_cache(f"notifications:unread_count:{user_id}")
-    delete_cache(f"notifications:recent:{user_id}")
+    invalidate_notification_caches([user_id])
     
     return count
 
@@ -0,0 +1,258 @@
+"""
+Derived user field recomputation service
+
+Recalculates the fields that depend on a user's resolved forecasts
+(reputation + history, badges, streaks, rank score) for a set of users,
+either in the caller's session, spread across a process pool, or as a
+set-based full rebuild in chunks of users.
+"""
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterable, Iterator, List, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.user_stats import UserStats
+from app.models.reputation_history import ReputationHistory
+
+
+# Users per transaction in the full rebuild
+DERIVED_FIELDS_CHUNK_SIZE = 1000
+
+
+def recompute_user_derived_fields(db: Session, user_ids: Iterable[str], winning_streaks: bool = True) -> int:
+    """
+    Recalculate reputation, badges, streaks and rank score for each user once
+    
+    Args:
+        db: Database session
+        user_ids: Distinct user IDs to recompute
+        winning_streaks: Also recount winning streaks from forecasts; False after
+            a resolution, where score_forecasts already advanced them incrementally
+    
+    Returns:
+        Number of users recomputed
+    """
+    from app.services.reputation_service import calculate_reputation
+    from app.services.badge_service import award_badges, BADGE_EVENT_MARKET_RESOLVED
+    from app.services.leaderboard_service import update_leaderboard_ranks, update_rank_scores
+    from app.services.streak_service import update_activity_streaks_bulk, update_streaks_bulk
+    
+    user_ids = list(user_ids)
+    count = 0
+    for user_id in user_ids:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            continue
+        
+        # Calculate new reputation
+        new_reputation = calculate_reputation(db, user_id)
+        user.reputation = new_reputation
+        
+        # Record in history
+        db.add(ReputationHistory(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            reputation=new_reputation,
+            accuracy_score=None,  # Could calculate and store if needed
+            total_forecast_points=None,  # Could calculate and store if needed
+        ))
+        count += 1
+    
+    # Update streaks for all users at once
+    if winning_streaks:
+        update_streaks_bulk(db, user_ids)
+    else:
+        update_activity_streaks_bulk(db, user_ids)
+    
+    # Rank score from the new reputation and streaks (reads never write it)
+    db.flush()
+    update_rank_scores(db, user_ids)
+    
+    # Check resolution-driven badges (one aggregate query for all users)
+    award_badges(db, user_ids, event=BADGE_EVENT_MARKET_RESOLVED)
+    
+    db.commit()
+    
+    # Live ranks follow the new scores until the next leaderboard refresh
+    update_leaderboard_ranks(db, user_ids)
+    
+    return count
+
+
+def _recompute_chunk(user_ids: List[str], winning_streaks: bool = True) -> int:
+    """Recompute one chunk of users in a worker process with its own session"""
+    db = SessionLocal()
+    try:
+        return recompute_user_derived_fields(db, user_ids, winning_streaks=winning_streaks)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def recompute_users_in_pool(
+    user_ids: Iterable[str],
+    workers: int = 4,
+    chunk_size: int = 500,
+    winning_streaks: bool = True
+) -> int:
+    """
+    Recompute derived fields for many users across a process pool
+    
+    Callers must commit their own session first so workers see the scored forecasts.
+    
+    Args:
+        user_ids: Distinct user IDs to recompute
+        workers: Number of worker processes
+        chunk_size: Users per task (each task commits once)
+        winning_streaks: Also recount winning streaks (see recompute_user_derived_fields)
+    
+    Returns:
+        Number of users recomputed
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+    
+    chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+    recompute_chunk = partial(_recompute_chunk, winning_streaks=winning_streaks)
+    if workers <= 1 or len(chunks) == 1:
+        return sum(recompute_chunk(chunk) for chunk in chunks)
+    
+    # Spawned, not forked: the calling worker already runs threads (cache rebuilds,
+    # the request threadpool) whose held locks a forked child would inherit
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return sum(pool.map(recompute_chunk, chunks))
+
+
+def recompute_derived_fields_bulk(db: Session, user_ids: Iterable[str]) -> int:
+    """
+    Recompute streaks, reputation and rank_score for a chunk of users set-based
+    
+    Rows locked by live requests are skipped (picked up by the next run), and
+    everything is written with a handful of statements:
+    1. Lock the chunk's user rows (FOR UPDATE SKIP LOCKED)
+    2. Bulk streak update
+    3. One UPDATE ... FROM user_stats for reputation and rank_score
+    4. Bulk insert of reputation history for users whose reputation changed
+    
+    Does not commit.
+    
+    Returns:
+        Number of users recomputed
+    """
+    from app.services.reputation_service import reputation_expr
+    from app.services.leaderboard_service import rank_score_expr
+    from app.services.streak_service import activity_streak_expr, update_streaks_bulk
+    
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+    
+    previous = dict(db.execute(
+        select(User.id, User.reputation)
+        .where(User.id.in_(user_ids))
+        .with_for_update(skip_locked=True)
+    ).all())
+    if not previous:
+        return 0
+    
+    update_streaks_bulk(db, previous.keys())
+    
+    stats = (
+        select(
+            User.id.label("user_id"),
+            func.coalesce(UserStats.total_forecasts, 0).label("total_forecasts"),
+            func.coalesce(UserStats.won_forecasts, 0).label("won_forecasts"),
+            func.coalesce(UserStats.lost_forecasts, 0).label("lost_forecasts"),
+            func.coalesce(UserStats.won_points, 0).label("won_points"),
+            func.coalesce(UserStats.lost_points, 0).label("lost_points"),
+            func.coalesce(UserStats.brier_score_sum, 0.0).label("brier_score_sum"),
+        )
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .where(User.id.in_(list(previous.keys())))
+        .subquery("stats")
+    )
+    reputation = reputation_expr(
+        stats.c.won_forecasts,
+        stats.c.lost_forecasts,
+        stats.c.won_points,
+        stats.c.lost_points,
+        stats.c.brier_score_sum,
+    )
+    rows = db.execute(
+        update(User)
+        .where(User.id == stats.c.user_id)
+        .values(
+            reputation=reputation,
+            rank_score=rank_score_expr(
+                reputation, User.winning_streak, activity_streak_expr(), stats.c.total_forecasts
+            ),
+        )
+        .returning(User.id, User.reputation)
+        .execution_options(synchronize_session=False)
+    ).all()
+    
+    # Record history only where reputation moved
+    db.bulk_insert_mappings(ReputationHistory, [
+        {"id": str(uuid.uuid4()), "user_id": user_id, "reputation": new_reputation}
+        for user_id, new_reputation in rows
+        if abs(new_reputation - (previous[user_id] or 0.0)) > 1e-9
+    ])
+    
+    return len(rows)
+
+
+def iter_user_id_ranges(db: Session, chunk_size: int = DERIVED_FIELDS_CHUNK_SIZE) -> Iterator[Tuple[str, str]]:
+    """
+    Walk users.id in order (keyset) and yield (first_id, last_id) per chunk
+    
+    Ranges are stable handles for fan-out: new users created meanwhile just
+    fall into one of them.
+    """
+    last_id = None
+    
+    while True:
+        query = select(User.id).order_by(User.id).limit(chunk_size)
+        if last_id is not None:
+            query = query.where(User.id > last_id)
+        user_ids = db.execute(query).scalars().all()
+        if not user_ids:
+            break
+        
+        yield user_ids[0], user_ids[-1]
+        last_id = user_ids[-1]
+
+
+def recompute_user_id_range(db: Session, first_id: str, last_id: str) -> int:
+    """
+    Recompute all derived fields for the users in [first_id, last_id], committing once
+    
+    Streaks, reputation and rank_score are set-based; the new rank scores are
+    pushed to the leaderboard sorted sets and badges are then awarded from one
+    grouped aggregate query after the chunk's row locks are released.
+    
+    Returns:
+        Number of users recomputed
+    """
+    from app.services.badge_service import award_badges
+    from app.services.leaderboard_service import update_leaderboard_ranks
+    
+    user_ids = db.execute(
+        select(User.id).where(User.id >= first_id, User.id <= last_id).order_by(User.id)
+    ).scalars().all()
+    
+    count = recompute_derived_fields_bulk(db, user_ids)
+    db.commit()
+    
+    update_leaderboard_ranks(db, user_ids)
+    award_badges(db, user_ids)
+    
+    return count
@@ -0,0 +1,129 @@
+"""
+Market cancellation and refund service
+"""
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+
+from app.models.forecast import Forecast
+from app.models.market import Market
+from app.models.user import User
+
+
+# Forecasts refunded per transaction
+REFUND_CHUNK_SIZE = 5000
+
+
+def cancel_market(db: Session, market: Market, cancelled_by: str, reason: Optional[str] = None) -> None:
+    """
+    Mark a market as cancelled so no new forecasts or resolutions are accepted
+    
+    The reason is kept in the market metadata so a resumed refund job can reuse it.
+    Refunds are issued separately by refund_cancelled_market.
+    """
+    from app.services.activity_service import create_activity
+    
+    meta_data = dict(market.meta_data or {})
+    meta_data["cancellation"] = {"cancelled_by": cancelled_by, "reason": reason}
+    market.meta_data = meta_data
+    market.status = "cancelled"
+    
+    create_activity(
+        db,
+        activity_type="market_cancelled",
+        market_id=market.id,
+        metadata={"cancelled_by": cancelled_by, "reason": reason},
+    )
+
+
+def refund_market_chunk(db: Session, market_id: str, chunk_size: int = REFUND_CHUNK_SIZE) -> List[Dict]:
+    """
+    Refund one chunk of a cancelled market's pending forecasts
+    
+    A single statement marks up to chunk_size pending forecasts as 'refunded'
+    and credits their points back to the owners' balances, so a forecast is
+    refunded exactly once even if the job is retried or run concurrently
+    (locked rows are skipped, already refunded rows no longer match).
+    
+    Returns:
+        List of dicts with user_id, points and forecasts refunded in this chunk
+    """
+    chunk = (
+        select(Forecast.id)
+        .where(Forecast.market_id == market_id, Forecast.status == 'pending')
+        .order_by(Forecast.id)
+        .limit(chunk_size)
+        .with_for_update(skip_locked=True)
+    )
+    refunded = (
+        update(Forecast)
+        .where(Forecast.id.in_(chunk.scalar_subquery()))
+        .values(status='refunded')
+        .returning(Forecast.user_id, Forecast.points)
+        .cte("refunded")
+    )
+    per_user = (
+        select(
+            refunded.c.user_id,
+            func.sum(refunded.c.points).label("points"),
+            func.count().label("forecasts"),
+        )
+        .group_by(refunded.c.user_id)
+        .cte("per_user")
+    )
+    stmt = (
+        update(User)
+        .where(User.id == per_user.c.user_id)
+        .values(chips=User.chips + per_user.c.points)
+        .returning(User.id, per_user.c.points, per_user.c.forecasts)
+        .execution_options(synchronize_session=False)
+    )
+    
+    return [
+        {"user_id": user_id, "points": int(points), "forecasts": forecasts}
+        for user_id, points, forecasts in db.execute(stmt).all()
+    ]
+
+
+def refund_cancelled_market(db: Session, market_id: str, chunk_size: int = REFUND_CHUNK_SIZE) -> Dict:
+    """
+    Refund every pending forecast on a cancelled market, committing per chunk
+    
+    Idempotent and resumable: only forecasts still 'pending' are refunded, so
+    re-running after a crash continues where the previous run stopped.
+    
+    Returns:
+        Totals for this run (forecasts, chips and users refunded)
+    """
+    from app.services.notification_service import create_refund_notifications
+    from app.services.user_stats_service import record_forecasts_refunded
+    
+    market = db.query(Market).filter(Market.id == market_id).first()
+    if not market or market.status != "cancelled":
+        raise ValueError(f"Market {market_id} is not cancelled")
+    
+    reason = (market.meta_data or {}).get("cancellation", {}).get("reason")
+    totals = {"forecasts": 0, "chips": 0, "users": 0}
+    
+    while True:
+        refunds = refund_market_chunk(db, market_id, chunk_size)
+        if not refunds:
+            break
+        
+        record_forecasts_refunded(db, refunds)
+        create_refund_notifications(db, refunds, market_id, market.title, reason)
+        db.commit()
+        
+        totals["forecasts"] += sum(r["forecasts"] for r in refunds)
+        totals["chips"] += sum(r["points"] for r in refunds)
+        totals["users"] += len(refunds)
+    
+    return totals
+
+
+def count_pending_forecasts(db: Session, market_id: str) -> int:
+    """Number of forecasts on a market still awaiting a refund or resolution"""
+    return db.query(Forecast).filter(
+        Forecast.market_id == market_id,
+        Forecast.status == 'pending',
+    ).count()
@@ -0,0 +1,186 @@
+"""
+Reputation history service
+
+Keeps reputation_history bounded: recent points stay raw, older points are
+rolled into one point per day, and the oldest into one point per week. Also
+builds downsampled series for charts.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import String, cast, func, insert, literal, select, delete
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
+
+from app.models.reputation_history import ReputationHistory
+
+
+# Retention policy: raw points for 30 days, daily points for a year, weekly after that
+RAW_RETENTION_DAYS = 30
+DAILY_RETENTION_DAYS = 365
+
+# date_trunc field for each compacted granularity
+BUCKET_FIELDS = {
+    "daily": "day",
+    "weekly": "week",
+}
+
+
+def last_value(column, order_column):
+    """Aggregate returning the value of column on the latest row of the group"""
+    return array_agg(aggregate_order_by(column, order_column.desc()))[1]
+
+
+def compact_reputation_history(
+    db: Session,
+    from_granularity: str,
+    to_granularity: str,
+    older_than: datetime,
+    user_ids: Optional[List[str]] = None,
+) -> int:
+    """
+    Roll reputation history points older than a cutoff into coarser buckets
+    
+    One statement: a data-modifying CTE deletes the source rows and returns
+    them, and they are inserted back as one row per user and bucket holding the
+    bucket's closing values. The cutoff is aligned to a bucket boundary so a
+    bucket is only ever compacted once. Does not commit.
+    
+    Args:
+        db: Database session
+        from_granularity: Granularity of the rows to compact ("raw" or "daily")
+        to_granularity: Target granularity ("daily" or "weekly")
+        older_than: Only rows created before this are compacted
+        user_ids: Restrict to these users (None for all users)
+    
+    Returns:
+        Number of compacted rows written
+    """
+    bucket_field = BUCKET_FIELDS[to_granularity]
+    cutoff = func.date_trunc(bucket_field, older_than)
+    
+    moved = delete(ReputationHistory).where(
+        ReputationHistory.granularity == from_granularity,
+        ReputationHistory.created_at < cutoff,
+    )
+    if user_ids is not None:
+        moved = moved.where(ReputationHistory.user_id.in_(user_ids))
+    moved = moved.returning(
+        ReputationHistory.user_id,
+        ReputationHistory.reputation,
+        ReputationHistory.accuracy_score,
+        ReputationHistory.total_forecast_points,
+        ReputationHistory.created_at,
+    ).cte("moved")
+    
+    bucket = func.date_trunc(bucket_field, moved.c.created_at)
+    compacted = select(
+        cast(func.gen_random_uuid(), String),
+        moved.c.user_id,
+        last_value(moved.c.reputation, moved.c.created_at),
+        last_value(moved.c.accuracy_score, moved.c.created_at),
+        last_value(moved.c.total_forecast_points, moved.c.created_at),
+        literal(to_granularity),
+        bucket,
+    ).group_by(moved.c.user_id, bucket)
+    
+    result = db.execute(
+        insert(ReputationHistory).from_select(
+            ["id", "user_id", "reputation", "accuracy_score", "total_forecast_points", "granularity", "created_at"],
+            compacted,
+        )
+    )
+    return result.rowcount
+
+
+def compact_all_reputation_history(db: Session, chunk_size: int = 1000) -> Dict[str, int]:
+    """
+    Apply the retention policy to every user, one committed chunk of users at a time
+    
+    Returns:
+        Number of daily and weekly rows written
+    """
+    from app.services.recompute_service import iter_user_id_ranges
+    from app.models.user import User
+    
+    now = datetime.now(timezone.utc)
+    raw_cutoff = now - timedelta(days=RAW_RETENTION_DAYS)
+    daily_cutoff = now - timedelta(days=DAILY_RETENTION_DAYS)
+    totals = {"daily": 0, "weekly": 0}
+    
+    for first_id, last_id in iter_user_id_ranges(db, chunk_size=chunk_size):
+        user_ids = db.execute(
+            select(User.id).where(User.id >= first_id, User.id <= last_id)
+        ).scalars().all()
+        
+        totals["daily"] += compact_reputation_history(db, "raw", "daily", raw_cutoff, user_ids)
+        totals["weekly"] += compact_reputation_history(db, "daily", "weekly", daily_cutoff, user_ids)
+        db.commit()
+    
+    return totals
+
+
+def get_reputation_series(
+    db: Session,
+    user_id: str,
+    interval: Optional[str] = None,
+    max_points: Optional[int] = None,
+    limit: int = 100,
+) -> List[ReputationHistory]:
+    """
+    Get a user's reputation history, aggregated server-side
+    
+    - interval: one point per day/week/month (closing values of the bucket)
+    - max_points: split the history into at most max_points equal-sized groups (ntile)
+    - neither: the latest `limit` stored points
+    
+    Returns:
+        Rows with reputation, accuracy_score, total_forecast_points, created_at (newest first)
+    """
+    if not interval and not max_points:
+        return db.execute(
+            select(
+                ReputationHistory.reputation,
+                ReputationHistory.accuracy_score,
+                ReputationHistory.total_forecast_points,
+                ReputationHistory.created_at,
+            )
+            .where(ReputationHistory.user_id == user_id)
+            .order_by(ReputationHistory.created_at.desc())
+            .limit(limit)
+        ).all()
+    
+    if interval:
+        bucket = func.date_trunc(interval, ReputationHistory.created_at)
+        query = (
+            select(
+                last_value(ReputationHistory.reputation, ReputationHistory.created_at).label("reputation"),
+                last_value(ReputationHistory.accuracy_score, ReputationHistory.created_at).label("accuracy_score"),
+                last_value(ReputationHistory.total_forecast_points, ReputationHistory.created_at).label("total_forecast_points"),
+                bucket.label("created_at"),
+            )
+            .where(ReputationHistory.user_id == user_id)
+            .group_by(bucket)
+            .order_by(bucket.desc())
+        )
+        if max_points:
+            query = query.limit(max_points)
+        return db.execute(query).all()
+    
+    tiles = select(
+        ReputationHistory.reputation,
+        ReputationHistory.accuracy_score,
+        ReputationHistory.total_forecast_points,
+        ReputationHistory.created_at,
+        func.ntile(max_points).over(order_by=ReputationHistory.created_at).label("tile"),
+    ).where(ReputationHistory.user_id == user_id).subquery("tiles")
+    
+    return db.execute(
+        select(
+            last_value(tiles.c.reputation, tiles.c.created_at).label("reputation"),
+            last_value(tiles.c.accuracy_score, tiles.c.created_at).label("accuracy_score"),
+            last_value(tiles.c.total_forecast_points, tiles.c.created_at).label("total_forecast_points"),
+            func.max(tiles.c.created_at).label("created_at"),
+        )
+        .group_by(tiles.c.tile)
+        .order_by(func.max(tiles.c.created_at).desc())
+    ).all()
@@ -4,23 +4,95 @@ Reputation calculation service
 import math
 from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import Float, and_, case, cast, func, update
 
 from app.models.forecast import Forecast
 from app.models.market import Market, Outcome
+from app.models.user_stats import UserStats
+from app.services.user_stats_service import get_user_stats
+
+
+# Probabilities are clamped to this floor for log scores (a 0% pick that wins is not -inf)
+PROBABILITY_FLOOR = 0.01
+
+
+def calculate_implied_probability(
+    db: Session,
+    market_id: str,
+    outcome_id: str,
+    exclude_outcome_id: Optional[str] = None,
+    exclude_points: int = 0,
+) -> float:
+    """
+    Market consensus for an outcome from current outcome totals (one small query)
+    
+    Called before the forecast's own points are added. exclude_* removes a
+    user's existing position (e.g. when switching outcome) from the totals.
+    An empty market gives every outcome an equal share.
+    
+    Returns:
+        Probability (0-1)
+    """
+    totals = dict(
+        db.query(Outcome.id, Outcome.total_points).filter(Outcome.market_id == market_id).all()
+    )
+    if not totals:
+        return 0.0
+    if exclude_outcome_id in totals:
+        totals[exclude_outcome_id] -= exclude_points
+    
+    total_points = sum(max(0, points) for points in totals.values())
+    if total_points <= 0:
+        return 1.0 / len(totals)
+    
+    return max(0, totals.get(outcome_id, 0)) / total_points
+
+
+def score_market_forecasts(db: Session, market_id: str) -> int:
+    """
+    Store Brier and log scores on a resolved market's forecasts in one UPDATE
+    
+    Uses the implied probability snapshotted at placement (p) and the result
+    (o = 1 won, 0 lost): brier = (p - o)^2, log = -ln(p if won else 1 - p).
+    Legacy forecasts without a snapshot are scored as p = 1 (the old win-rate
+    behaviour) and get no log score. Must run after the forecasts have been
+    scored and flushed.
+    
+    Returns:
+        Number of forecasts scored
+    """
+    won = Forecast.status == 'won'
+    outcome = case((won, 1.0), else_=0.0)
+    probability = func.coalesce(Forecast.implied_probability, 1.0)
+    probability_of_result = case((won, probability), else_=1.0 - probability)
+    
+    result = db.execute(
+        update(Forecast)
+        .where(
+            Forecast.market_id == market_id,
+            Forecast.status.in_(['won', 'lost']),
+        )
+        .values(
+            brier_score=func.power(probability - outcome, 2),
+            log_score=case(
+                (Forecast.implied_probability.is_(None), None),
+                else_=-func.ln(func.greatest(probability_of_result, PROBABILITY_FLOOR)),
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
 
 
 def calculate_brier_score(forecasts: List[Forecast], markets: Dict[str, Market]) -> float:
     """
-    Calculate Brier score for a user's forecasts (simplified for MVP)
+    Calculate accuracy from the Brier scores stored on resolved forecasts
     
-    For MVP, we use a simplified approach:
-    - If user forecasted the winning outcome: probability = 1.0, outcome = 1.0 → Brier = 0
-    - If user forecasted the losing outcome: probability = 0.0, outcome = 0.0 → Brier = 0
-    - But we need their probability estimate, so we use market consensus at resolution
+    Each forecast's Brier score compares the market consensus for the chosen
+    outcome at placement time with the result (see score_market_forecasts).
+    Forecasts scored before snapshots existed count as p = 1.
     
-    Simplified: Use win rate as accuracy (for MVP)
-    Returns accuracy score (0-1, higher is better)
+    Returns accuracy score (0-1, higher is better): 1 - mean Brier score
     """
     if not forecasts:
         return 0.0
@@ -29,11 +101,11 @@ def calculate_brier_score(forecasts: List[Forecast], markets: Dict[str, Market])
     if not resolved_forecasts:
         return 0.0
     
-    # Calculate win rate (simplified accuracy)
-    won_count = sum(1 for f in resolved_forecasts if f.status == 'won')
-    accuracy_score = won_count / len(resolved_forecasts)
-    
-    return accuracy_score
+    brier_scores = [
+        f.brier_score if f.brier_score is not None else (0.0 if f.status == 'won' else 1.0)
+        for f in resolved_forecasts
+    ]
+    return 1.0 - (sum(brier_scores) / len(brier_scores))
 
 
 def calculate_reputation(
@@ -46,7 +118,7 @@ def calculate_reputation(
     Calculate user reputation score
     
     Formula: reputation = 0.7 * accuracy_score + 0.3 * log(1 + total_forecast_points)
-    - Accuracy score: 0-1 (from Brier score)
+    - Accuracy score: 0-1 (1 - mean Brier score over resolved forecasts)
     - Total forecast points: sum of all points user has allocated
     - Result: 0-100 scale
     
@@ -59,33 +131,22 @@ def calculate_reputation(
     Returns:
         Reputation score (0-100)
     """
-    # Get all resolved forecasts for the user
-    forecasts = db.query(Forecast).filter(
-        Forecast.user_id == user_id,
-        Forecast.status.in_(['won', 'lost'])
-    ).all()
+    # Read the user's incrementally maintained aggregates
+    stats = db.query(UserStats).filter(UserStats.user_id == user_id).first()
+    if not stats:
+        return 0.0
     
-    if not forecasts:
+    resolved_count = stats.won_forecasts + stats.lost_forecasts
+    if not resolved_count:
         return 0.0
     
-    # Calculate accuracy if not provided
+    # Calculate accuracy if not provided (1 - mean Brier score)
     if accuracy_score is None:
-        # Get all markets for these forecasts
-        market_ids = [f.market_id for f in forecasts]
-        markets = {
-            market.id: market
-            for market in db.query(Market).filter(Market.id.in_(market_ids)).all()
-        }
-        
-        # Load outcomes for each market
-        for market in markets.values():
-            market.outcomes = db.query(Outcome).filter(Outcome.market_id == market.id).all()
-        
-        accuracy_score = calculate_brier_score(forecasts, markets)
-    
-    # Calculate total forecast points if not provided
+        accuracy_score = 1.0 - (stats.brier_score_sum / resolved_count)
+    
+    # Calculate total forecast points if not provided (points on resolved forecasts)
     if total_forecast_points is None:
-        total_forecast_points = sum(f.points for f in forecasts)
+        total_forecast_points = stats.won_points + stats.lost_points
     
     # Reputation formula: 0.7 * accuracy + 0.3 * log(1 + total_points)
     # Scale log component to 0-1 range (assuming max ~100,000 points = log(100001) ≈ 11.5)
@@ -102,6 +163,23 @@ def calculate_reputation(
     return max(0.0, min(100.0, reputation))
 
 
+def reputation_expr(won_forecasts, lost_forecasts, won_points, lost_points, brier_score_sum):
+    """
+    SQL expression for calculate_reputation over user_stats-shaped columns
+    
+    Same formula and clamping, so bulk jobs can recompute reputation in one UPDATE.
+    """
+    resolved_count = won_forecasts + lost_forecasts
+    accuracy_score = 1.0 - (cast(brier_score_sum, Float) / func.nullif(resolved_count, 0))
+    log_component = func.least(1.0, func.ln(1 + won_points + lost_points) / 12.0)
+    reputation = ((0.7 * accuracy_score) + (0.3 * log_component)) * 100.0
+    
+    return case(
+        (resolved_count == 0, 0.0),
+        else_=func.greatest(0.0, func.least(100.0, reputation)),
+    )
+
+
 def get_user_forecast_stats(db: Session, user_id: str) -> Dict:
     """
     Get user forecast statistics
@@ -117,52 +195,8 @@ def get_user_forecast_stats(db: Session, user_id: str) -> Dict:
         - profit_loss: Total profit/loss from resolved forecasts
         - positions_value: Total value of pending forecasts
         - biggest_win: Biggest profit from a single forecast
+        - brier_score: Mean Brier score over resolved forecasts (None if none resolved)
+    
+    Read from the incrementally maintained user_stats table (O(1) per user).
     """
-    all_forecasts = db.query(Forecast).filter(Forecast.user_id == user_id).all()
-    resolved_forecasts = [f for f in all_forecasts if f.status in ['won', 'lost']]
-    won_forecasts = [f for f in resolved_forecasts if f.status == 'won']
-    lost_forecasts = [f for f in resolved_forecasts if f.status == 'lost']
-    pending_forecasts = [f for f in all_forecasts if f.status == 'pending']
-    
-    total_points = sum(f.points for f in all_forecasts)
-    
-    accuracy = 0.0
-    if resolved_forecasts:
-        accuracy = (len(won_forecasts) / len(resolved_forecasts)) * 100.0
-    
-    # Calculate profit/loss
-    profit_loss = 0
-    for forecast in won_forecasts:
-        if forecast.reward_amount:
-            profit_loss += (forecast.reward_amount - forecast.points)
-        else:
-            # Estimate for old forecasts without reward_amount
-            profit_loss += int(forecast.points * 0.5)
-    
-    for forecast in lost_forecasts:
-        profit_loss -= forecast.points
-    
-    # Calculate positions value (pending forecasts)
-    positions_value = sum(f.points for f in pending_forecasts)
-    
-    # Calculate biggest win
-    biggest_win = None
-    if won_forecasts:
-        biggest_win_obj = max(won_forecasts, key=lambda f: 
-            (f.reward_amount - f.points) if f.reward_amount 
-            else int(f.points * 0.5)
-        )
-        biggest_win = (biggest_win_obj.reward_amount - biggest_win_obj.points) if biggest_win_obj.reward_amount else int(biggest_win_obj.points * 0.5)
-    
-    return {
-        "total_forecasts": len(all_forecasts),
-        "resolved_forecasts": len(resolved_forecasts),
-        "won_forecasts": len(won_forecasts),
-        "lost_forecasts": len(lost_forecasts),
-        "total_points": total_points,
-        "accuracy": accuracy,
-        "profit_loss": profit_loss,
-        "positions_value": positions_value,
-        "biggest_win": biggest_win,
-    }
-
+    return get_user_stats(db, user_id)
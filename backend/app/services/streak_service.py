@@ -1,15 +1,52 @@
 """
 Streak calculation service
 """
-from typing import Dict, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import date, datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, distinct
+from sqlalchemy import Integer, and_, case, cast, func, distinct, or_, select, update
+from sqlalchemy.orm import aliased
 
 from app.models.forecast import Forecast
 from app.models.user import User
 
 
+# Activity streaks are counted back at most one year
+ACTIVITY_STREAK_MAX_DAYS = 365
+
+
+def winning_streak_subquery(user_id):
+    """
+    Correlated scalar subquery counting a user's wins since their latest loss
+    
+    Only the rows that make up the streak are read: the latest loss is a
+    single probe of the (user_id, status, created_at) index and the count
+    covers the wins newer than it, so cost does not grow with history.
+    
+    Args:
+        user_id: User ID value or column (e.g. User.id) to correlate on
+    """
+    won = aliased(Forecast)
+    lost = aliased(Forecast)
+    
+    last_loss = (
+        select(func.max(lost.created_at))
+        .where(lost.user_id == user_id, lost.status == 'lost')
+        .correlate_except(lost)
+        .scalar_subquery()
+    )
+    return (
+        select(func.count(won.id))
+        .where(
+            won.user_id == user_id,
+            won.status == 'won',
+            or_(last_loss.is_(None), won.created_at > last_loss),
+        )
+        .correlate_except(won)
+        .scalar_subquery()
+    )
+
+
 def calculate_winning_streak(db: Session, user_id: str) -> int:
     """
     Calculate user's current winning streak (consecutive correct forecasts)
@@ -17,56 +54,256 @@ def calculate_winning_streak(db: Session, user_id: str) -> int:
     Returns:
         Number of consecutive wins (0 if no wins or streak broken)
     """
-    # Get all resolved forecasts ordered by creation date (newest first)
-    forecasts = db.query(Forecast).filter(
-        Forecast.user_id == user_id,
-        Forecast.status.in_(['won', 'lost'])
-    ).order_by(Forecast.created_at.desc()).all()
+    return db.execute(select(winning_streak_subquery(user_id))).scalar() or 0
+
+
+def refresh_winning_streaks(db: Session, user_ids: Iterable[str]) -> None:
+    """Recalculate users.winning_streak from forecasts for the given users in one statement"""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
     
-    if not forecasts:
-        return 0
+    db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(winning_streak=winning_streak_subquery(User.id))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def apply_market_winning_streaks(db: Session, market_id: str) -> int:
+    """
+    Advance winning streaks for the users whose forecasts on a market were just scored
+    
+    Incremental: when the scored forecast is the user's newest resolved one the
+    streak is extended (won) or reset (lost); otherwise a forecast was resolved
+    out of order and the bounded count is used instead. Must run after the
+    forecasts have been scored and flushed.
+    
+    Returns:
+        Number of users updated
+    """
+    scored = aliased(Forecast)
+    other = aliased(Forecast)
+    
+    resolved_newer = (
+        select(other.id)
+        .where(
+            other.user_id == scored.user_id,
+            other.status.in_(['won', 'lost']),
+            other.id != scored.id,
+            other.created_at >= scored.created_at,
+        )
+        .exists()
+    )
+    result = db.execute(
+        update(User)
+        .where(
+            User.id == scored.user_id,
+            scored.market_id == market_id,
+            scored.status.in_(['won', 'lost']),
+        )
+        .values(
+            winning_streak=case(
+                (resolved_newer, winning_streak_subquery(User.id)),
+                (scored.status == 'won', User.winning_streak + 1),
+                else_=0,
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def count_consecutive_days(active_days: Iterable[date]) -> int:
+    """
+    Count the run of consecutive days at the start of active_days
     
+    Args:
+        active_days: Distinct dates, newest first
+    
+    Returns:
+        Number of consecutive days (capped at ACTIVITY_STREAK_MAX_DAYS)
+    """
     streak = 0
-    for forecast in forecasts:
-        if forecast.status == 'won':
-            streak += 1
-        else:
+    expected = None
+    for day in active_days:
+        if expected is not None and day != expected:
             # Streak broken
             break
+        streak += 1
+        if streak >= ACTIVITY_STREAK_MAX_DAYS:
+            break
+        expected = day - timedelta(days=1)
     
     return streak
 
 
+def get_activity_streak_state(db: Session, user_id: str) -> Tuple[Optional[date], int]:
+    """
+    Get user's most recent active day and the streak ending on that day
+    
+    One query fetching the user's distinct forecast days (UTC) in the last year.
+    
+    Returns:
+        Tuple of (last active date or None, consecutive days ending on it)
+    """
+    today = datetime.utcnow().date()
+    active_day = func.date(func.timezone('UTC', Forecast.created_at))
+    
+    rows = db.query(distinct(active_day).label("day")).filter(
+        Forecast.user_id == user_id,
+        Forecast.created_at >= datetime.combine(
+            today - timedelta(days=ACTIVITY_STREAK_MAX_DAYS), datetime.min.time()
+        ),
+    ).order_by(active_day.desc()).limit(ACTIVITY_STREAK_MAX_DAYS).all()
+    
+    active_days = [row.day for row in rows]
+    if not active_days:
+        return None, 0
+    
+    return active_days[0], count_consecutive_days(active_days)
+
+
 def calculate_activity_streak(db: Session, user_id: str) -> int:
     """
     Calculate user's activity streak (consecutive days with at least 1 forecast)
     
     Returns:
-        Number of consecutive days with activity
+        Number of consecutive days with activity, ending today
     """
-    # Get all forecasts grouped by date
-    today = datetime.utcnow().date()
-    streak_days = 0
-    
-    # Check each day going backwards
-    for day_offset in range(365):  # Check up to 1 year
-        check_date = today - timedelta(days=day_offset)
-        next_date = check_date + timedelta(days=1)
-        
-        # Count forecasts on this day
-        forecast_count = db.query(Forecast).filter(
-            Forecast.user_id == user_id,
-            Forecast.created_at >= datetime.combine(check_date, datetime.min.time()),
-            Forecast.created_at < datetime.combine(next_date, datetime.min.time())
-        ).count()
-        
-        if forecast_count > 0:
-            streak_days += 1
+    last_active_date, streak = get_activity_streak_state(db, user_id)
+    if last_active_date != datetime.utcnow().date():
+        return 0
+    return streak
+
+
+def record_activity(user: User, today: Optional[date] = None) -> int:
+    """
+    Advance the user's maintained activity streak for a forecast placed today
+    
+    No query: uses users.last_active_date / users.activity_streak, where
+    activity_streak is the streak ending on last_active_date.
+    
+    Returns:
+        Current activity streak
+    """
+    today = today or datetime.utcnow().date()
+    
+    if user.last_active_date != today:
+        if user.last_active_date == today - timedelta(days=1):
+            user.activity_streak = min((user.activity_streak or 0) + 1, ACTIVITY_STREAK_MAX_DAYS)
         else:
-            # Streak broken
-            break
+            user.activity_streak = 1
+        user.last_active_date = today
+    
+    return user.activity_streak
+
+
+def get_activity_streak(user: User, today: Optional[date] = None) -> int:
+    """
+    Get user's current activity streak from the maintained fields (no query)
+    
+    Returns:
+        Number of consecutive days with activity, ending today (0 if not active today)
+    """
+    today = today or datetime.utcnow().date()
+    if user.last_active_date != today:
+        return 0
+    return user.activity_streak or 0
+
+
+def activity_streak_expr(today: Optional[date] = None):
+    """SQL expression for get_activity_streak over the users table"""
+    today = today or datetime.utcnow().date()
+    return case((User.last_active_date == today, User.activity_streak), else_=0)
+
+
+def activity_streak_islands(user_ids: Optional[List[str]] = None):
+    """
+    Subquery with each user's latest run of consecutive active days (gaps-and-islands)
+    
+    Consecutive days share the same (day - row_number), so grouping on that
+    value yields the runs; DISTINCT ON keeps the newest run per user. Only the
+    last year of forecasts is read.
+    
+    Columns: user_id, last_day, streak
+    """
+    cutoff = datetime.combine(
+        datetime.utcnow().date() - timedelta(days=ACTIVITY_STREAK_MAX_DAYS), datetime.min.time()
+    )
     
-    return streak_days
+    days = select(
+        Forecast.user_id,
+        func.date(func.timezone('UTC', Forecast.created_at)).label("day"),
+    ).where(Forecast.created_at >= cutoff).distinct()
+    if user_ids is not None:
+        days = days.where(Forecast.user_id.in_(user_ids))
+    days = days.subquery("days")
+    
+    islands = select(
+        days.c.user_id,
+        days.c.day,
+        (days.c.day - cast(
+            func.row_number().over(partition_by=days.c.user_id, order_by=days.c.day), Integer
+        )).label("island"),
+    ).subquery("islands")
+    
+    last_day = func.max(islands.c.day)
+    return (
+        select(
+            islands.c.user_id,
+            last_day.label("last_day"),
+            func.least(func.count(), ACTIVITY_STREAK_MAX_DAYS).label("streak"),
+        )
+        .group_by(islands.c.user_id, islands.c.island)
+        .order_by(islands.c.user_id, last_day.desc())
+        .distinct(islands.c.user_id)
+        .subquery("latest")
+    )
+
+
+def update_activity_streaks_bulk(db: Session, user_ids: Iterable[str]) -> int:
+    """
+    Recalculate activity streaks for many users in one UPDATE ... FROM the activity islands
+    
+    Used on its own by the resolution pipeline, where score_forecasts has
+    already advanced the winning streaks incrementally. Does not commit.
+    
+    Returns:
+        Number of users whose activity streak was updated
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+    
+    latest = activity_streak_islands(user_ids)
+    result = db.execute(
+        update(User)
+        .where(User.id == latest.c.user_id)
+        .values(last_active_date=latest.c.last_day, activity_streak=latest.c.streak)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def update_streaks_bulk(db: Session, user_ids: Iterable[str]) -> int:
+    """
+    Recalculate winning and activity streaks for many users without committing
+    
+    Two statements regardless of the number of users: the bounded winning
+    streak count, then one UPDATE ... FROM the activity islands. The caller
+    commits once (nightly job, corrections, backfills).
+    
+    Returns:
+        Number of users whose activity streak was updated
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+    
+    refresh_winning_streaks(db, user_ids)
+    return update_activity_streaks_bulk(db, user_ids)
 
 
 def update_user_streaks(db: Session, user_id: str) -> Dict[str, int]:
@@ -80,19 +317,11 @@ def update_user_streaks(db: Session, user_id: str) -> Dict[str, int]:
     if not user:
         return {"winning_streak": 0, "activity_streak": 0}
     
-    winning_streak = calculate_winning_streak(db, user_id)
-    activity_streak = calculate_activity_streak(db, user_id)
-    
-    # Update user model if fields exist
-    if hasattr(user, 'winning_streak'):
-        user.winning_streak = winning_streak
-    if hasattr(user, 'activity_streak'):
-        user.activity_streak = activity_streak
-    
+    update_streaks_bulk(db, [user_id])
     db.commit()
+    db.refresh(user)
     
     return {
-        "winning_streak": winning_streak,
-        "activity_streak": activity_streak,
+        "winning_streak": user.winning_streak,
+        "activity_streak": get_activity_streak(user),
     }
-
@@ -0,0 +1,478 @@
+"""
+User stats service
+
+Keeps the user_stats table in sync with forecasts so that profile, badge and
+leaderboard reads are a single-row lookup instead of a full history scan, and
+user_daily_stats (per placement day and category) so that rolling-window
+leaderboards sum at most one bucket per day instead of scanning forecasts.
+"""
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session
+from sqlalchemy import Date, and_, bindparam, case, cast, delete, exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models.forecast import Forecast
+from app.models.market import Market
+from app.models.user import User
+from app.models.user_stats import UserStats, UserDailyStats
+
+
+# Columns maintained from forecast aggregates (everything except the key/timestamps)
+STAT_FIELDS = [
+    "total_forecasts",
+    "pending_forecasts",
+    "won_forecasts",
+    "lost_forecasts",
+    "total_points",
+    "pending_points",
+    "won_points",
+    "lost_points",
+    "profit_loss",
+    "biggest_win",
+    "brier_score_sum",
+]
+
+# user_daily_stats columns maintained from forecast aggregates
+DAILY_STAT_FIELDS = [
+    "forecasts",
+    "won_forecasts",
+    "lost_forecasts",
+    "volume",
+    "won_points",
+    "lost_points",
+    "profit_loss",
+]
+
+
+def forecast_profit_expr():
+    """
+    SQL expression for the profit/loss of a single forecast
+    
+    - Won: reward_amount - points (50% estimate for old forecasts without reward_amount)
+    - Lost: -points (chips were debited when the forecast was placed)
+    - Anything else: 0
+    """
+    return case(
+        (
+            and_(Forecast.status == 'won', Forecast.reward_amount.isnot(None)),
+            Forecast.reward_amount - Forecast.points,
+        ),
+        (Forecast.status == 'won', Forecast.points // 2),
+        (Forecast.status == 'lost', -Forecast.points),
+        else_=0,
+    )
+
+
+def forecast_aggregate_columns() -> list:
+    """
+    Grouped aggregate columns over Forecast, labelled with the user_stats field names
+    """
+    pending = Forecast.status == 'pending'
+    won = Forecast.status == 'won'
+    lost = Forecast.status == 'lost'
+    profit = forecast_profit_expr()
+    
+    return [
+        func.count(Forecast.id).label("total_forecasts"),
+        func.count(Forecast.id).filter(pending).label("pending_forecasts"),
+        func.count(Forecast.id).filter(won).label("won_forecasts"),
+        func.count(Forecast.id).filter(lost).label("lost_forecasts"),
+        func.coalesce(func.sum(Forecast.points), 0).label("total_points"),
+        func.coalesce(func.sum(Forecast.points).filter(pending), 0).label("pending_points"),
+        func.coalesce(func.sum(Forecast.points).filter(won), 0).label("won_points"),
+        func.coalesce(func.sum(Forecast.points).filter(lost), 0).label("lost_points"),
+        func.coalesce(func.sum(profit), 0).label("profit_loss"),
+        func.max(profit).filter(won).label("biggest_win"),
+        func.coalesce(func.sum(Forecast.brier_score).filter(won | lost), 0.0).label("brier_score_sum"),
+    ]
+
+
+def forecast_day_expr():
+    """SQL expression for the UTC day a forecast was placed (user_daily_stats.day)"""
+    return cast(func.timezone('UTC', Forecast.created_at), Date)
+
+
+def daily_aggregate_columns() -> list:
+    """
+    Grouped aggregate columns over Forecast, labelled with the user_daily_stats field names
+    """
+    won = Forecast.status == 'won'
+    lost = Forecast.status == 'lost'
+    
+    return [
+        func.count(Forecast.id).label("forecasts"),
+        func.count(Forecast.id).filter(won).label("won_forecasts"),
+        func.count(Forecast.id).filter(lost).label("lost_forecasts"),
+        func.coalesce(func.sum(Forecast.points), 0).label("volume"),
+        func.coalesce(func.sum(Forecast.points).filter(won), 0).label("won_points"),
+        func.coalesce(func.sum(Forecast.points).filter(lost), 0).label("lost_points"),
+        func.coalesce(func.sum(forecast_profit_expr()), 0).label("profit_loss"),
+    ]
+
+
+def record_forecast_placed(
+    db: Session,
+    user_id: str,
+    points: int,
+    category: str,
+    placed_at: Optional[datetime] = None
+) -> None:
+    """
+    Count a newly placed (pending) forecast in the user's stats and daily bucket
+    
+    Creates the stats row on the user's first forecast and the bucket on the
+    user's first forecast of the day in the market's category. The bucket day
+    must match forecast_day_expr: pass the flushed forecast's created_at, or
+    omit it for the UTC day of the transaction's now(), which is what a
+    forecast inserted in the same transaction gets.
+    """
+    stmt = insert(UserStats).values(
+        user_id=user_id,
+        total_forecasts=1,
+        pending_forecasts=1,
+        won_forecasts=0,
+        lost_forecasts=0,
+        total_points=points,
+        pending_points=points,
+        won_points=0,
+        lost_points=0,
+        profit_loss=0,
+        brier_score_sum=0.0,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={
+            "total_forecasts": UserStats.total_forecasts + 1,
+            "pending_forecasts": UserStats.pending_forecasts + 1,
+            "total_points": UserStats.total_points + points,
+            "pending_points": UserStats.pending_points + points,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+    
+    daily = insert(UserDailyStats).values(
+        user_id=user_id,
+        category=category,
+        day=placed_at.astimezone(timezone.utc).date() if placed_at else cast(func.timezone('UTC', func.now()), Date),
+        forecasts=1,
+        won_forecasts=0,
+        lost_forecasts=0,
+        volume=points,
+        won_points=0,
+        lost_points=0,
+        profit_loss=0,
+    )
+    daily = daily.on_conflict_do_update(
+        index_elements=[UserDailyStats.user_id, UserDailyStats.category, UserDailyStats.day],
+        set_={
+            "forecasts": UserDailyStats.forecasts + 1,
+            "volume": UserDailyStats.volume + points,
+        },
+    )
+    db.execute(daily)
+
+
+def record_forecast_points_changed(
+    db: Session,
+    user_id: str,
+    points_delta: int,
+    category: str,
+    placed_at: datetime
+) -> None:
+    """Apply a points change on a pending forecast to the user's stats and its placement-day bucket"""
+    if not points_delta:
+        return
+    
+    db.execute(
+        update(UserDailyStats)
+        .where(
+            UserDailyStats.user_id == user_id,
+            UserDailyStats.category == category,
+            UserDailyStats.day == placed_at.astimezone(timezone.utc).date(),
+        )
+        .values(volume=UserDailyStats.volume + points_delta)
+        .execution_options(synchronize_session=False)
+    )
+    
+    db.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values(
+            total_points=UserStats.total_points + points_delta,
+            pending_points=UserStats.pending_points + points_delta,
+            updated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def apply_market_resolution(db: Session, market_id: str) -> int:
+    """
+    Move a resolved market's forecasts from pending to won/lost in user_stats
+    
+    One UPDATE ... FROM over the market's forecasts grouped by user, and one
+    over them grouped by user and placement day for user_daily_stats. Must run
+    after the forecasts have been scored and flushed.
+    
+    Returns:
+        Number of user_stats rows updated
+    """
+    delta = (
+        select(Forecast.user_id, *forecast_aggregate_columns())
+        .where(
+            Forecast.market_id == market_id,
+            Forecast.status.in_(['won', 'lost']),
+        )
+        .group_by(Forecast.user_id)
+        .subquery()
+    )
+    
+    result = db.execute(
+        update(UserStats)
+        .where(UserStats.user_id == delta.c.user_id)
+        .values(
+            pending_forecasts=UserStats.pending_forecasts - delta.c.won_forecasts - delta.c.lost_forecasts,
+            pending_points=UserStats.pending_points - delta.c.won_points - delta.c.lost_points,
+            won_forecasts=UserStats.won_forecasts + delta.c.won_forecasts,
+            lost_forecasts=UserStats.lost_forecasts + delta.c.lost_forecasts,
+            won_points=UserStats.won_points + delta.c.won_points,
+            lost_points=UserStats.lost_points + delta.c.lost_points,
+            profit_loss=UserStats.profit_loss + delta.c.profit_loss,
+            # GREATEST ignores NULLs, so a first win simply becomes the biggest win
+            biggest_win=func.greatest(UserStats.biggest_win, delta.c.biggest_win),
+            brier_score_sum=UserStats.brier_score_sum + delta.c.brier_score_sum,
+            updated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    
+    day = forecast_day_expr()
+    daily_delta = (
+        select(Forecast.user_id, day.label("day"), *daily_aggregate_columns())
+        .where(
+            Forecast.market_id == market_id,
+            Forecast.status.in_(['won', 'lost']),
+        )
+        .group_by(Forecast.user_id, day)
+        .subquery()
+    )
+    db.execute(
+        update(UserDailyStats)
+        .where(
+            UserDailyStats.user_id == daily_delta.c.user_id,
+            UserDailyStats.day == daily_delta.c.day,
+            UserDailyStats.category == select(Market.category).where(Market.id == market_id).scalar_subquery(),
+        )
+        .values(
+            won_forecasts=UserDailyStats.won_forecasts + daily_delta.c.won_forecasts,
+            lost_forecasts=UserDailyStats.lost_forecasts + daily_delta.c.lost_forecasts,
+            won_points=UserDailyStats.won_points + daily_delta.c.won_points,
+            lost_points=UserDailyStats.lost_points + daily_delta.c.lost_points,
+            profit_loss=UserDailyStats.profit_loss + daily_delta.c.profit_loss,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    
+    return result.rowcount
+
+
+def reconcile_user_stats(db: Session, user_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Rebuild user_stats rows (and the users' daily buckets) from the forecasts table
+    
+    Used to backfill and to repair any drift in the incremental updates.
+    
+    Args:
+        db: Database session
+        user_ids: Users to rebuild (None for all users)
+    
+    Returns:
+        Number of rows written
+    """
+    query = select(Forecast.user_id, *forecast_aggregate_columns()).group_by(Forecast.user_id)
+    stale = delete(UserStats).where(
+        ~exists().where(Forecast.user_id == UserStats.user_id)
+    )
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+        query = query.where(Forecast.user_id.in_(user_ids))
+        stale = stale.where(UserStats.user_id.in_(user_ids))
+    
+    stmt = insert(UserStats).from_select(["user_id", *STAT_FIELDS], query)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={
+            **{field: stmt.excluded[field] for field in STAT_FIELDS},
+            "updated_at": func.now(),
+        },
+    )
+    result = db.execute(stmt)
+    
+    # Users whose forecasts were all removed (e.g. market deleted) no longer have stats
+    db.execute(stale.execution_options(synchronize_session=False))
+    
+    reconcile_user_daily_stats(db, user_ids)
+    
+    return result.rowcount
+
+
+def reconcile_user_daily_stats(db: Session, user_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Rebuild user_daily_stats buckets from the forecasts table
+    
+    Upserts rather than delete-and-insert, so a bucket created meanwhile by a
+    concurrent forecast placement is updated instead of violating its key.
+    
+    Args:
+        db: Database session
+        user_ids: Users to rebuild (None for all users)
+    
+    Returns:
+        Number of buckets written
+    """
+    day = forecast_day_expr()
+    query = (
+        select(Forecast.user_id, Market.category, day, *daily_aggregate_columns())
+        .join(Market, Market.id == Forecast.market_id)
+        .group_by(Forecast.user_id, Market.category, day)
+    )
+    stale = delete(UserDailyStats).where(
+        ~exists().where(
+            Forecast.user_id == UserDailyStats.user_id,
+            Market.id == Forecast.market_id,
+            Market.category == UserDailyStats.category,
+            day == UserDailyStats.day,
+        )
+    )
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+        query = query.where(Forecast.user_id.in_(user_ids))
+        stale = stale.where(UserDailyStats.user_id.in_(user_ids))
+    
+    stmt = insert(UserDailyStats).from_select(["user_id", "category", "day", *DAILY_STAT_FIELDS], query)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserDailyStats.user_id, UserDailyStats.category, UserDailyStats.day],
+        set_={field: stmt.excluded[field] for field in DAILY_STAT_FIELDS},
+    )
+    result = db.execute(stmt)
+    
+    # Buckets whose forecasts were all removed or moved (e.g. market deleted or recategorized)
+    db.execute(stale.execution_options(synchronize_session=False))
+    
+    return result.rowcount
+
+
+def reconcile_market_daily_stats(db: Session, market_id: str) -> int:
+    """
+    Rebuild the daily buckets of everyone who forecast on a market
+    
+    Buckets are keyed by category, so this moves a market's forecasts when its
+    category changes. Must run after the new category is flushed. Does not commit.
+    
+    Returns:
+        Number of buckets written
+    """
+    user_ids = db.execute(
+        select(Forecast.user_id).where(Forecast.market_id == market_id).distinct()
+    ).scalars().all()
+    return reconcile_user_daily_stats(db, user_ids)
+
+
+def reconcile_all_user_stats(db: Session, chunk_size: int = 5000) -> int:
+    """
+    Rebuild user_stats for every user, one committed chunk of users at a time
+    
+    Returns:
+        Number of rows written
+    """
+    total = 0
+    last_id = None
+    
+    while True:
+        query = db.query(User.id).order_by(User.id)
+        if last_id is not None:
+            query = query.filter(User.id > last_id)
+        user_ids = [row[0] for row in query.limit(chunk_size).all()]
+        if not user_ids:
+            break
+        
+        total += reconcile_user_stats(db, user_ids)
+        db.commit()
+        last_id = user_ids[-1]
+    
+    return total
+
+
+def get_user_stats(db: Session, user_id: str) -> Dict:
+    """
+    Get user forecast statistics from user_stats
+    
+    Returns:
+        Dictionary in the same shape as get_user_forecast_stats
+    """
+    stats = db.query(UserStats).filter(UserStats.user_id == user_id).first()
+    if not stats:
+        return {
+            "total_forecasts": 0,
+            "resolved_forecasts": 0,
+            "won_forecasts": 0,
+            "lost_forecasts": 0,
+            "total_points": 0,
+            "accuracy": 0.0,
+            "profit_loss": 0,
+            "positions_value": 0,
+            "biggest_win": None,
+            "brier_score": None,
+        }
+    
+    resolved_forecasts = stats.won_forecasts + stats.lost_forecasts
+    accuracy = 0.0
+    brier_score = None
+    if resolved_forecasts:
+        accuracy = (stats.won_forecasts / resolved_forecasts) * 100.0
+        brier_score = stats.brier_score_sum / resolved_forecasts
+    
+    return {
+        "total_forecasts": stats.total_forecasts,
+        "resolved_forecasts": resolved_forecasts,
+        "won_forecasts": stats.won_forecasts,
+        "lost_forecasts": stats.lost_forecasts,
+        "total_points": stats.total_points,
+        "accuracy": accuracy,
+        "profit_loss": stats.profit_loss,
+        "positions_value": stats.pending_points,
+        "biggest_win": stats.biggest_win,
+        "brier_score": brier_score,
+    }
+
+
+def record_forecasts_refunded(db: Session, refunds: List[Dict]) -> None:
+    """
+    Remove refunded pending forecasts from users' open positions
+    
+    Args:
+        db: Database session
+        refunds: List of dicts with user_id, forecasts (count) and points refunded
+    """
+    if not refunds:
+        return
+    
+    stmt = (
+        update(UserStats.__table__)
+        .where(UserStats.__table__.c.user_id == bindparam("b_user_id"))
+        .values(
+            pending_forecasts=UserStats.__table__.c.pending_forecasts - bindparam("b_forecasts"),
+            pending_points=UserStats.__table__.c.pending_points - bindparam("b_points"),
+            updated_at=func.now(),
+        )
+    )
+    db.execute(stmt, [
+        {"b_user_id": r["user_id"], "b_forecasts": r["forecasts"], "b_points": r["points"]}
+        for r in refunds
+    ])
@@ -2,12 +2,18 @@
 Celery application configuration
 """
 from celery import Celery
+from celery.schedules import crontab
 from app.config import settings
 
 celery_app = Celery(
     "ACBMarket",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
+    include=[
+        "app.tasks.notification_tasks",
+        "app.tasks.market_tasks",
+        "app.tasks.stats_tasks",
+    ],
 )
 
 celery_app.conf.update(
@@ -18,3 +24,31 @@ celery_app.conf.update(
     enable_utc=True,
 )
 
+# Periodic jobs (run with: celery -A app.tasks.celery_app beat)
+celery_app.conf.beat_schedule = {
+    "reconcile-user-stats-nightly": {
+        "task": "reconcile_user_stats",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "compute-category-stats-nightly": {
+        "task": "compute_category_stats",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    # After the stats reconcile so reputation/rank read repaired aggregates
+    "recompute-derived-fields-nightly": {
+        "task": "recompute_derived_fields",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    "compact-reputation-history-nightly": {
+        "task": "compact_reputation_history",
+        "schedule": crontab(hour=5, minute=0),
+    },
+    "snapshot-leaderboards-daily": {
+        "task": "snapshot_leaderboards",
+        "schedule": crontab(hour=0, minute=10),
+    },
+    "refresh-leaderboards": {
+        "task": "refresh_leaderboards",
+        "schedule": crontab(minute="*/5"),
+    },
+}
@@ -0,0 +1,32 @@
+"""
+Celery tasks for market lifecycle processing
+Used for refunding large cancelled markets without blocking API requests
+"""
+from celery import shared_task
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.services.refund_service import refund_cancelled_market, REFUND_CHUNK_SIZE
+
+
+@shared_task(name="refund_cancelled_market")
+def refund_cancelled_market_async(market_id: str, chunk_size: int = REFUND_CHUNK_SIZE):
+    """
+    Async task to refund all pending forecasts on a cancelled market
+    
+    Safe to retry: each chunk commits on its own and only still-pending
+    forecasts are refunded, so a rerun resumes where the last one stopped.
+    
+    Args:
+        market_id: Cancelled market ID
+        chunk_size: Forecasts refunded per transaction
+    """
+    db: Session = SessionLocal()
+    try:
+        return refund_cancelled_market(db, market_id, chunk_size=chunk_size)
+    except Exception as e:
+        db.rollback()
+        # Log error (in production, use proper logging)
+        print(f"Error refunding cancelled market {market_id}: {e}")
+        raise
+    finally:
+        db.close()
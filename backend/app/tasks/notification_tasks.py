@@ -13,7 +13,8 @@ def create_notifications_async(
     user_results: list,
     market_id: str,
     market_title: str,
-    winning_outcome_name: str
+    winning_outcome_name: str,
+    corrected: bool = False
 ):
     """
     Async task to create notifications in the background
@@ -26,6 +27,7 @@ def create_notifications_async(
         market_id: Market ID
         market_title: Market title
         winning_outcome_name: Winning outcome name
+        corrected: True when re-scoring after a resolution correction
     """
     db: Session = SessionLocal()
     try:
@@ -36,7 +38,8 @@ def create_notifications_async(
             market_title,
             winning_outcome_name,
             batch_size=5000,
-            use_async=False  # Already in async context
+            use_async=False,  # Already in async context
+            corrected=corrected
         )
         db.commit()
     except Exception as e:
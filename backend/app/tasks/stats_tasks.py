@@ -0,0 +1,181 @@
+"""
+Celery tasks for user stats and derived field maintenance
+"""
+from typing import Optional
+from celery import shared_task
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.services.user_stats_service import reconcile_all_user_stats
+from app.services.recompute_service import (
+    DERIVED_FIELDS_CHUNK_SIZE,
+    iter_user_id_ranges,
+    recompute_user_id_range,
+)
+from app.services.reputation_history_service import compact_all_reputation_history
+from app.services.category_stats_service import compute_category_stats, award_specialist_badges
+from app.services.leaderboard_service import (
+    LEADERBOARD_REFRESH_QUEUED_LOCK,
+    refresh_leaderboards,
+    snapshot_leaderboards,
+)
+from app.utils.cache import release_lock
+
+
+@shared_task(name="reconcile_user_stats")
+def reconcile_user_stats_task(chunk_size: int = 5000):
+    """
+    Rebuild user_stats from the forecasts table
+    
+    Scheduled nightly to repair any drift in the incremental updates made on
+    forecast placement and market resolution.
+    
+    Args:
+        chunk_size: Number of users rebuilt per transaction
+    """
+    db: Session = SessionLocal()
+    try:
+        return reconcile_all_user_stats(db, chunk_size=chunk_size)
+    except Exception as e:
+        db.rollback()
+        # Log error (in production, use proper logging)
+        print(f"Error reconciling user stats: {e}")
+        raise
+    finally:
+        db.close()
+
+
+@shared_task(name="recompute_derived_fields")
+def recompute_derived_fields_task(chunk_size: int = DERIVED_FIELDS_CHUNK_SIZE):
+    """
+    Rebuild reputation, rank_score, streaks and badges for every user
+    
+    Walks users.id once and fans out one task per id range, so the chunks run
+    in parallel across Celery worker processes. Each chunk is a short
+    transaction that skips rows locked by live requests.
+    
+    Args:
+        chunk_size: Number of users per task
+    
+    Returns:
+        Number of chunk tasks queued
+    """
+    db: Session = SessionLocal()
+    try:
+        queued = 0
+        for first_id, last_id in iter_user_id_ranges(db, chunk_size=chunk_size):
+            recompute_derived_fields_range_task.delay(first_id, last_id)
+            queued += 1
+        return queued
+    finally:
+        db.close()
+
+
+@shared_task(name="recompute_derived_fields_range")
+def recompute_derived_fields_range_task(first_id: str, last_id: str):
+    """
+    Rebuild derived fields for the users with first_id <= id <= last_id
+    
+    Args:
+        first_id: First user ID of the range
+        last_id: Last user ID of the range
+    """
+    db: Session = SessionLocal()
+    try:
+        return recompute_user_id_range(db, first_id, last_id)
+    except Exception as e:
+        db.rollback()
+        # Log error (in production, use proper logging)
+        print(f"Error recomputing derived fields for users {first_id}..{last_id}: {e}")
+        raise
+    finally:
+        db.close()
+
+
+@shared_task(name="compact_reputation_history")
+def compact_reputation_history_task(chunk_size: int = 1000):
+    """
+    Roll old reputation history into daily and weekly points
+    
+    Scheduled nightly so the table grows with the number of users and weeks,
+    not with the number of resolutions.
+    
+    Args:
+        chunk_size: Number of users compacted per transaction
+    """
+    db: Session = SessionLocal()
+    try:
+        return compact_all_reputation_history(db, chunk_size=chunk_size)
+    except Exception as e:
+        db.rollback()
+        # Log error (in production, use proper logging)
+        print(f"Error compacting reputation history: {e}")
+        raise
+    finally:
+        db.close()
+
+
+@shared_task(name="compute_category_stats")
+def compute_category_stats_task():
+    """
+    Rank users by accuracy within each category and award Specialist badges
+    
+    Scheduled nightly; the Specialist badge check is a lookup into these ranks.
+    """
+    db: Session = SessionLocal()
+    try:
+        result = compute_category_stats(db)
+        result["badges_awarded"] = award_specialist_badges(db)
+        return result
+    except Exception as e:
+        db.rollback()
+        # Log error (in production, use proper logging)
+        print(f"Error computing category stats: {e}")
+        raise
+    finally:
+        db.close()
+
+
+@shared_task(name="refresh_leaderboards")
+def refresh_leaderboards_task(queued_token: Optional[str] = None):
+    """
+    Rebuild the precomputed leaderboards
+    
+    Queued after resolutions and scheduled every few minutes so the weekly
+    and monthly windows keep moving.
+    
+    Args:
+        queued_token: Owner token of the queued-refresh lock, for queued runs;
+            released first so changes made from now on queue another refresh
+    """
+    if queued_token:
+        release_lock(LEADERBOARD_REFRESH_QUEUED_LOCK, queued_token)
+    
+    db: Session = SessionLocal()
+    try:
+        return refresh_leaderboards(db)
+    except Exception as e:
+        db.rollback()
+        # Log error (in production, use proper logging)
+        print(f"Error refreshing leaderboards: {e}")
+        raise
+    finally:
+        db.close()
+
+
+@shared_task(name="snapshot_leaderboards")
+def snapshot_leaderboards_task():
+    """
+    Store today's leaderboard ranks for rank changes and rank history
+    
+    Scheduled daily.
+    """
+    db: Session = SessionLocal()
+    try:
+        return snapshot_leaderboards(db)
+    except Exception as e:
+        db.rollback()
+        # Log error (in production, use proper logging)
+        print(f"Error snapshotting leaderboards: {e}")
+        raise
+    finally:
+        db.close()
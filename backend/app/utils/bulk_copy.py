@@ -0,0 +1,126 @@
+"""
+PostgreSQL COPY utilities
+
+Streams rows into a table with COPY ... FROM STDIN (text format) through the
+session's own connection, so the rows are part of the caller's transaction.
+No ORM objects or parameter lists are built; rows are encoded as they are read.
+"""
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+from sqlalchemy.orm import Session
+
+# Characters with a special meaning in COPY text format (backslash first)
+COPY_TEXT_ESCAPES = [
+    ("\\", "\\\\"),
+    ("\t", "\\t"),
+    ("\n", "\\n"),
+    ("\r", "\\r"),
+]
+
+COPY_NULL = "\\N"
+
+
+def copy_text_value(value: Any) -> str:
+    """Encode one value as a COPY text-format field (dicts/lists as JSON)"""
+    if isinstance(value, str):
+        text = value
+    elif value is None:
+        return COPY_NULL
+    elif value is True:
+        return "t"
+    elif value is False:
+        return "f"
+    elif isinstance(value, (datetime, date)):
+        return value.isoformat()
+    elif isinstance(value, (dict, list)):
+        text = json.dumps(value)
+    else:
+        return str(value)
+    # Most fields need no escaping; str.translate is slow on non-ASCII text
+    for char, escaped in COPY_TEXT_ESCAPES:
+        if char in text:
+            text = text.replace(char, escaped)
+    return text
+
+
+def copy_text_line(row: Sequence[Any]) -> str:
+    """Encode one row as a COPY text-format line"""
+    return "\t".join([copy_text_value(value) for value in row]) + "\n"
+
+
+class CopyStream(io.TextIOBase):
+    """Read-only file object over an iterator of text lines (what copy_expert reads from)"""
+    
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+        self._buffer = ""
+    
+    def readable(self) -> bool:
+        return True
+    
+    def read(self, size: Optional[int] = -1) -> str:
+        if size is None or size < 0:
+            data = self._buffer + "".join(self._lines)
+            self._buffer = ""
+            return data
+        
+        parts = [self._buffer]
+        length = len(self._buffer)
+        for line in self._lines:
+            parts.append(line)
+            length += len(line)
+            if length >= size:
+                break
+        data = "".join(parts)
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def supports_copy(db: Session) -> bool:
+    """True if the session is bound to PostgreSQL through psycopg2 (copy_expert)"""
+    bind = db.get_bind()
+    return bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2"
+
+
+def copy_rows(
+    db: Session,
+    table: str,
+    columns: List[str],
+    rows: Iterable[Sequence[Any]],
+    buffer_size: int = 1 << 16
+) -> int:
+    """
+    Stream rows into a table with COPY FROM STDIN in the session's transaction
+    
+    Pending ORM changes are flushed first. Does not commit.
+    
+    Args:
+        db: Database session (PostgreSQL / psycopg2)
+        table: Table name
+        columns: Column names, in the order of each row's values
+        rows: Iterable of value sequences (consumed lazily)
+        buffer_size: Bytes requested per read by the driver
+    
+    Returns:
+        Number of rows copied
+    """
+    db.flush()
+    
+    count = 0
+    
+    def lines() -> Iterator[str]:
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield copy_text_line(row)
+    
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f'COPY "{table}" ({column_list}) FROM STDIN', CopyStream(lines()), size=buffer_size)
+    finally:
+        cursor.close()
+    
+    return count
@@ -3,7 +3,10 @@ Redis cache utilities
 """
 import redis
 import json
-from typing import Optional, Any
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from app.config import settings
 
 redis_client = redis.Redis(
@@ -13,6 +16,17 @@ redis_client = redis.Redis(
     decode_responses=True
 )
 
+# Background rebuilds of stale cache entries
+rebuild_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-rebuild")
+
+# Release a lock only if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
 
 def get_cache(key: str) -> Optional[Any]:
     """Get value from cache"""
@@ -43,6 +57,156 @@ def delete_cache(key: str) -> bool:
         return False
 
 
+def delete_cache_many(keys: Iterable[str], chunk_size: int = 1000) -> bool:
+    """
+    Delete many keys in a few round trips
+    
+    Keys are removed with one UNLINK (memory reclaimed off the main thread)
+    per chunk, with all chunks sent down a single pipeline.
+    """
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        chunk = []
+        for key in keys:
+            chunk.append(key)
+            if len(chunk) >= chunk_size:
+                pipe.unlink(*chunk)
+                chunk = []
+        if chunk:
+            pipe.unlink(*chunk)
+        pipe.execute()
+        return True
+    except Exception:
+        return False
+
+
+def acquire_lock(name: str, ttl: int = 30) -> Optional[str]:
+    """Take a distributed lock (SET NX EX); returns the owner token, or None if held elsewhere"""
+    token = str(uuid.uuid4())
+    try:
+        if redis_client.set(f"lock:{name}", token, nx=True, ex=ttl):
+            return token
+        return None
+    except Exception:
+        return None
+
+
+def release_lock(name: str, token: str) -> bool:
+    """Release a lock taken with acquire_lock (no-op if it expired and was taken by someone else)"""
+    try:
+        redis_client.eval(RELEASE_LOCK_SCRIPT, 1, f"lock:{name}", token)
+        return True
+    except Exception:
+        return False
+
+
+def get_or_set_cache(
+    key: str,
+    compute: Callable[[], Any],
+    ttl: int = 300,
+    stale_ttl: int = 600,
+    lock_ttl: int = 30,
+    rebuild: Optional[Callable[[], Any]] = None,
+    poll_interval: float = 0.05,
+) -> Any:
+    """
+    Read-through cache with single-flight rebuilds and stale-while-revalidate
+    
+    Entries live for ttl + stale_ttl seconds and are fresh while more than
+    stale_ttl remains (expire_cache_pattern turns them stale early).
+    - Fresh: returned as is
+    - Stale: returned as is; one caller (per lock) rebuilds in the background
+    - Missing: one caller computes it; the others poll for its result (or
+      any stale value) and never compute alongside it. If the lock frees up
+      without a value (the computing caller failed), one of them takes over.
+    
+    Falls back to compute() when Redis is unavailable.
+    
+    Args:
+        key: Cache key
+        compute: Builds the value in the caller's context
+        ttl: Seconds the value is fresh
+        stale_ttl: Further seconds the value may be served stale
+        lock_ttl: Upper bound on a rebuild (lock expiry)
+        rebuild: Builds the value in a background thread (defaults to compute);
+            must not use the caller's database session
+        poll_interval: Seconds between checks while another caller computes
+    """
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.ttl(key)
+        value, remaining = pipe.execute()
+    except Exception:
+        return compute()
+    
+    if value is not None:
+        if remaining > stale_ttl:
+            return json.loads(value)
+        
+        token = acquire_lock(key, lock_ttl)
+        if token:
+            rebuild_executor.submit(_rebuild_cache, key, rebuild or compute, ttl + stale_ttl, token)
+        return json.loads(value)
+    
+    token = acquire_lock(key, lock_ttl)
+    if token is None:
+        try:
+            deadline = time.monotonic() + lock_ttl
+            while token is None:
+                if time.monotonic() >= deadline:
+                    # Held past its bound (a stuck compute): stop waiting rather than hang
+                    return compute()
+                time.sleep(poll_interval)
+                value = redis_client.get(key)
+                if value is not None:
+                    return json.loads(value)
+                token = acquire_lock(key, lock_ttl)
+            
+            # Took over after the lock was released; the value may have landed just before
+            value = redis_client.get(key)
+            if value is not None:
+                release_lock(key, token)
+                return json.loads(value)
+        except Exception:
+            return compute()
+    
+    try:
+        result = compute()
+        set_cache(key, result, ttl + stale_ttl)
+        return result
+    finally:
+        release_lock(key, token)
+
+
+def _rebuild_cache(key: str, compute: Callable[[], Any], ttl: int, token: str) -> None:
+    """Recompute and store a stale cache entry, then release its lock"""
+    try:
+        set_cache(key, compute(), ttl)
+    except Exception as e:
+        # Log error (in production, use proper logging); the stale value keeps being served
+        print(f"Error rebuilding cache {key}: {e}")
+    finally:
+        release_lock(key, token)
+
+
+def expire_cache_pattern(pattern: str, stale_ttl: int) -> bool:
+    """
+    Mark all keys matching pattern as stale without deleting them
+    
+    Their remaining TTL drops to stale_ttl, so get_or_set_cache serves the
+    old value while a single caller rebuilds it.
+    """
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for key in redis_client.scan_iter(match=pattern, count=1000):
+            pipe.expire(key, stale_ttl)
+        pipe.execute()
+        return True
+    except Exception:
+        return False
+
+
 def delete_cache_pattern(pattern: str) -> bool:
     """Delete all keys matching pattern"""
     try:
@@ -53,3 +217,89 @@ def delete_cache_pattern(pattern: str) -> bool:
     except Exception:
         return False
 
+
+
+def replace_sorted_set(key: str, scores: Iterable[Tuple[str, float]], chunk_size: int = 10000) -> bool:
+    """
+    Atomically replace a sorted set with (member, score) pairs
+    
+    Members are written to a temporary key (unique per call, so concurrent
+    rebuilds never share one) in pipelined chunks, then renamed over the live
+    key so readers never see a partially built set.
+    """
+    tmp_key = f"{key}:building:{uuid.uuid4()}"
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        written = 0
+        chunk = {}
+        for member, score in scores:
+            chunk[member] = score
+            if len(chunk) >= chunk_size:
+                pipe.zadd(tmp_key, chunk)
+                pipe.execute()
+                written += len(chunk)
+                chunk = {}
+        if chunk:
+            pipe.zadd(tmp_key, chunk)
+            pipe.execute()
+            written += len(chunk)
+        
+        if written:
+            redis_client.rename(tmp_key, key)
+        else:
+            redis_client.delete(key)
+        return True
+    except Exception:
+        return False
+    finally:
+        # Left behind only if the rebuild failed before the rename
+        try:
+            redis_client.delete(tmp_key)
+        except Exception:
+            pass
+
+
+def update_sorted_sets(keys: Iterable[str], scores: Dict[str, float]) -> bool:
+    """Update the scores of members already in each sorted set (ZADD XX), pipelined"""
+    if not scores:
+        return True
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.zadd(key, scores, xx=True)
+        pipe.execute()
+        return True
+    except Exception:
+        return False
+
+
+def get_sorted_set_rank(key: str, member: str) -> Optional[Tuple[int, float]]:
+    """0-based rank (highest score first) and score of a member, or None if absent"""
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zrevrank(key, member)
+        pipe.zscore(key, member)
+        rank, score = pipe.execute()
+        if rank is None:
+            return None
+        return rank, score
+    except Exception:
+        return None
+
+
+def get_sorted_set_range(key: str, start: int, stop: int) -> Optional[Tuple[List[Tuple[str, float]], int]]:
+    """
+    Members start..stop (0-based, inclusive, highest score first) with scores, and the set size
+    
+    Returns None if the set does not exist or Redis is unavailable.
+    """
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zrevrange(key, start, stop, withscores=True)
+        pipe.zcard(key)
+        members, size = pipe.execute()
+        if not size:
+            return None
+        return members, size
+    except Exception:
+        return None
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Script to backfill or re-evaluate derived user fields in parallel
+(badges, streaks, reputation + rank score) for all users or a cohort
+
+Usage:
+    python backfill_users.py                                # everything, all users
+    python backfill_users.py --fields badges --workers 8    # re-run badge rules after a rules change
+    python backfill_users.py --active-since 2026-01-01 --min-forecasts 10
+    python backfill_users.py --user-id <id> --user-id <id>
+    python backfill_users.py --resume                       # continue after an interruption
+
+Users are processed in id-ordered chunks across a process pool; each worker
+has its own database engine and commits once per chunk. Progress is written
+to a checkpoint file after every contiguous completed chunk.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models.user import User
+from app.models.user_stats import UserStats
+
+FIELDS = ["badges", "streaks", "reputation"]
+DEFAULT_CHECKPOINT = ".backfill_users.checkpoint.json"
+
+# Per-process session factory (set by init_worker)
+WorkerSession = None
+
+
+def cohort_query(filters: Dict):
+    """select(User.id) restricted to the cohort described by filters"""
+    query = select(User.id)
+    if filters.get("user_ids"):
+        query = query.where(User.id.in_(filters["user_ids"]))
+    if filters.get("active_only"):
+        query = query.where(User.is_active == True)
+    if filters.get("created_after"):
+        query = query.where(User.created_at >= filters["created_after"])
+    if filters.get("active_since"):
+        query = query.where(User.last_active_date >= date.fromisoformat(filters["active_since"]))
+    if filters.get("min_forecasts"):
+        query = query.join(UserStats, UserStats.user_id == User.id).where(
+            UserStats.total_forecasts >= filters["min_forecasts"]
+        )
+    return query
+
+
+def iter_chunks(db, filters: Dict, chunk_size: int, after_id: Optional[str] = None):
+    """Yield (first_id, last_id) for id-ordered chunks of the cohort (keyset pagination)"""
+    last_id = after_id
+    
+    while True:
+        query = cohort_query(filters).order_by(User.id).limit(chunk_size)
+        if last_id is not None:
+            query = query.where(User.id > last_id)
+        user_ids = db.execute(query).scalars().all()
+        if not user_ids:
+            break
+        
+        yield user_ids[0], user_ids[-1]
+        last_id = user_ids[-1]
+
+
+def init_worker() -> None:
+    """Give each worker process its own engine (connections are never shared across a fork)"""
+    global WorkerSession
+    engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, pool_size=1, max_overflow=0)
+    WorkerSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def process_chunk(task) -> Tuple[str, int]:
+    """Recompute the selected fields for one chunk of the cohort in a worker; returns (last_id, users)"""
+    from app.services.badge_service import award_badges
+    from app.services.leaderboard_service import update_leaderboard_ranks, update_rank_scores
+    from app.services.recompute_service import recompute_derived_fields_bulk
+    from app.services.streak_service import update_streaks_bulk
+    
+    first_id, last_id, filters, fields = task
+    db = WorkerSession()
+    try:
+        user_ids = db.execute(
+            cohort_query(filters).where(User.id >= first_id, User.id <= last_id)
+        ).scalars().all()
+        
+        # Reputation/rank recompute includes streaks; streaks alone still move rank_score
+        if "reputation" in fields:
+            recompute_derived_fields_bulk(db, user_ids)
+        elif "streaks" in fields:
+            update_streaks_bulk(db, user_ids)
+            update_rank_scores(db, user_ids)
+        db.commit()
+        
+        if "reputation" in fields or "streaks" in fields:
+            update_leaderboard_ranks(db, user_ids)
+        if "badges" in fields:
+            award_badges(db, user_ids)
+        
+        return last_id, len(user_ids)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def load_checkpoint(path: str, signature: Dict) -> Optional[str]:
+    """Last completed user ID from a checkpoint written by the same backfill, if any"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("signature") != signature:
+        print(f"Checkpoint {path} is for a different backfill; use --reset to discard it")
+        sys.exit(1)
+    return checkpoint.get("last_id")
+
+
+def save_checkpoint(path: str, signature: Dict, last_id: str, processed: int) -> None:
+    """Atomically record progress"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"signature": signature, "last_id": last_id, "processed": processed}, f)
+    os.replace(tmp_path, path)
+
+
+def parse_args(argv: List[str]):
+    """Parse and validate command line arguments"""
+    parser = argparse.ArgumentParser(description="Backfill derived user fields in parallel")
+    parser.add_argument("--fields", default=",".join(FIELDS), help=f"Comma-separated subset of {FIELDS}")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Users per chunk (one transaction)")
+    parser.add_argument("--user-id", action="append", dest="user_ids", help="Only this user (repeatable)")
+    parser.add_argument("--include-inactive", action="store_true", help="Include deactivated users")
+    parser.add_argument("--created-after", help="Only users created on/after this date (YYYY-MM-DD)")
+    parser.add_argument("--active-since", help="Only users with a forecast on/after this date (YYYY-MM-DD)")
+    parser.add_argument("--min-forecasts", type=int, help="Only users with at least this many forecasts")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Checkpoint file path")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint")
+    parser.add_argument("--reset", action="store_true", help="Discard any existing checkpoint first")
+    args = parser.parse_args(argv)
+    
+    args.fields = sorted({field.strip() for field in args.fields.split(",") if field.strip()})
+    unknown = set(args.fields) - set(FIELDS)
+    if unknown or not args.fields:
+        parser.error(f"--fields must be a subset of {FIELDS}")
+    return args
+
+
+def main(argv: List[str]) -> None:
+    """Run the backfill"""
+    args = parse_args(argv)
+    filters = {
+        "user_ids": args.user_ids,
+        "active_only": not args.include_inactive,
+        "created_after": args.created_after,
+        "active_since": args.active_since,
+        "min_forecasts": args.min_forecasts,
+    }
+    signature = {"fields": args.fields, "filters": filters}
+    
+    if args.reset and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    after_id = load_checkpoint(args.checkpoint, signature) if args.resume else None
+    if not args.resume and os.path.exists(args.checkpoint):
+        print(f"Checkpoint {args.checkpoint} exists; use --resume to continue or --reset to start over")
+        sys.exit(1)
+    
+    from app.database import SessionLocal
+    db = SessionLocal()
+    
+    try:
+        remaining = cohort_query(filters)
+        if after_id is not None:
+            remaining = remaining.where(User.id > after_id)
+        total = db.execute(select(func.count()).select_from(remaining.subquery())).scalar()
+        print(f"Backfilling {', '.join(args.fields)} for {total} users "
+              f"({args.workers} workers, {args.chunk_size} users/chunk)"
+              + (f", resuming after {after_id}" if after_id else ""))
+        
+        # Chunk boundaries are read up front on this thread (the pool feeds tasks from its own)
+        tasks = [
+            (first_id, last_id, filters, args.fields)
+            for first_id, last_id in iter_chunks(db, filters, args.chunk_size, after_id)
+        ]
+        
+        processed = 0
+        started = time.monotonic()
+        with Pool(processes=args.workers, initializer=init_worker) as pool:
+            # imap keeps results in chunk order so the checkpoint is always a contiguous prefix
+            for last_id, count in pool.imap(process_chunk, tasks):
+                processed += count
+                save_checkpoint(args.checkpoint, signature, last_id, processed)
+                
+                elapsed = time.monotonic() - started
+                rate = processed / elapsed if elapsed else 0.0
+                eta = (total - processed) / rate if rate else 0.0
+                print(f"{processed}/{total} users  {rate:.0f} users/s  elapsed {elapsed:.0f}s  eta {eta:.0f}s")
+        
+        elapsed = time.monotonic() - started
+        print(f"Done: {processed} users in {elapsed:.0f}s")
+        
+        # Finished: the next run starts from scratch
+        if os.path.exists(args.checkpoint):
+            os.remove(args.checkpoint)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
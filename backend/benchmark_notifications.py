@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Script to benchmark bulk notification inserts: COPY FROM STDIN vs batched bulk_insert_mappings
+
+Usage:
+    python benchmark_notifications.py                       # 100k rows, both methods
+    python benchmark_notifications.py --rows 1000000 --method copy
+    python benchmark_notifications.py --rows 200000 --batch-size 10000
+
+Rows are the same win/loss notifications a market resolution creates, spread
+over existing users. Each run is rolled back, so nothing is kept.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import cycle, islice
+from typing import Dict, List
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.user import User
+from app.services.notification_service import forecast_result_notification_rows, insert_notification_rows
+
+METHODS = ["copy", "bulk"]
+
+
+def fake_user_results(user_ids: List[str], rows: int) -> List[Dict]:
+    """user_results as produced by scoring, cycling through user_ids"""
+    results = []
+    for user_id in islice(cycle(user_ids), rows):
+        points = random.randint(10, 5000)
+        if random.random() < 0.5:
+            gained = random.randint(1, 5000)
+            results.append({"user_id": user_id, "won": True, "forecast_points": points,
+                            "chips_gained": gained, "reward_amount": points + gained})
+        else:
+            results.append({"user_id": user_id, "won": False, "forecast_points": points, "chips_lost": points})
+    return results
+
+
+def run(method: str, user_results: List[Dict], batch_size: int) -> float:
+    """Insert the notifications with one method and roll back; returns elapsed seconds"""
+    db = SessionLocal()
+    try:
+        rows = forecast_result_notification_rows(
+            user_results,
+            "benchmark-market",
+            "Benchmark market",
+            "Yes",
+            datetime.now(timezone.utc),
+        )
+        started = time.monotonic()
+        insert_notification_rows(db, rows, batch_size=batch_size, use_copy=(method == "copy"))
+        return time.monotonic() - started
+    finally:
+        db.rollback()
+        db.close()
+
+
+def main(argv: List[str]) -> None:
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark bulk notification inserts")
+    parser.add_argument("--rows", type=int, default=100000, help="Notifications to insert per run")
+    parser.add_argument("--method", choices=METHODS + ["both"], default="both", help="Insert method")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per batch for bulk_insert_mappings")
+    parser.add_argument("--users", type=int, default=10000, help="Distinct existing users to spread rows over")
+    args = parser.parse_args(argv)
+    
+    db = SessionLocal()
+    try:
+        user_ids = db.execute(select(User.id).limit(args.users)).scalars().all()
+    finally:
+        db.close()
+    if not user_ids:
+        print("No users found; create some users first")
+        sys.exit(1)
+    
+    user_results = fake_user_results(user_ids, args.rows)
+    methods = METHODS if args.method == "both" else [args.method]
+    print(f"Inserting {args.rows} notifications for {len(user_ids)} users (rolled back after each run)")
+    
+    timings = {}
+    for method in methods:
+        elapsed = run(method, user_results, args.batch_size)
+        timings[method] = elapsed
+        print(f"{method:>5}: {elapsed:.2f}s  {args.rows / elapsed:,.0f} rows/s")
+    
+    if len(timings) == 2:
+        print(f"COPY speedup: {timings['bulk'] / timings['copy']:.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
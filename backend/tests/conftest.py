@@ -0,0 +1,87 @@
+"""
+Shared test fixtures
+
+Database tests run against TEST_DATABASE_URL (a scratch PostgreSQL database
+whose tables are created and dropped here) and Redis tests against
+TEST_REDIS_URL; each is skipped when its URL is unset or unreachable. Tests
+never touch the configured cache: without TEST_REDIS_URL the cache client
+points at a closed port, so cache calls fail soft as they do in production.
+"""
+import os
+
+import pytest
+import redis
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401 (registers every table on Base.metadata)
+from app.database import Base
+from app.utils import cache
+
+UNREACHABLE_REDIS_URL = "redis://127.0.0.1:1/0"
+
+
+@pytest.fixture(autouse=True)
+def cache_client(monkeypatch):
+    """Point the cache helpers at the test Redis (or nowhere)"""
+    client = redis.Redis.from_url(
+        os.getenv("TEST_REDIS_URL", UNREACHABLE_REDIS_URL),
+        decode_responses=True,
+        socket_connect_timeout=0.5,
+    )
+    monkeypatch.setattr(cache, "redis_client", client)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def redis_cache(cache_client):
+    """Empty test Redis database"""
+    if not os.getenv("TEST_REDIS_URL"):
+        pytest.skip("TEST_REDIS_URL not set")
+    try:
+        cache_client.ping()
+    except redis.RedisError:
+        pytest.skip("Test Redis not reachable")
+    
+    cache_client.flushdb()
+    yield cache_client
+    cache_client.flushdb()
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """Engine on the scratch test database with the current schema"""
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL not set")
+    engine = create_engine(url)
+    try:
+        engine.connect().close()
+    except Exception:
+        pytest.skip("Test database not reachable")
+    
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    """Session factory on the test database; every table is emptied after the test"""
+    yield sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+    
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    with db_engine.begin() as connection:
+        connection.execute(text(f"TRUNCATE {tables} CASCADE"))
+
+
+@pytest.fixture
+def db(session_factory):
+    """Database session on the test database"""
+    session = session_factory()
+    yield session
+    session.rollback()
+    session.close()
@@ -0,0 +1,46 @@
+"""
+Test badge rule evaluation
+"""
+from types import SimpleNamespace
+
+from app.services.badge_service import (
+    BADGE_EVENT_FORECAST_PLACED,
+    BADGE_EVENT_MARKET_RESOLVED,
+    BADGE_CODES,
+    BADGE_RULES,
+    badge_codes_for,
+    evaluate_badge_rules,
+    get_candidate_badges,
+)
+
+
+def test_evaluate_badge_rules():
+    """Test rules are evaluated in memory on a user's aggregates"""
+    aggregates = {name: 0 for rule in BADGE_RULES.values() for name in rule["aggregates"]}
+    aggregates.update({
+        "total_forecasts": 12,
+        "resolved_forecasts": 8,
+        "brier_score_sum": 1.2,  # Mean Brier 0.15
+        "week_resolved": 5,
+        "week_won": 4,
+        "sports_top": True,
+    })
+    
+    assert evaluate_badge_rules(aggregates, BADGE_RULES) == ["newbie", "accurate", "specialist_sports"]
+
+
+def test_get_candidate_badges():
+    """Test only unheld badges triggered by the event are evaluated"""
+    user = SimpleNamespace(badges=["newbie"], badge_codes=badge_codes_for(["newbie"]))
+    
+    assert get_candidate_badges(user, BADGE_EVENT_FORECAST_PLACED) == ["veteran"]
+    assert "newbie" not in get_candidate_badges(user, BADGE_EVENT_MARKET_RESOLVED)
+    assert "veteran" not in get_candidate_badges(user, BADGE_EVENT_MARKET_RESOLVED)
+    assert len(get_candidate_badges(user)) == len(BADGE_RULES) - 1
+
+
+def test_badge_codes_registry():
+    """Test badge codes are unique and map back to badge IDs"""
+    assert len(set(BADGE_CODES.values())) == len(BADGE_CODES)
+    assert all(badge_id in BADGE_CODES for badge_id in BADGE_RULES)
+    assert badge_codes_for(["veteran", "newbie", "unknown"]) == [BADGE_CODES["newbie"], BADGE_CODES["veteran"]]
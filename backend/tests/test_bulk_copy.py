@@ -0,0 +1,32 @@
+"""
+Test COPY encoding helpers
+"""
+from datetime import datetime, timezone
+
+from app.utils.bulk_copy import CopyStream, copy_text_line, copy_text_value
+
+
+def test_copy_text_value():
+    """Test escaping of COPY text-format fields"""
+    assert copy_text_value(None) == "\\N"
+    assert copy_text_value(True) == "t"
+    assert copy_text_value(False) == "f"
+    assert copy_text_value(42) == "42"
+    assert copy_text_value("a\tb\nc\\d\re") == "a\\tb\\nc\\\\d\\re"
+    assert copy_text_value({"title": "x\ty"}) == '{"title": "x\\\\ty"}'
+    assert copy_text_value(datetime(2026, 2, 21, tzinfo=timezone.utc)) == "2026-02-21T00:00:00+00:00"
+
+
+def test_copy_stream():
+    """Test reading encoded rows back in fixed-size chunks"""
+    rows = [("1", "won", None), ("2", "lost\n", True)]
+    expected = "".join(copy_text_line(row) for row in rows)
+    stream = CopyStream(copy_text_line(row) for row in rows)
+    chunks = []
+    while True:
+        chunk = stream.read(5)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    assert "".join(chunks) == expected
+    assert expected == "1\twon\t\\N\n2\tlost\\n\tt\n"
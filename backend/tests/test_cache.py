@@ -0,0 +1,102 @@
+"""
+Test Redis cache helpers (Redis)
+"""
+import threading
+import time
+
+from app.utils.cache import (
+    acquire_lock,
+    get_cache,
+    get_or_set_cache,
+    get_sorted_set_range,
+    release_lock,
+    replace_sorted_set,
+    set_cache,
+)
+
+
+def test_replace_sorted_set_concurrent(redis_cache):
+    """Test that concurrent rebuilds each publish a complete set and leave no temporary keys"""
+    first = [(f"a{i}", float(i)) for i in range(50)]
+    second = [(f"b{i}", float(i)) for i in range(50)]
+    barrier = threading.Barrier(2)
+    results = []
+    
+    def rebuild(scores):
+        def members():
+            # Interleave the two rebuilds' writes
+            for i, pair in enumerate(scores):
+                if i == 10:
+                    barrier.wait(5)
+                yield pair
+        results.append(replace_sorted_set("ranks", members(), chunk_size=5))
+    
+    threads = [threading.Thread(target=rebuild, args=(scores,)) for scores in (first, second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    
+    assert results == [True, True]
+    members, total = get_sorted_set_range("ranks", 0, -1)
+    assert total == 50
+    assert {member for member, _ in members} in ({m for m, _ in first}, {m for m, _ in second})
+    assert redis_cache.keys("ranks:building*") == []
+
+
+def test_get_or_set_cache_serves_stale_and_rebuilds(redis_cache):
+    """Test a stale entry is served while one background rebuild replaces it"""
+    set_cache("page", {"version": 1}, ttl=5)  # Within stale_ttl: stale
+    calls = []
+    release = threading.Event()
+    
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {"version": 2}
+    
+    assert get_or_set_cache("page", compute, ttl=60, stale_ttl=600) == {"version": 1}
+    # The rebuild is still running: served stale again, no second rebuild
+    assert get_or_set_cache("page", compute, ttl=60, stale_ttl=600) == {"version": 1}
+    release.set()
+    
+    deadline = time.monotonic() + 5
+    while get_cache("page") != {"version": 2} and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert get_cache("page") == {"version": 2}
+    assert redis_cache.ttl("page") > 600
+    assert len(calls) == 1
+
+
+def test_get_or_set_cache_waits_for_locked_compute(redis_cache):
+    """Test a cold miss waits for the caller holding the lock, however long it computes"""
+    token = acquire_lock("page", 30)
+    
+    def slow_compute():
+        time.sleep(2.5)
+        set_cache("page", {"from": "holder"}, ttl=60)
+        release_lock("page", token)
+    
+    holder = threading.Thread(target=slow_compute)
+    holder.start()
+    calls = []
+    
+    result = get_or_set_cache("page", lambda: calls.append(1) or {"from": "waiter"}, lock_ttl=30)
+    holder.join()
+    
+    assert result == {"from": "holder"}
+    assert calls == []
+
+
+def test_get_or_set_cache_takes_over_failed_compute(redis_cache):
+    """Test a waiter computes (once) when the lock holder gives up without a value"""
+    token = acquire_lock("page", 30)
+    threading.Timer(0.2, release_lock, args=("page", token)).start()
+    calls = []
+    
+    result = get_or_set_cache("page", lambda: calls.append(1) or {"from": "waiter"}, lock_ttl=30)
+    
+    assert result == {"from": "waiter"}
+    assert calls == [1]
+    assert get_cache("page") == {"from": "waiter"}
+    assert redis_cache.get("lock:page") is None
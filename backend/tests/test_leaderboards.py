@@ -0,0 +1,159 @@
+"""
+Test leaderboard refresh and reads (PostgreSQL; Redis where noted)
+"""
+import threading
+import time
+from datetime import datetime, timezone
+
+from app.models.leaderboard import LeaderboardEntry
+from app.models.user import User
+from app.models.user_stats import UserDailyStats, UserStats
+from app.services.leaderboard_service import (
+    get_leaderboard_page,
+    leaderboard_ranks_key,
+    refresh_leaderboards,
+    request_leaderboard_refresh,
+)
+from app.services.recompute_service import recompute_user_derived_fields
+from app.tasks import stats_tasks
+
+
+def add_ranked_user(db, user_id: str, reputation: float, volume: int, profit_loss: int = 0) -> None:
+    """A user with one day of forecasts, so they qualify for every period"""
+    db.add(User(
+        id=user_id,
+        display_name=user_id,
+        hashed_password="x",
+        contact_number=f"+63{abs(hash(user_id)) % 10 ** 10:010d}",
+        reputation=reputation,
+    ))
+    db.add(UserStats(user_id=user_id, total_forecasts=1, total_points=volume))
+    db.add(UserDailyStats(
+        user_id=user_id,
+        category="sports",
+        day=datetime.now(timezone.utc).date(),
+        forecasts=1,
+        volume=volume,
+        profit_loss=profit_loss,
+    ))
+
+
+def seed_leaderboard(db, users: int = 5) -> None:
+    for i in range(users):
+        add_ranked_user(db, f"user-{i}", reputation=float(i * 10), volume=100 * (i + 1), profit_loss=i - 2)
+    db.commit()
+
+
+def test_refresh_leaderboards_ranks(db):
+    """Test the precomputed ranks for each sort order"""
+    seed_leaderboard(db)
+    
+    result = refresh_leaderboards(db)
+    
+    assert result == {"leaderboards": 3, "entries": 15}
+    entries = (
+        db.query(LeaderboardEntry)
+        .filter(LeaderboardEntry.period == "global", LeaderboardEntry.category == "all")
+        .order_by(LeaderboardEntry.rank)
+        .all()
+    )
+    assert [entry.user_id for entry in entries] == ["user-4", "user-3", "user-2", "user-1", "user-0"]
+    assert [entry.volume_rank for entry in entries] == [1, 2, 3, 4, 5]
+    assert [entry.profit_rank for entry in entries] == [1, 2, 3, 4, 5]
+    assert entries[0].profit_loss == 2
+
+
+def test_concurrent_refreshes(db, session_factory):
+    """Test that overlapping refreshes run one after the other instead of colliding"""
+    seed_leaderboard(db)
+    refresh_leaderboards(db)
+    
+    first, second = session_factory(), session_factory()
+    release = threading.Event()
+    commit = first.commit
+    
+    def held_commit():
+        # Keep the first rebuild's transaction open until the second has started
+        release.wait(10)
+        commit()
+    
+    first.commit = held_commit
+    errors = []
+    
+    def run(session):
+        try:
+            refresh_leaderboards(session)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+    
+    threads = [threading.Thread(target=run, args=(first,)), threading.Thread(target=run, args=(second,))]
+    threads[0].start()
+    time.sleep(0.5)
+    threads[1].start()
+    time.sleep(0.5)
+    release.set()
+    for thread in threads:
+        thread.join(30)
+    
+    assert errors == []
+    db.expire_all()
+    assert db.query(LeaderboardEntry).count() == 15
+
+
+def test_refresh_requests_coalesce(redis_cache, monkeypatch):
+    """Test that a burst of refresh requests queues one task until it starts"""
+    queued = []
+    monkeypatch.setattr(stats_tasks.refresh_leaderboards_task, "apply_async", lambda **kwargs: queued.append(kwargs))
+    monkeypatch.setattr(stats_tasks, "refresh_leaderboards", lambda db: None)
+    
+    request_leaderboard_refresh()
+    request_leaderboard_refresh()
+    assert len(queued) == 1
+    
+    # Once the queued task starts, new changes queue another refresh
+    stats_tasks.refresh_leaderboards_task(**queued[0]["kwargs"])
+    request_leaderboard_refresh()
+    assert len(queued) == 2
+
+
+def test_leaderboard_page_from_sorted_set(db, redis_cache):
+    """Test a page read from the sorted set uses its live scores"""
+    seed_leaderboard(db)
+    refresh_leaderboards(db)
+    redis_cache.zadd(leaderboard_ranks_key("global"), {"user-0": 1000.0})
+    
+    page = get_leaderboard_page(db, "global", offset=0, limit=2)
+    
+    assert page["total"] == 5
+    assert [(item["user_id"], item["rank"]) for item in page["leaderboard"]] == [("user-0", 1), ("user-4", 2)]
+    assert page["leaderboard"][0]["rank_score"] == 1000.0
+
+
+def test_leaderboard_page_member_missing_from_table(db, redis_cache):
+    """Test a sorted set member with no entry (e.g. before the set sync) falls back to the table"""
+    seed_leaderboard(db)
+    refresh_leaderboards(db)
+    redis_cache.zadd(leaderboard_ranks_key("global"), {"deleted-user": 1000.0})
+    
+    page = get_leaderboard_page(db, "global", offset=0, limit=3)
+    
+    assert page["total"] == 5
+    assert [(item["user_id"], item["rank"]) for item in page["leaderboard"]] == [
+        ("user-4", 1), ("user-3", 2), ("user-2", 3),
+    ]
+
+
+def test_recompute_updates_sorted_set(db, redis_cache):
+    """Test a user recompute pushes the new rank score to the live sorted set"""
+    seed_leaderboard(db)
+    refresh_leaderboards(db)
+    key = leaderboard_ranks_key("global")
+    before = redis_cache.zscore(key, "user-4")
+    
+    recompute_user_derived_fields(db, ["user-4"])
+    
+    user = db.get(User, "user-4")
+    assert user.rank_score != before
+    assert redis_cache.zscore(key, "user-4") == user.rank_score
@@ -0,0 +1,18 @@
+"""
+Test reputation scoring helpers
+"""
+from types import SimpleNamespace
+
+from app.services.reputation_service import calculate_brier_score
+
+
+def test_calculate_brier_score():
+    """Test accuracy from stored Brier scores, with legacy forecasts scored as p = 1"""
+    forecasts = [
+        SimpleNamespace(status="won", brier_score=0.04),  # Picked at 80% consensus, won
+        SimpleNamespace(status="lost", brier_score=0.36),  # Picked at 60% consensus, lost
+        SimpleNamespace(status="won", brier_score=None),  # Legacy win
+        SimpleNamespace(status="pending", brier_score=None),  # Ignored
+    ]
+    assert abs(calculate_brier_score(forecasts, {}) - (1.0 - 0.4 / 3)) < 1e-9
+    assert calculate_brier_score([], {}) == 0.0
@@ -0,0 +1,33 @@
+"""
+Test streak helpers
+"""
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from app.services.streak_service import (
+    ACTIVITY_STREAK_MAX_DAYS,
+    count_consecutive_days,
+    get_activity_streak,
+    record_activity,
+)
+
+
+def test_count_consecutive_days():
+    """Test counting the run of consecutive active days"""
+    today = date(2026, 2, 9)
+    assert count_consecutive_days([]) == 0
+    assert count_consecutive_days([today, today - timedelta(days=1), today - timedelta(days=3)]) == 2
+    days = [today - timedelta(days=i) for i in range(ACTIVITY_STREAK_MAX_DAYS + 10)]
+    assert count_consecutive_days(days) == ACTIVITY_STREAK_MAX_DAYS
+
+
+def test_record_activity():
+    """Test the maintained activity streak on forecast placement"""
+    today = date(2026, 2, 9)
+    user = SimpleNamespace(last_active_date=None, activity_streak=0)
+    assert record_activity(user, today - timedelta(days=1)) == 1
+    assert record_activity(user, today) == 2
+    assert record_activity(user, today) == 2
+    assert get_activity_streak(user, today) == 2
+    assert get_activity_streak(user, today + timedelta(days=1)) == 0
+    assert record_activity(user, today + timedelta(days=2)) == 1
@@ -0,0 +1,134 @@
+"""
+Test incremental user stats and daily buckets (PostgreSQL)
+"""
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+
+from app.api.v1.markets import update_market
+from app.models.forecast import Forecast
+from app.models.market import Market, Outcome
+from app.models.user import User
+from app.models.user_stats import UserDailyStats
+from app.schemas.market import MarketUpdate
+from app.services.user_stats_service import (
+    apply_market_resolution,
+    reconcile_user_daily_stats,
+    record_forecast_placed,
+    record_forecast_points_changed,
+)
+
+
+def add_market_forecast(db, created_at=None) -> Forecast:
+    """A user, a sports market and one pending forecast on it"""
+    db.add(User(id="user-1", display_name="user-1", hashed_password="x", contact_number="+630000000001"))
+    db.add(Market(id="market-1", title="Market", slug="market", category="sports"))
+    db.add(Outcome(id="outcome-1", market_id="market-1", name="Yes"))
+    forecast = Forecast(
+        id="forecast-1",
+        user_id="user-1",
+        market_id="market-1",
+        outcome_id="outcome-1",
+        points=100,
+        created_at=created_at,
+    )
+    db.add(forecast)
+    db.flush()
+    return forecast
+
+
+def resolve_won(db, forecast: Forecast) -> None:
+    forecast.status = "won"
+    forecast.reward_amount = 150
+    db.flush()
+    apply_market_resolution(db, forecast.market_id)
+
+
+def test_daily_bucket_just_before_midnight(db):
+    """Test the bucket day is the forecast's UTC placement day, whatever the session time zone"""
+    db.execute(text("SET TIME ZONE 'Asia/Manila'"))
+    placed_at = datetime(2026, 2, 20, 23, 59, 59, 900000, tzinfo=timezone.utc)
+    forecast = add_market_forecast(db, created_at=placed_at)
+    
+    record_forecast_placed(db, "user-1", 100, "sports", forecast.created_at)
+    resolve_won(db, forecast)
+    
+    buckets = db.query(UserDailyStats).all()
+    assert [(bucket.day, bucket.forecasts, bucket.won_forecasts, bucket.profit_loss) for bucket in buckets] == [
+        (date(2026, 2, 20), 1, 1, 50),
+    ]
+
+
+def test_daily_bucket_defaults_to_transaction_day(db):
+    """Test the default bucket day matches a forecast inserted in the same transaction"""
+    db.execute(text("SET TIME ZONE 'Asia/Manila'"))
+    forecast = add_market_forecast(db)
+    
+    record_forecast_placed(db, "user-1", 100, "sports")
+    resolve_won(db, forecast)
+    
+    bucket = db.query(UserDailyStats).one()
+    assert bucket.day == forecast.created_at.astimezone(timezone.utc).date()
+    assert (bucket.won_forecasts, bucket.profit_loss) == (1, 50)
+
+
+def test_reconcile_daily_stats_with_concurrent_placement(db, session_factory):
+    """Test a bucket created by a placement committing mid-rebuild is upserted, not duplicated"""
+    placed_at = datetime(2026, 2, 20, 12, tzinfo=timezone.utc)
+    forecast = add_market_forecast(db, created_at=placed_at)
+    record_forecast_placed(db, "user-1", 100, "sports", forecast.created_at)
+    db.commit()
+    
+    # The user's first forecast of a new day, committed between the rebuild's statements
+    other = session_factory()
+    new_day = datetime(2026, 2, 21, 9, tzinfo=timezone.utc)
+    other.add(Market(id="market-2", title="Other market", slug="other-market", category="sports"))
+    other.add(Outcome(id="outcome-2", market_id="market-2", name="Yes"))
+    other.add(Forecast(
+        id="forecast-2", user_id="user-1", market_id="market-2", outcome_id="outcome-2", points=40, created_at=new_day,
+    ))
+    record_forecast_placed(other, "user-1", 40, "sports", new_day)
+    other.flush()
+    
+    execute = db.execute
+    
+    def execute_then_commit_other(*args, **kwargs):
+        result = execute(*args, **kwargs)
+        if other.is_active and other.in_transaction():
+            other.commit()
+        return result
+    
+    db.execute = execute_then_commit_other
+    try:
+        reconcile_user_daily_stats(db, ["user-1"])
+        db.commit()
+    finally:
+        del db.execute
+        other.close()
+    
+    buckets = db.query(UserDailyStats).order_by(UserDailyStats.day).all()
+    assert [(bucket.day, bucket.forecasts, bucket.volume) for bucket in buckets] == [
+        (date(2026, 2, 20), 1, 100),
+        (date(2026, 2, 21), 1, 40),
+    ]
+
+
+async def test_daily_buckets_follow_market_category_change(db):
+    """Test that forecasts move to the new category's bucket, so later updates and the resolution land"""
+    placed_at = datetime(2026, 2, 20, 12, tzinfo=timezone.utc)
+    forecast = add_market_forecast(db, created_at=placed_at)
+    record_forecast_placed(db, "user-1", 100, "sports", forecast.created_at)
+    db.commit()
+    
+    await update_market("market-1", MarketUpdate(category="politics"), db=db, current_user=None)
+    
+    forecast.points = 120
+    record_forecast_points_changed(db, "user-1", 20, "politics", forecast.created_at)
+    resolve_won(db, forecast)
+    db.commit()
+    
+    buckets = db.query(UserDailyStats).all()
+    assert [
+        (bucket.category, bucket.day, bucket.forecasts, bucket.volume, bucket.won_forecasts, bucket.profit_loss)
+        for bucket in buckets
+    ] == [("politics", date(2026, 2, 20), 1, 120, 1, 30)]